@@ -1,27 +1,51 @@
 # app.py
-from modules import introducao, escopo1, escopo2, escopo3, relatorios
+import importlib
 
 import streamlit as st
-from modules import introducao, escopo1, escopo2, escopo3, relatorios
 
 # Configuração da Página
 st.set_page_config(page_title="Sistema GHG Protocol", layout="wide", page_icon="🌎")
 
+# Menu -> módulo da página. O módulo só é importado quando a página é aberta pela
+# primeira vez no processo (depois fica em sys.modules), então um worker novo não
+# carrega pandas/fatores das páginas que ninguém abriu.
+PAGINAS = {
+    "🏠 Introdução": "modules.introducao",
+    "🏭 Escopo 1": "modules.escopo1",
+    "⚡ Escopo 2": "modules.escopo2",
+    "🚚 Escopo 3": "modules.escopo3",
+    "🏢 Consolidação do Grupo": "modules.consolidacao",
+    "🔁 Cenários (E se?)": "modules.cenarios",
+    "📊 Relatórios & Download": "modules.relatorios",
+}
+
+# Chaves dos inventários no session_state (mesmas abas de src.exportacao.ABAS_INVENTARIO)
+CHAVES_INVENTARIO = ('inventario', 'inventario_t3', 'inventario_movel', 'inventario_escopo2', 'inventario_escopo3')
+
 # Inicializa Session State Global se não existir
 if 'empresa_dados' not in st.session_state:
     st.session_state['empresa_dados'] = {}
 if 'inventario' not in st.session_state:
-    st.session_state['inventario'] = []
+    from src.inventario import Inventario
+    st.session_state['inventario'] = Inventario()
+
+def carregar_pagina(menu):
+    return importlib.import_module(PAGINAS[menu])
+
+def sincronizar_inventarios():
+    """Persiste em lote o que foi lançado nesta execução (nada a fazer sem lançamentos)"""
+    inventarios = {chave: st.session_state.get(chave) for chave in CHAVES_INVENTARIO}
+    if not any(inv is not None and inv.pendente for inv in inventarios.values()):
+        return
+    from src import persistencia
+    persistencia.sincronizar(persistencia.get_banco(), st.session_state['empresa_dados'], inventarios)
 
 def main():
     st.sidebar.image("https://cdn-icons-png.flaticon.com/512/2964/2964514.png", width=50)
     st.sidebar.title("Menu GHG")
     
     # Menu Principal
-    menu = st.sidebar.radio(
-        "Navegação",
-        ["🏠 Introdução", "🏭 Escopo 1", "⚡ Escopo 2", "🚚 Escopo 3", "📊 Relatórios & Download"]
-    )
+    menu = st.sidebar.radio("Navegação", list(PAGINAS))
 
     st.sidebar.markdown("---")
     
@@ -30,17 +54,14 @@ def main():
         st.sidebar.info(f"Inventário de: **{st.session_state['empresa_dados']['nome']}**")
         st.sidebar.caption(f"Ano Base: {st.session_state['empresa_dados'].get('ano')}")
 
-    # Roteador de Páginas
-    if menu == "🏠 Introdução":
-        introducao.render()
-    elif menu == "🏭 Escopo 1":
-        escopo1.render()
-    elif menu == "⚡ Escopo 2":
-        escopo2.render()
-    elif menu == "🚚 Escopo 3":
-        escopo3.render()
-    elif menu == "📊 Relatórios & Download":
-        relatorios.render()
+    # Roteador de Páginas (import sob demanda)
+    pagina = carregar_pagina(menu)
+    if hasattr(pagina, 'render'):
+        pagina.render()
+    else:
+        st.info("🚧 Página em construção...")
+
+    sincronizar_inventarios()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmarks dos caminhos críticos (cálculo, inventário, Tabela 2 e exportação).
+
+    python -m benchmarks.run_benchmarks --tamanhos 1000 10000 100000 1000000 --saida bench.json
+
+Gera frotas e livros de compra de combustível sintéticos (semente fixa) e mede, por etapa,
+tempo, throughput (linhas/s) e pico de memória (tracemalloc, numa segunda execução
+para não distorcer o tempo). O resultado é um JSON para comparar entre versões.
+"""
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src import colunar, exportacao, importacao, series
+from src.calculadora import GHGCalculator
+from src.inventario import CHAVES_REGISTRO, Inventario
+
+SEMENTE = 42
+
+
+# --- DADOS SINTÉTICOS ---
+def gerar_compras(calc, n, semente=SEMENTE):
+    """Livro de compras de combustível no layout da Tabela 1 (importação em lote)"""
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "Registro": [f"FONTE-{i % 5000:05d}" for i in range(n)],
+        "Descrição": "Caldeira",
+        "Combustível": rng.choice(calc.get_combustiveis_estacionaria(), n),
+        "Quantidade": rng.gamma(2.0, 500.0, n).round(2),
+        "Período": rng.choice([series.periodo(ano, mes) for ano in (2022, 2023, 2024) for mes in range(1, 13)], n),
+    })
+
+
+def gerar_frota(calc, n, semente=SEMENTE):
+    """Frota no layout da combustão móvel (Opções 1, 2 e 3 misturadas)"""
+    rng = np.random.default_rng(semente + 1)
+    opcao = rng.integers(1, 4, n)
+    return pd.DataFrame({
+        "Registro": [f"PLACA-{i:07d}" for i in range(n)],
+        "Descrição": "Veículo",
+        "Opção": opcao,
+        "Tipo Veículo": rng.choice(calc.get_tipos_veiculos(), n),
+        "Ano": rng.choice(calc.get_anos_frota(), n),
+        "Combustível": rng.choice(list(calc.db.get('combustao_estacionaria', {})), n),
+        "Quantidade": np.where(opcao == 3, rng.gamma(2.0, 5000.0, n), rng.gamma(2.0, 300.0, n)).round(1),
+    })
+
+
+def entrada_lote(df_frota):
+    """Converte o layout da frota nas colunas de calcular_lote"""
+    return pd.DataFrame({
+        "opcao": df_frota["Opção"],
+        "tipo_veiculo": df_frota["Tipo Veículo"],
+        "ano": df_frota["Ano"].where(df_frota["Opção"] != 2),
+        "combustivel_direto": df_frota["Combustível"],
+        "qtd": df_frota["Quantidade"],
+    })
+
+
+# --- ETAPAS ---
+def etapas(calc, n, max_escalar, max_excel):
+    """Lista de (nome, linhas, função) para um tamanho; cada função recebe o contexto compartilhado"""
+    ctx = {}
+    frota = gerar_frota(calc, n)
+    compras = gerar_compras(calc, n)
+    lote = entrada_lote(frota)
+    n_escalar = min(n, max_escalar)
+
+    def movel_escalar():
+        for r in lote.iloc[:n_escalar].itertuples(index=False):
+            calc.calcular_movel(int(r.opcao), {'tipo_veiculo': r.tipo_veiculo, 'ano': r.ano,
+                                               'combustivel_direto': r.combustivel_direto, 'qtd': r.qtd})
+
+    def estacionaria_escalar():
+        for nome, qtd in compras[["Combustível", "Quantidade"]].iloc[:n_escalar].itertuples(index=False):
+            calc.calcular_estacionaria(nome, qtd)
+
+    def lote_vetorizado():
+        ctx['res_lote'] = calc.calcular_lote(lote)
+
+    def importacao_csv():
+        blocos = []
+        arquivo = io.BytesIO(compras.to_csv(index=False).encode('utf-8'))
+        importacao.importar_arquivo(arquivo, "compras.csv", 'estacionaria', calc, blocos.append, setor="Energia")
+        ctx['linhas_t1'] = blocos
+
+    def inventario_lista_de_dicts():
+        registros = [r for bloco in ctx['linhas_t1'] for r in bloco.to_dict('records')]
+        pd.DataFrame(registros)
+
+    def inventario_colunar():
+        inv = Inventario()
+        for bloco in ctx['linhas_t1']:
+            inv.extend(bloco)
+        inv.df
+        ctx['inventario'] = inv
+
+    def tabela_2():
+        calc.gerar_tabela_2(ctx['inventario'], "Energia")
+
+    def exportacao_xlsx():
+        inv = ctx['inventario']
+        if len(inv) > max_excel:
+            inv = Inventario(inv.linhas_desde(len(inv) - max_excel))
+        exportacao.gerar_excel({'nome': 'Benchmark', 'ano': 2023}, {'inventario': inv})
+
+    def exportacao_parquet():
+        ctx['parquet'] = colunar.gerar_pacote({'nome': 'Benchmark', 'ano': 2023}, {'inventario': ctx['inventario']})
+
+    def importacao_parquet():
+        colunar.ler_pacote(io.BytesIO(ctx['parquet']))
+
+    def series_periodo():
+        # Objeto novo: mede o cálculo, não o cache por versão
+        serie = series.SeriesInventario(ctx['inventario'])
+        for freq in series.FREQUENCIAS:
+            serie.totais("Total GEE (tCO2e)", freq)
+        serie.totais("Total GEE (tCO2e)", 'M', por="Registro")
+
+    def reimportacao_upsert():
+        # Mesmo arquivo de novo: cada linha acha a sua pelo índice (Registro, Período) e é substituída
+        inv = ctx['inventario']
+        inv.indexar(CHAVES_REGISTRO['inventario'])
+        for bloco in ctx['linhas_t1']:
+            inv.upsert_lote(bloco)
+
+    etapas_parquet = []
+    if colunar.disponivel():
+        etapas_parquet = [("exportacao_parquet", n, exportacao_parquet), ("importacao_parquet", n, importacao_parquet)]
+
+    return [
+        ("calcular_movel (escalar)", n_escalar, movel_escalar),
+        ("calcular_estacionaria (escalar)", n_escalar, estacionaria_escalar),
+        ("calcular_lote", n, lote_vetorizado),
+        ("importacao_csv_tabela1", n, importacao_csv),
+        ("inventario_lista_de_dicts_para_dataframe", n, inventario_lista_de_dicts),
+        ("inventario_colunar_extend_df", n, inventario_colunar),
+        ("gerar_tabela_2", n, tabela_2),
+        ("series_mensal_trimestral_anual", n, series_periodo),
+        ("exportacao_xlsx", min(n, max_excel), exportacao_xlsx),
+    ] + etapas_parquet + [("reimportacao_upsert_tabela1", n, reimportacao_upsert)]
+
+
+def medir(funcao, memoria):
+    inicio = time.perf_counter()
+    funcao()
+    segundos = time.perf_counter() - inicio
+    pico_mb = None
+    if memoria:
+        tracemalloc.start()
+        funcao()
+        pico_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return segundos, pico_mb
+
+
+def _versao_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do sistema GHG")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--max-escalar", type=int, default=20_000,
+                        help="Limite de linhas nos caminhos escalares (o throughput é extrapolável)")
+    parser.add_argument("--max-excel", type=int, default=100_000, help="Limite de linhas na exportação XLSX")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede pico de memória (mais rápido)")
+    parser.add_argument("--etapas", nargs="*", help="Roda só as etapas cujo nome contenha um destes textos")
+    args = parser.parse_args(argv)
+
+    calc = GHGCalculator()
+    resultados = []
+    for n in args.tamanhos:
+        for nome, linhas, funcao in etapas(calc, n, args.max_escalar, args.max_excel):
+            # Etapas dependem das anteriores (ctx); o filtro só decide o que é reportado
+            segundos, pico_mb = medir(funcao, memoria=not args.sem_memoria)
+            if args.etapas and not any(f in nome for f in args.etapas):
+                continue
+            resultados.append({
+                "etapa": nome, "tamanho": n, "linhas": linhas,
+                "segundos": round(segundos, 6),
+                "linhas_por_segundo": round(linhas / segundos, 1) if segundos > 0 else None,
+                "pico_memoria_mb": round(pico_mb, 3) if pico_mb is not None else None,
+            })
+            print(f"[{n:>9,}] {nome:<42} {segundos:9.3f}s", file=sys.stderr)
+
+    relatorio = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": _versao_git(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "semente": SEMENTE,
+        },
+        "resultados": resultados,
+    }
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# modules/cenarios.py
+import streamlit as st
+import pandas as pd
+from src import cenarios, exportacao
+from src.calculadora import get_calculadora, get_compartilhado
+from src.coeficientes import GASES
+from src.escopo3 import CalculadoraTransporte
+
+OPCOES_GWP = ["Base atual", "AR5", "AR6", "Personalizado"]
+
+def render():
+    calc = get_calculadora()
+    modais = get_compartilhado(CalculadoraTransporte, 'data/fatores_emissao.json').get_modais()
+    st.title("🔁 Cenários (E se?)")
+    st.markdown("Compare o inventário com outros GWPs ou fatores corrigidos. Só as linhas que usam o fator alterado são recalculadas.")
+
+    if 'cenarios' not in st.session_state:
+        st.session_state['cenarios'] = {}
+    inventarios = {chave: st.session_state.get(chave) for chave in exportacao.ABAS_INVENTARIO}
+
+    with st.expander("➕ Novo Cenário", expanded=not st.session_state['cenarios']):
+        with st.form("form_cenario", clear_on_submit=True):
+            nome = st.text_input("Nome do cenário", placeholder="Ex.: GWP AR6")
+            opcao_gwp = st.radio("GWP:", OPCOES_GWP, horizontal=True)
+            c1, c2 = st.columns(2)
+            gwp_ch4 = c1.number_input("GWP CH₄ (se personalizado)", min_value=0.0, value=float(calc.gwp['CH4']))
+            gwp_n2o = c2.number_input("GWP N₂O (se personalizado)", min_value=0.0, value=float(calc.gwp['N2O']))
+
+            st.caption("Fatores alterados (kg/unidade). Deixe em branco o que não muda.")
+            fatores = st.data_editor(
+                pd.DataFrame(columns=["Componente"] + list(GASES)).astype({g: float for g in GASES}),
+                num_rows="dynamic", use_container_width=True, key="editor_fatores",
+                column_config={"Componente": st.column_config.SelectboxColumn(options=sorted(calc.db.get('fatores_base', {})), required=True)}
+            )
+            st.caption("Fatores de transporte alterados (kg CO₂e/t.km).")
+            fatores_tkm = st.data_editor(
+                pd.DataFrame(columns=["Modal", "Fator"]).astype({"Fator": float}),
+                num_rows="dynamic", use_container_width=True, key="editor_tkm",
+                column_config={"Modal": st.column_config.SelectboxColumn(options=modais, required=True)}
+            )
+
+            if st.form_submit_button("Salvar Cenário", type="primary"):
+                if not nome.strip():
+                    st.error("Informe um nome para o cenário.")
+                else:
+                    gwp = {}
+                    if opcao_gwp == "Personalizado":
+                        gwp = {"CH4": gwp_ch4, "N2O": gwp_n2o}
+                    elif opcao_gwp != "Base atual":
+                        gwp = cenarios.GWP_IPCC[opcao_gwp]
+                    alterados = {
+                        linha["Componente"]: {g: float(linha[g]) for g in GASES if pd.notna(linha[g])}
+                        for _, linha in fatores.dropna(subset=["Componente"]).iterrows()
+                    }
+                    st.session_state['cenarios'][nome.strip()] = cenarios.Cenario(
+                        nome.strip(), gwp=gwp, fatores={k: v for k, v in alterados.items() if v},
+                        fatores_tkm={l["Modal"]: float(l["Fator"]) for _, l in fatores_tkm.dropna().iterrows()}
+                    )
+                    st.success(f"Cenário '{nome.strip()}' salvo.")
+
+    if not st.session_state['cenarios']:
+        st.info("Nenhum cenário criado.")
+        return
+    if not any(inventarios.values()):
+        st.info("Nenhum dado lançado ainda.")
+        return
+
+    st.subheader("📊 Comparação (t CO₂e)")
+    lista = list(st.session_state['cenarios'].values())
+    st.dataframe(cenarios.comparar(inventarios, calc, lista), use_container_width=True, hide_index=True,
+                 column_config={c.nome: st.column_config.NumberColumn(format="%.4f") for c in lista})
+
+    st.subheader("Aplicar ao Inventário")
+    st.caption("Grava o cenário nos lançamentos (só as linhas afetadas); a coluna Versão Fatores indica o cenário aplicado.")
+    c1, c2, c3 = st.columns([2, 1, 1])
+    escolhido = c1.selectbox("Cenário:", list(st.session_state['cenarios']))
+    if c2.button("✅ Aplicar"):
+        cenario = st.session_state['cenarios'][escolhido]
+        alteradas = sum(cenarios.aplicar(inv, chave, calc, cenario) for chave, inv in inventarios.items() if inv)
+        st.success(f"{alteradas:,} lançamentos recalculados com '{escolhido}'.")
+    if c3.button("🗑️ Excluir"):
+        del st.session_state['cenarios'][escolhido]
+        st.rerun()
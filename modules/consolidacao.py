@@ -0,0 +1,60 @@
+# modules/consolidacao.py
+import os
+import streamlit as st
+from src import consolidacao, persistencia, tarefas
+from modules.tarefas import acompanhar
+
+def render():
+    st.title("🏢 Consolidação do Grupo")
+    st.markdown("Consolida os inventários salvos das subsidiárias (uma organização por inventário) em totais do grupo.")
+
+    banco = persistencia.get_banco()
+    salvos = banco.listar_inventarios()
+    if not salvos:
+        st.info("Nenhum inventário salvo. Preencha a Introdução e os Escopos de cada organização primeiro.")
+        return
+
+    st.caption("Estrutura societária (CSV): Organização, Participação (%), Controle Operacional (Sim/Não).")
+    arquivo = st.file_uploader("Estrutura societária", type=["csv"], key="upload_estrutura")
+
+    c1, c2, c3 = st.columns(3)
+    abordagem = c1.radio("Abordagem:", list(consolidacao.ABORDAGENS), format_func=consolidacao.ABORDAGENS.get)
+    anos = sorted({ano for _, ano in salvos})
+    anos_escolhidos = c2.multiselect("Anos base:", anos, default=anos)
+    processos = c3.number_input("Processos:", min_value=1, max_value=64, value=os.cpu_count() or 1)
+
+    if arquivo is not None and anos_escolhidos and st.button("🔄 Consolidar", type="primary"):
+        try:
+            estrutura = consolidacao.ler_estrutura(arquivo)
+        except ValueError as e:
+            st.error(f"Estrutura inválida: {e}")
+            return
+        organizacoes = set(estrutura["organizacao"])
+        pares = [(org, ano) for org, ano in salvos if ano in anos_escolhidos and org in organizacoes]
+        sem_inventario = sorted(organizacoes - {org for org, _ in pares})
+        if sem_inventario:
+            st.warning(f"Sem inventário salvo nos anos escolhidos: {', '.join(sem_inventario)}")
+        # Roda em segundo plano; o resultado fica em disco enquanto estrutura e banco não mudarem
+        chave = consolidacao.chave_consolidacao(estrutura, pares, abordagem, banco.caminho)
+        caminho = tarefas.caminho_de('consolidacao', chave, 'json')
+
+        def construir(ao_progresso, pares=pares, estrutura=estrutura, abordagem=abordagem, caminho_banco=banco.caminho):
+            totais = consolidacao.calcular_subsidiarias(pares, caminho_banco, int(processos), ao_progresso)
+            return consolidacao.resultado_para_json(consolidacao.consolidar(totais, estrutura, abordagem))
+
+        tarefas.submeter(caminho, construir)
+        st.session_state['_consolidacao'] = caminho
+
+    tarefa = tarefas.consultar(st.session_state['_consolidacao']) if '_consolidacao' in st.session_state else None
+    if tarefa is not None and tarefa.rodando:
+        acompanhar(tarefa, "Totalizando subsidiárias...")
+    elif tarefa is not None and tarefa.erro:
+        st.error(f"Falha na consolidação: {tarefa.erro}")
+    elif tarefa is not None and tarefa.pronta:
+        resultado = consolidacao.resultado_de_json(tarefa.ler())
+        st.subheader("📊 Totais do Grupo (t CO₂e)")
+        st.dataframe(resultado['grupo'], use_container_width=True, hide_index=True)
+        st.subheader("Subsidiárias (após a abordagem de consolidação)")
+        st.dataframe(resultado['subsidiarias'], use_container_width=True, hide_index=True)
+        st.download_button("📥 Baixar Subsidiárias (CSV)", resultado['subsidiarias'].to_csv(index=False).encode('utf-8-sig'),
+                           file_name="consolidacao_subsidiarias.csv", mime="text/csv")
@@ -1,8 +1,12 @@
 import streamlit as st
-from . import estacionaria, movel  # <--- Importe o novo arquivo movel
+from src.calculadora import get_calculadora
+from . import estacionaria, movel, pasta  # <--- Importe o novo arquivo movel
 
 def render():
     st.title("🏭 Escopo 1: Emissões Diretas")
+
+    with st.expander("📁 Pasta Monitorada (arquivos mensais do ERP)", expanded=False):
+        pasta.render(get_calculadora())
     
     abas = st.tabs([
         "Combustão Estacionária", 
@@ -1,19 +1,23 @@
 import streamlit as st
 import pandas as pd
-from src.calculadora import GHGCalculator
+from src.calculadora import get_calculadora
+from src.inventario import Inventario, com_indice
+from modules import visualizador
+from modules.periodo import campo_periodo
+from . import importacao
 
 def get_calculator():
-    return GHGCalculator()
-
-calc = get_calculator()
+    # Base de fatores compartilhada pelo processo (recarrega se os arquivos mudarem)
+    return get_calculadora()
 
 def render():
+    calc = get_calculator()
     st.title("🏭 Escopo 1: Combustão Estacionária")
     st.markdown("Preencha as informações da Fonte.")
 
     # Inicializa sessão específica para Tabela 3 se não existir
     if 'inventario_t3' not in st.session_state:
-        st.session_state['inventario_t3'] = []
+        st.session_state['inventario_t3'] = Inventario()
 
     # 1. Seleção de Setor e Combustível (Para Tabela 1)
     col_topo1, col_topo2 = st.columns(2)
@@ -37,6 +41,7 @@ def render():
             with c1: reg_fonte = st.text_input("Registro da Fonte (ID)")
             with c2: desc_fonte = st.text_input("Descrição da Fonte")
             with c3: quantidade = st.number_input(f"Quantidade ({unidade_atual})", min_value=0.0)
+            periodo = campo_periodo("estacionaria")
 
             submitted = st.form_submit_button("➕ Adicionar à Tabela 1", type="primary")
 
@@ -61,7 +66,7 @@ def render():
 
                 # Monta o objeto completo
                 novo_lancamento = {
-                    "Registro": reg_fonte, "Descrição": desc_fonte, 
+                    "Registro": reg_fonte, "Descrição": desc_fonte, "Setor": setor,
                     "Combustível": combustivel_selecionado, "Unidade": unidade_atual, "Quantidade Total": quantidade,
                     "Comp. Fóssil": res['componente_fossil'], "Comp. Bio": res['componente_bio'],
                     "Qtd Fóssil": res['qtd_fossil'], "Qtd Bio": res['qtd_bio'],
@@ -69,14 +74,20 @@ def render():
                     "FE Bio CO2 (kg/un)": res['fatores_bio']['CO2'], "FE Bio CH4 (kg/un)": res['fatores_bio']['CH4'], "FE Bio N2O (kg/un)": res['fatores_bio']['N2O'],
                     "Emis. Fóssil CO2 (t)": res['emis_fossil']['CO2'] / 1000, "Emis. Fóssil CH4 (t)": res['emis_fossil']['CH4'] / 1000, "Emis. Fóssil N2O (t)": res['emis_fossil']['N2O'] / 1000,
                     "Emis. Bio CO2 (t)": res['emis_bio']['CO2'] / 1000, "Emis. Bio CH4 (t)": res['emis_bio']['CH4'] / 1000, "Emis. Bio N2O (t)": res['emis_bio']['N2O'] / 1000,
-                    "Total GEE (tCO2e)": res['total_gee'], "Biogênicas (tCO2)": res['total_biogenico']
+                    "Total GEE (tCO2e)": res['total_gee'], "Biogênicas (tCO2)": res['total_biogenico'],
+                    "Versão Fatores": res['versao_fatores'],
+                    "Período": periodo  # Faz parte da chave de registro (ver src/inventario.py)
                 }
-                st.session_state['inventario'].append(novo_lancamento)
-                st.success("Adicionado à Tabela 1!")
+                if com_indice(st.session_state['inventario'], 'inventario').upsert(novo_lancamento):
+                    st.success("Registro já lançado: linha atualizada na Tabela 1!")
+                else:
+                    st.success("Adicionado à Tabela 1!")
+
+    with st.expander("📤 Importar Lançamentos em Lote (CSV/XLSX)", expanded=False):
+        importacao.render(calc, 'estacionaria', 'inventario', setor=setor)
 
     if len(st.session_state['inventario']) > 0:
-        df = pd.DataFrame(st.session_state['inventario'])
-        st.dataframe(df, use_container_width=True)
+        visualizador.render(st.session_state['inventario'], 'inventario', colunas_filtro=["Setor", "Combustível"], remocao=True)
 
     # ========================================================
     # TABELA 2: RESUMO (AUTOMÁTICA)
@@ -109,6 +120,7 @@ def render():
             with col_a:
                 t3_reg = st.text_input("Registro da fonte")
                 t3_desc = st.text_input("Descrição da fonte")
+            periodo_t3 = campo_periodo("t3")
             
             st.markdown("**Emissões Diretas (em toneladas):**")
             c_input1, c_input2, c_input3, c_input4 = st.columns(4)
@@ -134,30 +146,28 @@ def render():
                     "Emissões de CH4 (t)": t3_ch4,
                     "Emissões de N2O (t)": t3_n2o,
                     "Emissões de CO2 biogênico (t)": t3_co2bio,
-                    "Emissões de GEE totais (t CO2e)": total_gee_t3
+                    "Emissões de GEE totais (t CO2e)": total_gee_t3,
+                    "Versão Fatores": calc.versao_fatores,
+                    "Período": periodo_t3
                 }
                 
-                st.session_state['inventario_t3'].append(novo_t3)
-                st.success("Adicionado à Tabela 3!")
+                if com_indice(st.session_state['inventario_t3'], 'inventario_t3').upsert(novo_t3):
+                    st.success("Registro já lançado: linha atualizada na Tabela 3!")
+                else:
+                    st.success("Adicionado à Tabela 3!")
 
     # Visualização da Tabela 3
     if len(st.session_state['inventario_t3']) > 0:
-        df_t3 = pd.DataFrame(st.session_state['inventario_t3'])
-        
-        st.dataframe(
-            df_t3, 
-            use_container_width=True,
+        visualizador.render(
+            st.session_state['inventario_t3'], 'inventario_t3',
             column_config={
                 "Emissões de CO2 fóssil (t)": st.column_config.NumberColumn(format="%.4f"),
                 "Emissões de CH4 (t)": st.column_config.NumberColumn(format="%.4f"),
                 "Emissões de N2O (t)": st.column_config.NumberColumn(format="%.4f"),
                 "Emissões de CO2 biogênico (t)": st.column_config.NumberColumn(format="%.4f"),
                 "Emissões de GEE totais (t CO2e)": st.column_config.NumberColumn(format="%.4f"),
-            }
+            },
+            remocao=True
         )
-        
-        # Totalizador Rápido da Tabela 3
-        total_t3 = df_t3["Emissões de GEE totais (t CO2e)"].sum()
-        st.metric("Total Tabela 3 (tCO₂e)", f"{total_t3:.4f}")
     else:
         st.info("Nenhum dado lançado na Tabela 3.")
\ No newline at end of file
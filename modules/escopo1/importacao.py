@@ -0,0 +1,50 @@
+import streamlit as st
+import pandas as pd
+from src import importacao
+from src.inventario import com_indice
+
+
+def render(calc, tipo, chave_inventario, setor=None):
+    """
+    Bloco de importação em lote (CSV/XLSX) reaproveitado pelas páginas do Escopo 1.
+    tipo: 'estacionaria' ou 'movel'; chave_inventario: Inventario do session_state que recebe as linhas.
+    setor: setor gravado nas linhas da Tabela 1 (estacionária).
+    """
+    colunas = importacao.COLUNAS_ESTACIONARIA if tipo == 'estacionaria' else importacao.COLUNAS_MOVEL
+    st.caption(f"Colunas esperadas: {', '.join(colunas)} (opcional: {', '.join(importacao.COLUNAS_OPCIONAIS)}, ex. 2024-03 ou 2024). "
+               f"O arquivo é lido em blocos de {importacao.TAMANHO_BLOCO:,} linhas.")
+    if tipo == 'movel':
+        st.caption("Opção 1/3: preencha Tipo Veículo (e Ano, se houver). Opção 2: preencha Combustível. Quantidade em litros (Opções 1 e 2) ou km (Opção 3).")
+
+    arquivo = st.file_uploader("Arquivo (CSV ou XLSX)", type=["csv", "xlsx"], key=f"upload_{tipo}")
+    if arquivo is None or not st.button("📤 Importar Arquivo", type="primary", key=f"btn_upload_{tipo}"):
+        return
+
+    barra = st.progress(0.0, text="Importando...")
+    inv = com_indice(st.session_state[chave_inventario], chave_inventario)
+    gravadas = [0, 0]
+
+    def ao_bloco(df_linhas):
+        # Upsert pela chave de registro: reimportar o mesmo arquivo não duplica lançamentos
+        atualizadas, novas = inv.upsert_lote(df_linhas)
+        gravadas[0] += atualizadas
+        gravadas[1] += novas
+
+    def ao_progresso(fracao):
+        barra.progress(fracao, text=f"Importando... {fracao:.0%}")
+
+    try:
+        resumo = importacao.importar_arquivo(arquivo, arquivo.name, tipo, calc, ao_bloco, ao_progresso, setor=setor)
+    except ValueError as e:
+        barra.empty()
+        st.error(f"Arquivo inválido: {e}")
+        return
+
+    barra.progress(1.0, text="Importação concluída")
+    st.success(f"{resumo['validas']:,} linhas importadas: {gravadas[1]:,} novas, {gravadas[0]:,} substituíram lançamentos existentes.")
+    repetidas = resumo['validas'] - sum(gravadas)
+    if repetidas:
+        st.warning(f"{repetidas:,} linhas repetiam a chave ({', '.join(inv.chave_indice)}) de outra linha do arquivo: valeu a última.")
+    if resumo['invalidas']:
+        st.warning(f"{resumo['invalidas']:,} linhas rejeitadas (mostrando até {importacao.MAX_ERROS:,}).")
+        st.dataframe(pd.DataFrame(resumo['erros']), use_container_width=True, hide_index=True)
@@ -1,13 +1,17 @@
 import streamlit as st
 import pandas as pd
-from src.calculadora import GHGCalculator
+from src.calculadora import get_calculadora
+from src.inventario import Inventario, com_indice
+from modules import visualizador
+from modules.periodo import campo_periodo
+from . import importacao, telemetria
 
 def get_calculator():
-    return GHGCalculator()
-
-calc = get_calculator()
+    # Base de fatores compartilhada pelo processo (recarrega se os arquivos mudarem)
+    return get_calculadora()
 
 def render():
+    calc = get_calculator()
     st.markdown("### 🚚 Combustão Móvel")
     st.markdown("Emissões de veículos da frota própria ou controlada.")
 
@@ -20,15 +24,17 @@ def render():
         return
 
     # 2. Abas das Opções
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "Opção 1 (Veículo + Ano)", 
         "Opção 2 (Combustível)", 
-        "Opção 3 (Distância)"
+        "Opção 3 (Distância)",
+        "Importação em Lote",
+        "Telemetria (Opção 3)"
     ])
 
     # Inicializa sessão
     if 'inventario_movel' not in st.session_state:
-        st.session_state['inventario_movel'] = []
+        st.session_state['inventario_movel'] = Inventario()
 
     # --- OPÇÃO 1: VEÍCULO + ANO ---
     with tab1:
@@ -49,7 +55,7 @@ def render():
 
             # Input de Consumo (Mensal ou Anual simplificado num campo só)
             qtd = st.number_input("Consumo Total (Litros/m³)", min_value=0.0, key="op1_qtd")
-            periodo = st.radio("Período do Dado:", ["Anual", "Mensal"], horizontal=True, key="op1_per")
+            periodo = campo_periodo("op1")
 
             if st.form_submit_button("Calcular Opção 1", type="primary"):
                 res = calc.calcular_movel(1, {
@@ -57,7 +63,7 @@ def render():
                     'ano': ano_selecionado if habilita_ano else "N/A",
                     'qtd': qtd
                 })
-                salvar_resultado(res, reg, desc, tipo_veiculo, f"Opção 1 ({periodo})")
+                salvar_resultado(res, reg, desc, tipo_veiculo, "Opção 1", periodo)
 
     # --- OPÇÃO 2: COMBUSTÍVEL ---
     with tab2:
@@ -72,13 +78,14 @@ def render():
             comb_direto = st.selectbox("Combustível:", lista_comb, key="op2_comb")
             
             qtd = st.number_input("Consumo Total (Litros/m³)", min_value=0.0, key="op2_qtd")
+            periodo = campo_periodo("op2")
             
             if st.form_submit_button("Calcular Opção 2", type="primary"):
                 res = calc.calcular_movel(2, {
                     'combustivel_direto': comb_direto,
                     'qtd': qtd
                 })
-                salvar_resultado(res, reg, desc, "Diversos", "Opção 2")
+                salvar_resultado(res, reg, desc, "Diversos", "Opção 2", periodo)
 
     # --- OPÇÃO 3: DISTÂNCIA ---
     with tab3:
@@ -93,6 +100,7 @@ def render():
             ano_selecionado = st.selectbox("Ano da Frota:", calc.get_anos_frota(), disabled=not habilita_ano, key="op3_ano")
             
             dist = st.number_input("Distância Percorrida (km)", min_value=0.0, key="op3_dist")
+            periodo = campo_periodo("op3")
             
             if st.form_submit_button("Calcular Opção 3", type="primary"):
                 res = calc.calcular_movel(3, {
@@ -104,15 +112,23 @@ def render():
                 # Feedback extra da Opção 3
                 st.info(f"⛽ Conversão Estimada: {dist} km ÷ {res['consumo_medio_usado']} km/l = {res['consumo_calculado_litros']:.2f} Litros de {res['combustivel_utilizado']}")
                 
-                salvar_resultado(res, reg, desc, tipo_veiculo, "Opção 3")
+                salvar_resultado(res, reg, desc, tipo_veiculo, "Opção 3", periodo)
+
+    # --- IMPORTAÇÃO EM LOTE (CSV/XLSX) ---
+    with tab4:
+        st.caption("Utilize para importar planilhas com muitos registros da frota.")
+        importacao.render(calc, 'movel', 'inventario_movel')
+
+    # --- TELEMETRIA (ODÔMETRO/GPS -> OPÇÃO 3) ---
+    with tab5:
+        st.caption("Utilize para calcular a distância mensal de cada veículo a partir dos eventos do rastreador.")
+        telemetria.render(calc, 'inventario_movel')
 
     # --- TABELA DE RESULTADOS ---
     st.divider()
     st.subheader("📊 Inventário de Emissões Móveis")
     
     if st.session_state['inventario_movel']:
-        df = pd.DataFrame(st.session_state['inventario_movel'])
-        
         # Formatação das colunas solicitadas
         cols_config = {
             "Emissões totais (t CO2e)": st.column_config.NumberColumn(format="%.4f"),
@@ -121,11 +137,12 @@ def render():
             "FE Fóssil CO2 (kg/l)": st.column_config.NumberColumn(format="%.4f"),
         }
         
-        st.dataframe(df, use_container_width=True, column_config=cols_config)
+        visualizador.render(st.session_state['inventario_movel'], 'inventario_movel', column_config=cols_config,
+                            colunas_filtro=["Tipo Veículo", "Combustível Base", "Método"], remocao=True)
     else:
         st.info("Nenhum registro móvel.")
 
-def salvar_resultado(res, reg, desc, tipo, metodo):
+def salvar_resultado(res, reg, desc, tipo, metodo, periodo=None):
     """Função auxiliar para formatar a saída exatamente como pedido"""
     novo = {
         # Identificação
@@ -154,7 +171,12 @@ def salvar_resultado(res, reg, desc, tipo, metodo):
         
         # Totais
         "Emissões totais (t CO2e)": res['total_gee'],
-        "Emissões de CO2 biogênico (t)": res['total_bio']
+        "Emissões de CO2 biogênico (t)": res['total_bio'],
+        "Ano Fatores": res['chave_ano'],  # Linha de fatores_ch4_n2o_por_ano usada ("-" = padrão do combustível)
+        "Versão Fatores": res['versao_fatores'],
+        "Período": periodo  # "AAAA" ou "AAAA-MM" (ver src/series.py)
     }
-    st.session_state['inventario_movel'].append(novo)
-    st.success("Adicionado com sucesso!")
\ No newline at end of file
+    if com_indice(st.session_state['inventario_movel'], 'inventario_movel').upsert(novo):
+        st.success("Registro já lançado: linha atualizada!")
+    else:
+        st.success("Adicionado com sucesso!")
\ No newline at end of file
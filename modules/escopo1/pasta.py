@@ -0,0 +1,47 @@
+import os
+import streamlit as st
+import pandas as pd
+from src import importacao, ingestao
+
+
+def render(calc):
+    """
+    Ingestão da pasta monitorada (arquivos mensais do ERP) para a Tabela 1 e a combustão móvel.
+    Só arquivos novos ou alterados desde a última varredura são calculados.
+    """
+    st.caption("Subpastas esperadas: " + ", ".join(f"**{p}/** ({chave})" for p, (_, chave) in ingestao.PASTAS.items())
+               + f". Mesmas colunas da importação em lote. O controle fica em `{ingestao.MANIFESTO}` dentro da pasta.")
+    c1, c2 = st.columns(2)
+    relativa = c1.text_input(f"Pasta monitorada (dentro de {ingestao.RAIZ_PASTAS}; vazio = a própria)", key="pasta_ingestao")
+    setor = c2.selectbox("Setor (Tabela 1):", calc.get_setores(), key="setor_ingestao")
+    if not st.button("🔄 Processar Pasta", type="primary"):
+        return
+    # Só pastas dentro da raiz configurada: a sessão não escolhe diretórios arbitrários do servidor
+    try:
+        pasta = ingestao.resolver_pasta(relativa)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    if not os.path.isdir(pasta):
+        st.error(f"Pasta não encontrada: {os.path.join(ingestao.RAIZ_PASTAS, relativa)}")
+        return
+
+    empresa = st.session_state['empresa_dados']
+    inventarios = {chave: st.session_state.get(chave) for _, chave in ingestao.PASTAS.values()}
+    barra = st.progress(0.0, text="Processando...")
+    resumo = ingestao.ingerir(pasta, calc, inventarios, destino=f"{empresa.get('nome', '')}/{empresa.get('ano', '')}",
+                              setor=setor, ao_progresso=lambda f: barra.progress(f, text=f"Processando... {f:.0%}"))
+    barra.empty()
+    for chave, inv in inventarios.items():
+        if inv is not None:
+            st.session_state[chave] = inv  # Inventários criados pela ingestão
+
+    if not resumo['arquivos']:
+        st.info(f"Nenhum arquivo novo ou alterado ({resumo['inalterados']:,} já processados).")
+        return
+    st.success(f"{sum(a['Linhas'] for a in resumo['arquivos']):,} linhas de {len(resumo['arquivos'])} arquivo(s); "
+               f"{resumo['inalterados']:,} arquivo(s) sem mudança.")
+    st.dataframe(pd.DataFrame(resumo['arquivos']), use_container_width=True, hide_index=True)
+    if resumo['erros']:
+        st.warning(f"Linhas rejeitadas (mostrando até {importacao.MAX_ERROS:,}).")
+        st.dataframe(pd.DataFrame(resumo['erros']), use_container_width=True, hide_index=True)
@@ -0,0 +1,59 @@
+import streamlit as st
+import pandas as pd
+from src import telemetria
+from src.importacao import detectar_separador
+from src.inventario import com_indice
+
+
+def render(calc, chave_inventario='inventario_movel'):
+    """
+    Importação de telemetria da frota (JSONL de odômetro/GPS) para a Opção 3.
+    Os eventos são lidos em blocos; só a distância por veículo e mês fica em memória.
+    """
+    st.caption("Um evento JSON por linha com 'veiculo', 'ts' (ISO 8601 ou epoch) e 'odometro_km' e/ou 'lat'/'lon'. "
+               f"Arquivos .jsonl ou .jsonl.gz, lidos em blocos de {telemetria.EVENTOS_POR_BLOCO:,} eventos.")
+    arquivos = st.file_uploader("Arquivos de telemetria", type=["jsonl", "json", "gz"], accept_multiple_files=True, key="upload_telemetria")
+
+    st.caption("Cadastro da frota (opcional): CSV com Registro, Tipo Veículo e Ano. Veículos fora do cadastro usam o tipo padrão.")
+    arq_cadastro = st.file_uploader("Cadastro da frota (CSV)", type=["csv"], key="upload_cadastro_frota")
+    c1, c2 = st.columns(2)
+    tipo_padrao = c1.selectbox("Tipo padrão:", calc.get_tipos_veiculos(), key="tel_tipo")
+    habilita_ano = calc.verifica_ano_habilitado(tipo_padrao)
+    ano_padrao = c2.selectbox("Ano padrão:", calc.get_anos_frota(), disabled=not habilita_ano, key="tel_ano")
+
+    if arquivos and st.button("🛰️ Processar Telemetria", type="primary"):
+        barra = st.progress(0.0, text="Lendo eventos...")
+        total_bytes = sum(a.size for a in arquivos) or 1
+
+        def ao_progresso(eventos):
+            lidos = sum(a.tell() for a in arquivos)
+            barra.progress(min(lidos / total_bytes, 1.0), text=f"{eventos:,} eventos processados...")
+
+        try:
+            acumulador = telemetria.distancias_mensais([(a, a.name) for a in arquivos], ao_progresso)
+        except (ValueError, KeyError) as e:
+            barra.empty()
+            st.error(f"Arquivo inválido: {e}")
+            return
+        barra.progress(1.0, text=f"{acumulador.eventos:,} eventos processados")
+        st.session_state['_telemetria'] = (acumulador.resultado(), dict(acumulador.descartados))
+
+    if '_telemetria' not in st.session_state:
+        return
+    distancias, descartados = st.session_state['_telemetria']
+    st.dataframe(distancias, use_container_width=True, hide_index=True)
+    if any(descartados.values()):
+        st.warning("Eventos descartados: " + ", ".join(f"{k}: {v:,}" for k, v in descartados.items() if v))
+
+    if st.button("➕ Calcular Opção 3 e Adicionar ao Inventário"):
+        cadastro = None
+        if arq_cadastro is not None:
+            cadastro = pd.read_csv(arq_cadastro, sep=detectar_separador(arq_cadastro), dtype=str, encoding='utf-8-sig')
+        try:
+            linhas = telemetria.linhas_opcao3(distancias, calc, cadastro, tipo_padrao, ano_padrao if habilita_ano else "N/A")
+        except KeyError as e:
+            st.error(f"Tipo de veículo não cadastrado: {e}")
+            return
+        atualizadas, novas = com_indice(st.session_state[chave_inventario], chave_inventario).upsert_lote(linhas)
+        del st.session_state['_telemetria']
+        st.success(f"{novas:,} lançamentos (veículo/mês) adicionados, {atualizadas:,} atualizados!")
@@ -0,0 +1,96 @@
+# modules/escopo2.py
+import streamlit as st
+import pandas as pd
+from src.calculadora import get_compartilhado
+from src.escopo2 import CalculadoraEscopo2, ler_leituras, ler_serie, ler_instrumentos
+from src.inventario import Inventario, com_indice
+from modules import visualizador
+
+def get_calculator():
+    # Fatores do SIN compartilhados pelo processo (recarrega se o JSON mudar)
+    return get_compartilhado(CalculadoraEscopo2, 'data/fatores_emissao.json')
+
+def render():
+    calc2 = get_calculator()
+    st.title("⚡ Escopo 2: Energia Elétrica")
+    st.markdown("Emissões da energia elétrica adquirida, pelas abordagens de **localização** e de **mercado**.")
+
+    if 'inventario_escopo2' not in st.session_state:
+        st.session_state['inventario_escopo2'] = Inventario()
+
+    tab1, tab2 = st.tabs(["Consumo Anual", "Leituras de Medidores (Série Temporal)"])
+
+    # --- CONSUMO ANUAL (FATOR MÉDIO DO SIN) ---
+    with tab1:
+        st.caption("Utilize caso possua apenas o consumo total do ano.")
+        with st.form("form_escopo2_anual", clear_on_submit=True):
+            c1, c2, c3 = st.columns(3)
+            instalacao = c1.text_input("Instalação / Unidade Consumidora")
+            ano = c2.selectbox("Ano:", calc2.get_anos())
+            kwh = c3.number_input(f"Consumo Anual ({calc2.unidade_entrada})", min_value=0.0)
+
+            if st.form_submit_button("Calcular Consumo Anual", type="primary") and kwh > 0:
+                leituras = pd.DataFrame({"instalacao": [instalacao], "data_hora": [pd.Timestamp(f"{ano}-01-01")], "kwh": [kwh]})
+                resumo = calc2.resumir(calc2.calcular(leituras), freq="Y")
+                salvar_resumo(resumo, "Anual (média SIN)")
+
+    # --- SÉRIE TEMPORAL (ANUAL, MENSAL OU HORÁRIA) ---
+    with tab2:
+        st.caption("Leituras de medidores (até 15 minutos). Colunas: Instalação, Data/Hora, Consumo (kWh).")
+        arq_leituras = st.file_uploader("Leituras (CSV)", type=["csv"], key="e2_leituras")
+
+        fonte = st.radio("Fatores da rede:", ["Média anual do SIN", "Série mensal (arquivo)", "Série horária (arquivo)"], horizontal=True)
+        arq_serie = None
+        if fonte != "Média anual do SIN":
+            st.caption("Colunas: Início, Fator (tCO2e/MWh).")
+            arq_serie = st.file_uploader("Série de fatores (CSV)", type=["csv"], key="e2_serie")
+
+        st.caption("Abordagem de mercado (opcional): contratos/certificados por instalação. Colunas: Instalação, Fator (tCO2e/MWh).")
+        arq_instr = st.file_uploader("Instrumentos contratuais (CSV)", type=["csv"], key="e2_instr")
+
+        if arq_leituras is not None and st.button("Calcular Leituras", type="primary"):
+            with st.spinner("Calculando..."):
+                serie = None
+                if arq_serie is not None:
+                    serie = ler_serie(arq_serie, "mensal" if "mensal" in fonte else "horaria")
+                instrumentos = ler_instrumentos(arq_instr) if arq_instr is not None else None
+                resultado = calc2.calcular(ler_leituras(arq_leituras), serie=serie, instrumentos=instrumentos)
+                st.session_state['_escopo2_resumo'] = (calc2.resumir(resultado, freq="M"), fonte)
+
+        if '_escopo2_resumo' in st.session_state:
+            resumo, fonte_usada = st.session_state['_escopo2_resumo']
+            k1, k2, k3 = st.columns(3)
+            k1.metric("Consumo (MWh)", f"{resumo['kwh'].sum() / 1000:,.2f}")
+            k2.metric("Localização (tCO₂e)", f"{resumo['tco2e_localizacao'].sum():,.4f}")
+            k3.metric("Mercado (tCO₂e)", f"{resumo['tco2e_mercado'].sum():,.4f}")
+            sem_fator = int(resumo['leituras_sem_fator'].sum())
+            if sem_fator:
+                st.warning(f"⚠️ {sem_fator:,} leituras fora do período da série de fatores (não contabilizadas).")
+            st.dataframe(resumo, use_container_width=True, hide_index=True)
+            if st.button("➕ Adicionar ao Inventário"):
+                salvar_resumo(resumo, fonte_usada)
+                del st.session_state['_escopo2_resumo']
+
+    # --- INVENTÁRIO ---
+    st.divider()
+    st.subheader("📊 Inventário de Escopo 2")
+    inv = st.session_state['inventario_escopo2']
+    if inv:
+        visualizador.render(inv, 'inventario_escopo2', colunas_filtro=["Registro", "Método"], remocao=True)
+    else:
+        st.info("Nenhum registro de Escopo 2.")
+
+def salvar_resumo(resumo, metodo):
+    """Grava o resumo (por instalação e período) no inventário — não as leituras brutas; instalação/período já lançados são substituídos"""
+    com_indice(st.session_state['inventario_escopo2'], 'inventario_escopo2').upsert_lote(pd.DataFrame({
+        "Registro": resumo["instalacao"],
+        "Período": resumo["periodo"],
+        "Método": metodo,
+        "Consumo (MWh)": resumo["kwh"] / 1000,
+        "Emissões localização (t CO2e)": resumo["tco2e_localizacao"],
+        "Emissões mercado (t CO2e)": resumo["tco2e_mercado"],
+        "Leituras": resumo["leituras"],
+        "Leituras sem fator": resumo["leituras_sem_fator"],
+        "Versão Fatores": get_calculator().versao_fatores,
+    }))
+    st.success("Adicionado ao inventário de Escopo 2!")
@@ -0,0 +1,104 @@
+# modules/escopo3.py
+import streamlit as st
+import pandas as pd
+from src.calculadora import get_compartilhado
+from src.escopo3 import CalculadoraTransporte, ResumoTransporte, COLUNAS_TRANSPORTE, processar_arquivo
+from src.importacao import TAMANHO_BLOCO, MAX_ERROS
+from src.inventario import Inventario, com_indice
+from modules import visualizador
+from modules.periodo import campo_periodo
+
+CATEGORIAS = ["Cat. 4 - Transporte e distribuição (upstream)", "Cat. 9 - Transporte e distribuição (downstream)"]
+
+def get_calculator():
+    return get_compartilhado(CalculadoraTransporte, 'data/fatores_emissao.json')
+
+def render():
+    calc3 = get_calculator()
+    st.title("🚚 Escopo 3: Transporte e Distribuição")
+    st.markdown("Emissões do transporte de cargas por terceiros, pelo método de **tonelada-quilômetro** (t.km).")
+
+    if 'inventario_escopo3' not in st.session_state:
+        st.session_state['inventario_escopo3'] = Inventario()
+
+    tab1, tab2 = st.tabs(["Lançamento Manual", "Log de Embarques (Arquivo)"])
+
+    # --- LANÇAMENTO MANUAL ---
+    with tab1:
+        with st.form("form_escopo3", clear_on_submit=True):
+            c1, c2, c3 = st.columns(3)
+            categoria = c1.selectbox("Categoria:", CATEGORIAS)
+            transportadora = c2.text_input("Transportadora")
+            modal = c3.selectbox("Modal:", calc3.get_modais())
+            c4, c5 = st.columns(2)
+            peso = c4.number_input("Peso transportado (t)", min_value=0.0)
+            distancia = c5.number_input("Distância (km)", min_value=0.0)
+            periodo = campo_periodo("escopo3")
+
+            if st.form_submit_button("Calcular Transporte", type="primary") and peso > 0 and distancia > 0:
+                tkm, tco2e = calc3.calcular([modal], [peso], [distancia])
+                resumo = ResumoTransporte()
+                resumo.adicionar(pd.DataFrame({"Categoria": [categoria], "Transportadora": [transportadora], "Modal": [modal],
+                                               "Período": [periodo], "Peso (t)": [peso], "t.km": tkm, "Emissões (t CO2e)": tco2e}))
+                salvar_resumo(resumo.detalhado)
+
+    # --- LOG DE EMBARQUES ---
+    with tab2:
+        st.caption(f"Colunas esperadas: {', '.join(COLUNAS_TRANSPORTE)} (Período opcional). O arquivo é lido em blocos de {TAMANHO_BLOCO:,} linhas "
+                   "e só os totais por categoria, transportadora, modal e período ficam em memória.")
+        arquivo = st.file_uploader("Arquivo (CSV ou XLSX)", type=["csv", "xlsx"], key="upload_escopo3")
+        if arquivo is not None and st.button("📤 Processar Arquivo", type="primary"):
+            barra = st.progress(0.0, text="Processando...")
+            try:
+                resultado = processar_arquivo(arquivo, arquivo.name, calc3,
+                                              lambda f: barra.progress(f, text=f"Processando... {f:.0%}"))
+            except ValueError as e:
+                barra.empty()
+                st.error(f"Arquivo inválido: {e}")
+            else:
+                barra.progress(1.0, text="Processamento concluído")
+                st.session_state['_escopo3_resultado'] = resultado
+
+        if '_escopo3_resultado' in st.session_state:
+            resultado = st.session_state['_escopo3_resultado']
+            resumo = resultado['resumo']
+            st.success(f"{resultado['validas']:,} embarques processados.")
+            if resultado['invalidas']:
+                st.warning(f"{resultado['invalidas']:,} linhas rejeitadas (mostrando até {MAX_ERROS:,}).")
+                st.dataframe(pd.DataFrame(resultado['erros']), use_container_width=True, hide_index=True)
+
+            c1, c2 = st.columns(2)
+            with c1:
+                st.markdown("**Por categoria**")
+                st.dataframe(resumo.por("Categoria"), use_container_width=True, hide_index=True)
+            with c2:
+                st.markdown("**Por modal**")
+                st.dataframe(resumo.por("Modal"), use_container_width=True, hide_index=True)
+            st.markdown("**Por transportadora**")
+            st.dataframe(resumo.por("Transportadora").sort_values("Emissões (t CO2e)", ascending=False),
+                         use_container_width=True, hide_index=True)
+
+            if st.button("➕ Adicionar ao Inventário"):
+                salvar_resumo(resumo.detalhado)
+                del st.session_state['_escopo3_resultado']
+
+    # --- INVENTÁRIO ---
+    st.divider()
+    st.subheader("📊 Inventário de Escopo 3")
+    inv = st.session_state['inventario_escopo3']
+    if inv:
+        visualizador.render(inv, 'inventario_escopo3', colunas_filtro=["Categoria", "Modal"])
+    else:
+        st.info("Nenhum registro de Escopo 3.")
+
+def salvar_resumo(detalhado):
+    """
+    Grava os totais por categoria/transportadora/modal/período — não os embarques individuais.
+    Totais já lançados com a mesma chave são substituídos: reimportar o mesmo log não duplica o Escopo 3.
+    """
+    inv = com_indice(st.session_state['inventario_escopo3'], 'inventario_escopo3')
+    atualizadas, novas = inv.upsert_lote(detalhado.assign(**{"Versão Fatores": get_calculator().versao_fatores}))
+    if atualizadas:
+        st.success(f"Inventário de Escopo 3: {novas:,} totais novos, {atualizadas:,} substituíram totais já lançados.")
+    else:
+        st.success("Adicionado ao inventário de Escopo 3!")
@@ -1,6 +1,8 @@
 # modules/introducao.py
 import streamlit as st
 from datetime import date
+from src import exportacao, persistencia
+from src.inventario import Inventario
 
 def render():
     st.title("📋 Identificação da Organização")
@@ -31,4 +33,25 @@ def render():
                 "telefone": telefone,
                 "data": data_preenchimento
             }
-            st.success("Dados institucionais salvos com sucesso! Avance para os Escopos.")
\ No newline at end of file
+            banco = persistencia.get_banco()
+            banco.salvar_empresa(st.session_state['empresa_dados'])
+            # Sessão vazia + inventário já salvo para a organização/ano: retoma de onde parou
+            if not any(st.session_state.get(chave) for chave in exportacao.ABAS_INVENTARIO):
+                carregar_inventario(banco, nome, ano)
+            st.success("Dados institucionais salvos com sucesso! Avance para os Escopos.")
+
+    # --- INVENTÁRIOS SALVOS ---
+    banco = persistencia.get_banco()
+    salvos = banco.listar_inventarios()
+    if salvos:
+        with st.expander("📂 Abrir Inventário Salvo", expanded=False):
+            escolhido = st.selectbox("Organização / Ano Base", salvos, format_func=lambda s: f"{s[0]} ({s[1]})")
+            if st.button("Abrir Inventário"):
+                st.session_state['empresa_dados'] = banco.carregar_empresa(*escolhido)
+                carregar_inventario(banco, *escolhido)
+                st.success(f"Inventário de {escolhido[0]} ({escolhido[1]}) carregado.")
+
+def carregar_inventario(banco, organizacao, ano):
+    """Substitui os inventários da sessão pelos salvos no banco"""
+    for chave in exportacao.ABAS_INVENTARIO:
+        st.session_state[chave] = persistencia.restaurar(banco, organizacao, ano, chave, Inventario())
\ No newline at end of file
@@ -0,0 +1,15 @@
+# modules/periodo.py
+from datetime import date
+import streamlit as st
+from src import series
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+def campo_periodo(prefixo):
+    """Período do dado de atividade: o ano base inteiro ou um mês dele (gravado na coluna 'Período')"""
+    ano = st.session_state.get('empresa_dados', {}).get('ano') or date.today().year
+    c1, c2 = st.columns(2)
+    tipo = c1.radio("Período do Dado:", ["Anual", "Mensal"], horizontal=True, key=f"{prefixo}_per")
+    mes = c2.selectbox(f"Mês (se Mensal; ano base {ano}):", range(1, 13), format_func=lambda m: MESES[m - 1], key=f"{prefixo}_mes")
+    return series.periodo(ano, mes if tipo == "Mensal" else None)
@@ -1,39 +1,174 @@
 # modules/relatorios.py
 import streamlit as st
 import pandas as pd
-from io import BytesIO
+from src import colunar, exportacao, incerteza, series, tarefas
+from src.calculadora import get_calculadora
+from src.inventario import CHAVES_REGISTRO, TOTAIS_INVENTARIO
+from modules import visualizador
+from modules.tarefas import acompanhar
 
 def render():
     st.title("📊 Relatório Final e Exportação")
     
-    if not st.session_state['inventario']:
+    render_importar_parquet()
+    inventarios = {chave: st.session_state.get(chave) for chave in exportacao.ABAS_INVENTARIO}
+    if not any(inventarios.values()):
         st.info("Nenhum dado lançado ainda.")
         return
 
-    # Transforma lista de dicionários em DataFrame
-    df_dados = pd.DataFrame(st.session_state['inventario'])
-    
     st.subheader("Visualização dos Dados")
-    st.dataframe(df_dados, use_container_width=True)
-    
-    # --- Geração do Excel Complexo ---
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        
-        # 1. Aba de Introdução (Capa)
-        dados_intro = st.session_state['empresa_dados']
-        df_intro = pd.DataFrame(list(dados_intro.items()), columns=['Campo', 'Valor'])
-        df_intro.to_excel(writer, sheet_name='Introdução', index=False)
-        
-        # 2. Aba de Inventário (Dados)
-        df_dados.to_excel(writer, sheet_name='Inventário Completo', index=False)
-        
-    excel_data = output.getvalue()
+    abas = [chave for chave in exportacao.ABAS_INVENTARIO if inventarios[chave]]
+    for chave, aba in zip(abas, st.tabs([exportacao.ABAS_INVENTARIO[chave] for chave in abas])):
+        with aba:
+            visualizador.render(inventarios[chave], chave, prefixo="relatorio_")
+
+    render_tendencias(inventarios)
+    render_incerteza(inventarios)
+    render_planilha(inventarios)
+    render_parquet(inventarios)
+
+
+def render_planilha(inventarios):
+    """
+    Geração do Excel em segundo plano: a página só acompanha o progresso.
+    O arquivo fica em disco pelo hash do conteúdo e da versão dos fatores, então
+    o mesmo inventário nunca é exportado duas vezes (nem entre sessões).
+    """
+    empresa = st.session_state['empresa_dados']
+    chave = tarefas.chave_relatorio('xlsx', empresa, inventarios, get_calculadora().versao_fatores)
+    caminho = tarefas.caminho_de('inventario', chave, 'xlsx')
+    tarefa = tarefas.consultar(caminho)
+    if tarefa is None or tarefa.erro:
+        if tarefa is not None:
+            st.error(f"Falha ao gerar a planilha: {tarefa.erro}")
+        if not st.button("⚙️ Preparar Planilha (XLSX)"):
+            return
+        # Cópias: a sessão pode continuar lançando enquanto a planilha é escrita
+        copias = {k: inv.copia() if inv is not None else None for k, inv in inventarios.items()}
+        dados = dict(empresa)
+        tarefa = tarefas.submeter(caminho, lambda ao_progresso: exportacao.gerar_excel(dados, copias, ao_progresso))
+    if tarefa.rodando:
+        acompanhar(tarefa, "Gerando planilha...")
+        return
+    if not tarefa.pronta:
+        st.error(f"Falha ao gerar a planilha: {tarefa.erro}")
+        return
 
     st.download_button(
         label="📥 Baixar Planilha Completa (XLSX)",
-        data=excel_data,
+        data=tarefa.ler(),
         file_name=f"Inventario_{st.session_state['empresa_dados'].get('nome', 'Empresa')}.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         type="primary"
-    )
\ No newline at end of file
+    )
+
+
+
+def render_parquet(inventarios):
+    """Pacote Parquet (ZIP com empresa e um arquivo por inventário), também em segundo plano e em cache"""
+    if not colunar.disponivel():
+        st.caption("Exportação Parquet indisponível: instale o pacote pyarrow.")
+        return
+    empresa = st.session_state['empresa_dados']
+    chave = tarefas.chave_relatorio('parquet', empresa, inventarios, get_calculadora().versao_fatores)
+    caminho = tarefas.caminho_de('inventario', chave, 'zip')
+    tarefa = tarefas.consultar(caminho)
+    if tarefa is None or tarefa.erro:
+        if tarefa is not None:
+            st.error(f"Falha ao gerar o pacote Parquet: {tarefa.erro}")
+        if not st.button("⚙️ Preparar Pacote Parquet"):
+            return
+        copias = {k: inv.copia() if inv is not None else None for k, inv in inventarios.items()}
+        dados = dict(empresa)
+        tarefa = tarefas.submeter(caminho, lambda ao_progresso: colunar.gerar_pacote(dados, copias, ao_progresso))
+    if tarefa.rodando:
+        acompanhar(tarefa, "Gerando Parquet...")
+        return
+    if not tarefa.pronta:
+        st.error(f"Falha ao gerar o pacote Parquet: {tarefa.erro}")
+        return
+
+    st.download_button(
+        label="📥 Baixar Pacote Parquet (ZIP)",
+        data=tarefa.ler(),
+        file_name=f"Inventario_{empresa.get('nome', 'Empresa')}_parquet.zip",
+        mime="application/zip",
+    )
+
+
+def render_importar_parquet():
+    """Recarrega um pacote Parquet exportado: substitui os inventários e a Introdução da sessão"""
+    if not colunar.disponivel():
+        return
+    with st.expander("📂 Carregar Inventário (Parquet)"):
+        arquivo = st.file_uploader("Pacote ZIP ou arquivo .parquet exportado por esta ferramenta", type=["zip", "parquet"],
+                                   key="upload_parquet")
+        if arquivo is None or not st.button("Carregar", type="primary"):
+            return
+        try:
+            empresa, carregados = colunar.ler_pacote(arquivo)
+        except Exception as e:
+            st.error(f"Não foi possível ler o arquivo: {e}")
+            return
+        desconhecidos = sorted(set(carregados) - set(exportacao.ABAS_INVENTARIO))
+        if desconhecidos:
+            st.warning(f"Inventários ignorados (desconhecidos): {', '.join(map(str, desconhecidos))}")
+        for chave, inv in carregados.items():
+            if chave in exportacao.ABAS_INVENTARIO:
+                # O banco passa a refletir o arquivo: a próxima sincronização regrava o escopo
+                inv.salvas_desatualizadas = True
+                st.session_state[chave] = inv
+        if empresa:
+            st.session_state['empresa_dados'] = empresa
+        st.success(f"{sum(len(inv) for inv in carregados.values()):,} lançamentos carregados.")
+
+
+def render_tendencias(inventarios):
+    """Totais por mês, trimestre ou ano (coluna Período) e variação sobre o mesmo período do ano anterior"""
+    with st.expander("📈 Tendência por Período"):
+        rotulos = {freq: rotulo for freq, (rotulo, _, _) in series.FREQUENCIAS.items()}
+        freq = st.radio("Frequência", list(rotulos), format_func=rotulos.get, horizontal=True, key="tendencia_freq")
+        totais = series.consolidado(inventarios, TOTAIS_INVENTARIO, freq)
+        if totais.empty:
+            st.info("Nenhum lançamento com Período nesta frequência. Informe o mês/ano nos formulários ou na coluna Período da importação.")
+            return
+        st.line_chart(totais.set_axis(totais.index.to_timestamp()))
+        tabela = totais.join(series.variacao_anual(totais, freq).add_suffix(" (Δ% a/a)"))
+        st.dataframe(tabela.set_axis(tabela.index.astype(str)), use_container_width=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.2f") for c in tabela.columns})
+        fora = sum(series.series_de(inv).sem_detalhe(colunas[0][1], freq)[0]
+                   for chave, colunas in TOTAIS_INVENTARIO.items() if (inv := inventarios.get(chave)))
+        if fora:
+            st.caption(f"{fora:,} lançamentos sem período ou com período mais longo que a frequência escolhida ficam fora do gráfico.")
+
+        com_fontes = [chave for chave in CHAVES_REGISTRO if inventarios.get(chave) and chave in TOTAIS_INVENTARIO]
+        if not com_fontes:
+            return
+        chave = st.selectbox("Maiores fontes do inventário", com_fontes, format_func=exportacao.ABAS_INVENTARIO.get, key="tendencia_inv")
+        coluna, fonte = TOTAIS_INVENTARIO[chave][0][1], CHAVES_REGISTRO[chave][0]
+        por_fonte = series.series_de(inventarios[chave]).totais(coluna, freq, por=fonte)
+        if not por_fonte.empty:
+            maiores = por_fonte.sum().nlargest(10).index
+            st.line_chart(por_fonte[maiores].set_axis(por_fonte.index.to_timestamp()))
+
+
+def render_incerteza(inventarios):
+    """Monte Carlo sobre os inventários lançados: faixas de 95% por escopo e por gás"""
+    with st.expander("🎲 Análise de Incerteza (Monte Carlo)"):
+        st.caption("Incerteza = meia-largura do intervalo de 95% em % do valor. "
+                   "Fatores iguais são sorteados uma vez por amostra para todas as linhas que os usam.")
+        n_amostras = st.select_slider("Amostras", options=[1_000, 10_000, 50_000, 100_000], value=10_000)
+        cols = st.columns(3)
+        incertezas = {}
+        for i, (tipo, (distribuicao, meia_largura)) in enumerate(incerteza.INCERTEZAS_PADRAO.items()):
+            with cols[i % 3]:
+                pct = st.number_input(f"{tipo.capitalize()} (±%, {distribuicao})", min_value=0.0, value=meia_largura, step=5.0, key=f"mc_{tipo}")
+            incertezas[tipo] = (distribuicao, pct)
+        if not st.button("▶️ Rodar Simulação"):
+            return
+        barra = st.progress(0.0, text="Sorteando amostras...")
+        _, resumo = incerteza.simular(inventarios, get_calculadora().gwp, n_amostras, incertezas,
+                                      ao_progresso=lambda f: barra.progress(f, text="Sorteando amostras..."))
+        barra.empty()
+        st.dataframe(resumo, use_container_width=True, hide_index=True,
+                     column_config={c: st.column_config.NumberColumn(format="%.2f") for c in resumo.columns if c not in ("Categoria", "Gás")})
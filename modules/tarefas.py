@@ -0,0 +1,10 @@
+# modules/tarefas.py
+import streamlit as st
+
+@st.fragment(run_every=1.0)
+def acompanhar(tarefa, texto):
+    """Barra de progresso de uma tarefa em segundo plano; recarrega a página quando ela termina"""
+    if tarefa.rodando:
+        st.progress(tarefa.progresso, text=f"{texto} {tarefa.progresso:.0%}")
+    else:
+        st.rerun()
@@ -0,0 +1,59 @@
+# modules/visualizador.py
+import math
+import streamlit as st
+from src.consulta import TAMANHOS_PAGINA, consulta_de
+from src.inventario import TOTAIS_INVENTARIO
+from src.inventario import CHAVES_REGISTRO, com_indice
+
+def render(inv, chave, column_config=None, colunas_filtro=(), prefixo="", remocao=False):
+    """
+    Tabela paginada do inventário: busca, filtros, ordenação e página feitos no servidor.
+    Só a página visível vai para o navegador; os totais cobrem todas as linhas filtradas.
+    prefixo separa os widgets quando o mesmo inventário aparece em mais de uma página.
+    remocao mostra a remoção de lançamentos pela chave de registro (CHAVES_REGISTRO).
+    """
+    consulta = consulta_de(inv)
+    chave_widget = prefixo + chave
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    texto = c1.text_input("🔎 Buscar", key=f"busca_{chave_widget}", placeholder="Texto em qualquer coluna")
+    ordenar_por = c2.selectbox("Ordenar por", [""] + inv.colunas, key=f"ordem_{chave_widget}",
+                               format_func=lambda c: c or "Ordem de lançamento")
+    crescente = c3.radio("Sentido", ["↑", "↓"], key=f"sentido_{chave_widget}", horizontal=True) == "↑"
+    tamanho = c4.selectbox("Linhas", TAMANHOS_PAGINA, index=1, key=f"tamanho_{chave_widget}")
+
+    filtros = {}
+    colunas_filtro = [c for c in colunas_filtro if c in inv.colunas]
+    if colunas_filtro:
+        for coluna, col in zip(colunas_filtro, st.columns(len(colunas_filtro))):
+            filtros[coluna] = col.multiselect(coluna, consulta.valores(coluna), key=f"filtro_{chave_widget}_{coluna}")
+
+    linhas = consulta.ordenar(consulta.filtrar(texto, filtros), ordenar_por, crescente)
+    paginas = max(1, math.ceil(len(linhas) / tamanho))
+    if st.session_state.get(f"pagina_{chave_widget}", 1) > paginas:
+        st.session_state[f"pagina_{chave_widget}"] = paginas  # O filtro encolheu o resultado
+    p1, p2 = st.columns([1, 4])
+    numero = p1.number_input("Página", min_value=1, max_value=paginas, value=1, key=f"pagina_{chave_widget}")
+    p2.caption(f"{len(linhas):,} de {len(inv):,} lançamentos · página {numero} de {paginas}")
+    st.dataframe(consulta.pagina(linhas, numero, tamanho), use_container_width=True, column_config=column_config)
+
+    totais = consulta.totais(linhas, [coluna for _, coluna in TOTAIS_INVENTARIO.get(chave, [])])
+    if totais:
+        for (coluna, total), col in zip(totais.items(), st.columns(len(totais))):
+            col.metric(f"Total {coluna}", f"{total:,.4f}")
+
+    if remocao and chave in CHAVES_REGISTRO:
+        render_remocao(inv, chave, chave_widget)
+
+
+def render_remocao(inv, chave, chave_widget):
+    """Apaga um lançamento pela chave (busca no índice hash do inventário, sem varrer as linhas)"""
+    with st.expander("🗑️ Remover Lançamento"):
+        colunas = CHAVES_REGISTRO[chave]
+        valores = [col.text_input(coluna + (" (opcional)" if i else ""), key=f"remover_{chave_widget}_{coluna}")
+                   for i, (coluna, col) in enumerate(zip(colunas, st.columns(len(colunas))))]
+        if not st.button("Remover", key=f"btn_remover_{chave_widget}"):
+            return
+        if com_indice(inv, chave).remover_chave([v.strip() for v in valores]):
+            st.toast("Lançamento removido.")
+            st.rerun()
+        st.warning("Nenhum lançamento com essa chave.")
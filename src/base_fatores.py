@@ -0,0 +1,266 @@
+"""
+Base de fatores compilada: valida fatores.json + lista_comb.csv e grava um binário versionado.
+
+    python -m src.calculadora compilar --saida data/fatores.bin
+
+Layout do arquivo (little-endian):
+    MAGICO (8 bytes) | tamanho do cabeçalho (uint64) | cabeçalho JSON | arrays alinhados em 64 bytes
+O cabeçalho traz versão, hash das fontes e a posição/dtype/forma de cada array. Textos ficam
+numa tabela de strings (um blob UTF-8 + offsets), referenciados por índice nos arrays numéricos.
+A carga é um mmap + np.frombuffer: nada é copiado nem recalculado.
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.catalogo import CatalogoCombustiveis
+from src.coeficientes import TabelaCoeficientes, COLUNAS, GASES
+
+MAGICO = b"GHGFAT01"
+ALINHAMENTO = 64
+COLUNAS_CSV = ['Combustível', 'Unidade', 'Combustível fóssil', 'biocombustível']
+
+
+class ErroBaseFatores(ValueError):
+    """Fonte de fatores ausente, ilegível ou inconsistente; 'problemas' lista cada item"""
+
+    def __init__(self, problemas):
+        self.problemas = list(problemas)
+        super().__init__("; ".join(self.problemas))
+
+
+# --- FONTES (JSON + CSV) ---
+def ler_fontes(data_path, csv_path):
+    """Lê e valida as fontes. Retorna (db, df_comb, hash sha256, avisos); erros viram ErroBaseFatores"""
+    conteudos = []
+    for caminho in (data_path, csv_path):
+        try:
+            with open(caminho, 'rb') as f:
+                conteudos.append(f.read())
+        except OSError as e:
+            raise ErroBaseFatores([f"{caminho}: {e.strerror or e}"]) from e
+    try:
+        db = json.loads(conteudos[0].decode('utf-8'))
+    except ValueError as e:
+        raise ErroBaseFatores([f"{data_path}: JSON inválido ({e})"]) from e
+    try:
+        df_comb = pd.read_csv(io.BytesIO(conteudos[1]), encoding='utf-8')
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ErroBaseFatores([f"{csv_path}: CSV inválido ({e})"]) from e
+    avisos = validar(db, df_comb)
+    return db, df_comb, hash_fontes(conteudos), avisos
+
+
+def hash_fontes(conteudos):
+    h = hashlib.sha256()
+    for conteudo in conteudos:
+        h.update(conteudo)
+    return h.hexdigest()
+
+
+def versao_de(hash_hex):
+    """Versão curta gravada nos lançamentos (12 primeiros dígitos do sha256 das fontes)"""
+    return hash_hex[:12]
+
+
+def validar(db, df_comb):
+    """
+    Confere a estrutura e os números das fontes. Erros (que impedem o cálculo) levantam
+    ErroBaseFatores; situações que hoje resultam em fator zero voltam como avisos.
+    """
+    erros, avisos = [], []
+
+    def numero(valor, onde, minimo=0.0):
+        if not isinstance(valor, (int, float)) or isinstance(valor, bool) or not np.isfinite(valor) or valor < minimo:
+            erros.append(f"{onde}: esperado número >= {minimo:g}, encontrado {valor!r}")
+
+    if not isinstance(db, dict):
+        raise ErroBaseFatores(["fatores.json: o conteúdo deve ser um objeto"])
+    gwp = db.get('gwp')
+    if not isinstance(gwp, dict):
+        erros.append("gwp: ausente")
+    else:
+        for g in GASES:
+            numero(gwp.get(g), f"gwp.{g}", minimo=1e-12)
+
+    fatores_base = db.get('fatores_base', {})
+    for nome, fatores in fatores_base.items():
+        if not isinstance(fatores, dict):
+            erros.append(f"fatores_base.{nome}: esperado objeto com {', '.join(GASES)}")
+            continue
+        for g in GASES:
+            numero(fatores.get(g), f"fatores_base.{nome}.{g}")
+
+    for nome, mistura in db.get('combustao_estacionaria', {}).items():
+        ff, fb = mistura.get('fracao_fossil', 1.0), mistura.get('fracao_bio', 0.0)
+        numero(ff, f"combustao_estacionaria.{nome}.fracao_fossil")
+        numero(fb, f"combustao_estacionaria.{nome}.fracao_bio")
+        if all(isinstance(v, (int, float)) for v in (ff, fb)) and abs(ff + fb - 1.0) > 1e-6:
+            erros.append(f"combustao_estacionaria.{nome}: frações somam {ff + fb:g} (esperado 1)")
+
+    movel = db.get('combustao_movel', {})
+    for ano, fatores in movel.get('fatores_ch4_n2o_por_ano', {}).items():
+        if isinstance(fatores, dict):
+            for g in ("CH4", "N2O"):
+                numero(fatores.get(g), f"fatores_ch4_n2o_por_ano.{ano}.{g}")
+
+    faltando = [c for c in COLUNAS_CSV if c not in df_comb.columns]
+    if faltando:
+        erros.append(f"lista_comb.csv: colunas ausentes ({', '.join(faltando)})")
+    elif df_comb['Combustível'].isna().any():
+        erros.append("lista_comb.csv: há linhas sem nome de combustível")
+
+    if erros:
+        raise ErroBaseFatores(erros)
+
+    catalogo = CatalogoCombustiveis(df_comb, db)
+    for nome, veiculo in movel.get('frota_veiculos', {}).items():
+        numero(veiculo.get('consumo_medio_kml'), f"frota_veiculos.{nome}.consumo_medio_kml", minimo=1e-12)
+        if veiculo.get('combustivel_associado') not in catalogo:
+            erros.append(f"frota_veiculos.{nome}: combustível '{veiculo.get('combustivel_associado')}' não está no catálogo")
+    if erros:
+        raise ErroBaseFatores(erros)
+
+    duplicados = df_comb['Combustível'][df_comb['Combustível'].duplicated()].unique()
+    if len(duplicados):
+        avisos.append(f"lista_comb.csv: combustíveis repetidos (vale a primeira linha): {', '.join(map(str, duplicados))}")
+    sem_fator = sorted({c for par in catalogo.componentes.values() for c in par if c != "-" and c not in fatores_base})
+    if sem_fator:
+        avisos.append(f"Componentes sem fatores_base (emissão zero): {', '.join(sem_fator)}")
+    return avisos
+
+
+# --- COMPILAÇÃO ---
+def compilar(data_path='data/fatores.json', csv_path='data/lista_comb.csv', destino='data/fatores.bin'):
+    """Valida as fontes e grava o binário. Retorna {'versao', 'hash', 'avisos', 'bytes'}"""
+    db, df_comb, hash_hex, avisos = ler_fontes(data_path, csv_path)
+    catalogo = CatalogoCombustiveis(df_comb, db)
+    tabela = TabelaCoeficientes(db, catalogo, db['gwp'])
+    itens = tabela.itens()
+    chaves, vetores = zip(*itens) if itens else ((), ())
+
+    textos = _TabelaTextos()
+    nomes = list(catalogo.componentes)
+    no_csv = set(catalogo.nomes)
+    arrays = {
+        'cat_nome': np.array([textos.id(n) for n in nomes], dtype=np.int32),
+        'cat_unidade': np.array([textos.id(catalogo.unidades[n]) if n in catalogo.unidades else -1 for n in nomes], dtype=np.int32),
+        'cat_componentes': np.array([[textos.id(c) for c in catalogo.componentes[n]] for n in nomes], dtype=np.int32).reshape(-1, 2),
+        'cat_fracoes': np.array([catalogo.fracoes[n] for n in nomes], dtype=np.float64).reshape(-1, 2),
+        'cat_no_csv': np.array([n in no_csv for n in nomes], dtype=np.bool_),
+        'coef_chave': np.array([[textos.id(c), textos.id(a)] for c, a in chaves], dtype=np.int32).reshape(-1, 2),
+        'coef_matriz': np.vstack(vetores) if vetores else np.zeros((0, len(COLUNAS))),
+        'db_json': np.frombuffer(json.dumps(db, ensure_ascii=False).encode('utf-8'), dtype=np.uint8),
+    }
+    arrays['textos_offsets'], arrays['textos_blob'] = textos.arrays()
+
+    cabecalho = {
+        'versao': versao_de(hash_hex), 'hash': hash_hex,
+        'compilado_em': datetime.now().isoformat(timespec='seconds'),
+        'fontes': [os.path.basename(data_path), os.path.basename(csv_path)],
+        'colunas': list(COLUNAS), 'avisos': avisos, 'arrays': {},
+    }
+    # Posições relativas ao início da área de dados (logo após o cabeçalho, alinhada)
+    posicao = 0
+    for nome, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[nome] = arr
+        cabecalho['arrays'][nome] = [posicao, arr.dtype.str, list(arr.shape)]
+        posicao = _alinha(posicao + arr.nbytes)
+    bruto = json.dumps(cabecalho, ensure_ascii=False).encode('utf-8')
+    inicio_dados = _alinha(len(MAGICO) + 8 + len(bruto))
+
+    temporario = destino + ".tmp"
+    with open(temporario, 'wb') as f:
+        f.write(MAGICO + struct.pack("<Q", len(bruto)) + bruto)
+        for nome, arr in arrays.items():
+            f.seek(inicio_dados + cabecalho['arrays'][nome][0])
+            f.write(arr.tobytes())
+        f.truncate(inicio_dados + posicao)
+    os.replace(temporario, destino)  # Leitores nunca veem um arquivo pela metade
+    return {'versao': cabecalho['versao'], 'hash': hash_hex, 'avisos': avisos, 'bytes': inicio_dados + posicao}
+
+
+def _alinha(n):
+    return (n + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+class _TabelaTextos:
+    def __init__(self):
+        self._ids = {}
+
+    def id(self, texto):
+        return self._ids.setdefault(str(texto), len(self._ids))
+
+    def arrays(self):
+        codificados = [t.encode('utf-8') for t in self._ids]
+        offsets = np.zeros(len(codificados) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(c) for c in codificados])
+        return offsets, np.frombuffer(b"".join(codificados) or b"\0", dtype=np.uint8)
+
+
+# --- CARGA ---
+class BaseCompilada:
+    """Binário aberto por mmap; arrays são visões somente leitura do arquivo"""
+
+    def __init__(self, caminho):
+        with open(caminho, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGICO)] != MAGICO:
+            raise ErroBaseFatores([f"{caminho}: não é uma base de fatores compilada"])
+        tamanho, = struct.unpack_from("<Q", self._mmap, len(MAGICO))
+        inicio = len(MAGICO) + 8
+        cabecalho = json.loads(self._mmap[inicio:inicio + tamanho].decode('utf-8'))
+        inicio_dados = _alinha(inicio + tamanho)
+        if cabecalho['colunas'] != list(COLUNAS):
+            raise ErroBaseFatores([f"{caminho}: compilado com outro layout de coeficientes; recompile"])
+        self.caminho = caminho
+        self.versao = cabecalho['versao']
+        self.hash = cabecalho['hash']
+        self.avisos = cabecalho['avisos']
+        self.compilado_em = cabecalho['compilado_em']
+        self.arrays = {
+            nome: np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=int(np.prod(forma)), offset=inicio_dados + pos).reshape(forma)
+            for nome, (pos, dtype, forma) in cabecalho['arrays'].items()
+        }
+
+    def textos(self):
+        offsets = self.arrays['textos_offsets'].tolist()
+        blob = bytes(self.arrays['textos_blob'])
+        return [blob[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def db(self):
+        return json.loads(bytes(self.arrays['db_json']).decode('utf-8'))
+
+    def catalogo(self, textos=None):
+        textos = textos or self.textos()
+        a = self.arrays
+        nomes = [textos[i] for i in a['cat_nome'].tolist()]
+        return CatalogoCombustiveis.de_listas(
+            nomes=[n for n, csv in zip(nomes, a['cat_no_csv'].tolist()) if csv],
+            unidades={n: textos[u] for n, u in zip(nomes, a['cat_unidade'].tolist()) if u >= 0},
+            componentes={n: (textos[f], textos[b]) for n, (f, b) in zip(nomes, a['cat_componentes'].tolist())},
+            fracoes={n: tuple(fr) for n, fr in zip(nomes, a['cat_fracoes'].tolist())},
+        )
+
+    def vetores(self, textos=None):
+        """{(combustível, chave do ano): linha da matriz de coeficientes}"""
+        textos = textos or self.textos()
+        matriz = self.arrays['coef_matriz']
+        return {(textos[c], textos[a]): matriz[i] for i, (c, a) in enumerate(self.arrays['coef_chave'].tolist())}
+
+
+def hash_das_fontes(data_path, csv_path):
+    """sha256 das fontes, para saber se um binário compilado ainda corresponde a elas"""
+    conteudos = []
+    for caminho in (data_path, csv_path):
+        with open(caminho, 'rb') as f:
+            conteudos.append(f.read())
+    return hash_fontes(conteudos)
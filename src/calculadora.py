@@ -1,39 +1,64 @@
-import json
+import hashlib
+import numpy as np
 import pandas as pd
 import os
+import threading
+from src import base_fatores
+from src.catalogo import CatalogoCombustiveis
+from src.coeficientes import TabelaCoeficientes, COLUNAS, POS, GASES, SEM_ANO
+from src.inventario import Inventario
+
+# Totais correntes da Tabela 2: nome do agregado -> (coluna do componente, colunas somadas)
+TABELA2_AGREGADOS = {
+    'tabela2_fossil': ("Comp. Fóssil", ["Qtd Fóssil", "Emis. Fóssil CO2 (t)", "Emis. Fóssil CH4 (t)", "Emis. Fóssil N2O (t)"]),
+    'tabela2_bio': ("Comp. Bio", ["Qtd Bio", "Emis. Bio CO2 (t)", "Emis. Bio CH4 (t)", "Emis. Bio N2O (t)"]),
+}
 
 class GHGCalculator:
     def __init__(self, data_path='data/fatores.json', csv_path='data/lista_comb.csv'):
-        if os.path.exists(data_path):
-            with open(data_path, 'r', encoding='utf-8') as f:
-                self.db = json.load(f)
-        else:
-            self.db = {"gwp": {"CO2": 1}, "combustao_movel": {}}
-        
-        try:
-            self.df_comb = pd.read_csv(csv_path, encoding='utf-8')
-        except:
-            self.df_comb = pd.DataFrame()
-            
-        self.gwp = self.db.get('gwp', {"CO2": 1, "CH4": 28, "N2O": 265})
+        # Fontes ausentes ou inválidas levantam base_fatores.ErroBaseFatores (sem base vazia silenciosa)
+        self.db, self.df_comb, hash_fontes, self.avisos = base_fatores.ler_fontes(data_path, csv_path)
+        self.versao_fatores = base_fatores.versao_de(hash_fontes)
+        self.gwp = self.db['gwp']
+        self.catalogo = CatalogoCombustiveis(self.df_comb, self.db)
+        self._coeficientes = None
+
+    @classmethod
+    def de_base_compilada(cls, base):
+        """Calculadora a partir do binário de base_fatores.compilar (caminho ou BaseCompilada aberta)"""
+        if not isinstance(base, base_fatores.BaseCompilada):
+            base = base_fatores.BaseCompilada(base)
+        textos = base.textos()
+        calc = cls.__new__(cls)
+        calc.db = base.db()
+        calc.df_comb = None
+        calc.avisos = base.avisos
+        calc.versao_fatores = base.versao
+        calc.gwp = calc.db['gwp']
+        calc.catalogo = base.catalogo(textos)
+        calc._coeficientes = TabelaCoeficientes(calc.db, calc.catalogo, calc.gwp, vetores=base.vetores(textos))
+        return calc
+
+    @property
+    def coeficientes(self):
+        """Tabela de coeficientes por unidade (montada no primeiro uso)"""
+        if self._coeficientes is None:
+            self._coeficientes = TabelaCoeficientes(self.db, self.catalogo, self.gwp)
+        return self._coeficientes
+
+    def invalidar_coeficientes(self):
+        """Chamar sempre que self.db ou self.gwp forem alterados"""
+        self._coeficientes = None
 
     # --- MÉTODOS GERAIS ---
     def get_setores(self):
         return ["Energia", "Manufatura", "Comercial", "Residencial/Agri"]
 
     def get_combustiveis_estacionaria(self):
-        return self.df_comb['Combustível'].unique().tolist() if not self.df_comb.empty else []
+        return list(self.catalogo.nomes)
 
     def get_unidade(self, nome_combustivel):
-        if not self.df_comb.empty:
-            item = self.df_comb[self.df_comb['Combustível'] == nome_combustivel]
-            if not item.empty: return item.iloc[0]['Unidade']
-        return "unidade"
-
-    def _get_fator_do_db(self, nome_tecnico):
-        if nome_tecnico == "-" or 'fatores_base' not in self.db or nome_tecnico not in self.db['fatores_base']:
-            return {"CO2": 0, "CH4": 0, "N2O": 0}
-        return self.db['fatores_base'][nome_tecnico]
+        return self.catalogo.get_unidade(nome_combustivel)
 
     # --- MÉTODOS MÓVEIS (NOVOS) ---
     def get_tipos_veiculos(self):
@@ -45,6 +70,10 @@ class GHGCalculator:
         dados = self.db['combustao_movel']['frota_veiculos'].get(tipo_veiculo, {})
         return dados.get('permite_ano', True)
 
+    def _get_composicao(self, combustivel_nome):
+        """Retorna (fracao_fossil, fracao_bio, comp_fossil, comp_bio) do combustível"""
+        return self.catalogo.get_composicao(combustivel_nome)
+
     def get_anos_frota(self):
         return ["2023", "2022", "2021", "2020", "Anterior a 2020"]
 
@@ -80,72 +109,25 @@ class GHGCalculator:
 
         # --- CÁLCULO DE EMISSÕES (Baseado no Combustível Identificado) ---
         # 1. Identifica componentes (Igual estacionária)
-        # Tenta pegar do JSON a mistura
-        mistura = self.db.get('combustao_estacionaria', {}).get(combustivel_nome, {})
-        if not mistura:
-             # Fallback: tenta achar no CSV se não tiver no JSON de misturas
-             # (Simplificado para o exemplo móvel: assume valores do JSON)
-             fracao_f = 1.0; fracao_b = 0.0
-             comp_fossil = combustivel_nome; comp_bio = "-"
-        else:
-            fracao_f = mistura.get('fracao_fossil', 1.0)
-            fracao_b = mistura.get('fracao_bio', 0.0)
-            # Nomes técnicos hardcoded para o exemplo (ideal vir do CSV)
-            if "Gasolina C" in combustivel_nome:
-                comp_fossil = "Gasolina Automotiva (pura)"; comp_bio = "Etanol Anidro"
-            elif "Diesel" in combustivel_nome:
-                comp_fossil = "Óleo Diesel (puro)"; comp_bio = "Biodiesel (B100)"
-            elif "Etanol" in combustivel_nome:
-                comp_fossil = "-"; comp_bio = "Etanol Hidratado"
-            else:
-                comp_fossil = combustivel_nome; comp_bio = "-"
-
-        # 2. Quantidades
-        qtd_fossil = quantidade_litros * fracao_f
-        qtd_bio = quantidade_litros * fracao_b
-
-        # 3. Fatores Base (CO2 vem do combustível)
-        f_base_f = self._get_fator_do_db(comp_fossil)
-        f_base_b = self._get_fator_do_db(comp_bio)
-
-        # 4. Ajuste de Ano (CH4 e N2O dependem do ano na Opção 1 e 3)
-        # Se for Opção 1 ou 3 e tiver ano, tentamos pegar fator específico
-        # Caso contrário, usa o padrão do combustível
-        fator_f_final = f_base_f.copy()
-        fator_b_final = f_base_b.copy()
-
-        if opcao in [1, 3] and 'ano' in dados_input:
-            ano = str(dados_input['ano'])
-            # Tenta pegar tabela de anos (fictícia no JSON)
-            tabela_anos = self.db['combustao_movel'].get('fatores_ch4_n2o_por_ano', {})
-            fatores_ano = tabela_anos.get(ano, tabela_anos.get('padrao'))
-            
-            if fatores_ano:
-                # Sobrescreve CH4 e N2O (apenas exemplo didático, na real é mais complexo)
-                if qtd_fossil > 0:
-                    fator_f_final['CH4'] = fatores_ano['CH4']
-                    fator_f_final['N2O'] = fatores_ano['N2O']
-
-        # 5. Emissões Finais
-        emis_fossil = {
-            "CO2": qtd_fossil * fator_f_final['CO2'],
-            "CH4": qtd_fossil * fator_f_final['CH4'],
-            "N2O": qtd_fossil * fator_f_final['N2O']
-        }
-        emis_bio = {
-            "CO2": qtd_bio * fator_b_final['CO2'],
-            "CH4": qtd_bio * fator_b_final['CH4'],
-            "N2O": qtd_bio * fator_b_final['N2O']
-        }
+        fracao_f, fracao_b, comp_fossil, comp_bio = self._get_composicao(combustivel_nome)
 
-        tco2e = (
-            (emis_fossil['CO2']*self.gwp['CO2']) + (emis_fossil['CH4']*self.gwp['CH4']) + (emis_fossil['N2O']*self.gwp['N2O']) +
-            (emis_bio['CH4']*self.gwp['CH4']) + (emis_bio['N2O']*self.gwp['N2O'])
-        ) / 1000.0
-        
-        bio_co2 = (emis_bio['CO2'] * self.gwp['CO2']) / 1000.0
+        # 2. Ajuste de Ano (CH4 e N2O dependem do ano na Opção 1 e 3)
+        # Sem ano (ou sem parcela fóssil) usa o padrão do combustível
+        chave_ano = SEM_ANO
+        if opcao in [1, 3] and 'ano' in dados_input and quantidade_litros * fracao_f > 0:
+            chave_ano = self.coeficientes.chave_ano(dados_input['ano'])
+
+        # 3. Coeficientes por unidade x quantidade
+        coef = self.coeficientes.get(combustivel_nome, chave_ano)
+        coef = coef.tolist()
+        fator_f_final = {g: coef[POS[f"fatores_fossil_{g}"]] for g in GASES}
+        fator_b_final = {g: coef[POS[f"fatores_bio_{g}"]] for g in GASES}
+        emis_fossil = {g: quantidade_litros * coef[POS[f"emis_fossil_{g}"]] for g in GASES}
+        emis_bio = {g: quantidade_litros * coef[POS[f"emis_bio_{g}"]] for g in GASES}
 
         return {
+            "versao_fatores": self.versao_fatores,
+            "chave_ano": chave_ano,
             "unidade_entrada": "km" if opcao == 3 else "litros",
             "combustivel_utilizado": combustivel_nome,
             "distancia_informada": distancia_km,
@@ -153,29 +135,234 @@ class GHGCalculator:
             "consumo_medio_usado": consumo_medio,
             
             "comp_fossil": comp_fossil, "comp_bio": comp_bio,
-            "qtd_fossil": qtd_fossil, "qtd_bio": qtd_bio,
+            "qtd_fossil": quantidade_litros * fracao_f, "qtd_bio": quantidade_litros * fracao_b,
             
             "fatores_fossil": fator_f_final, "fatores_bio": fator_b_final,
             
             "emis_fossil": emis_fossil, "emis_bio": emis_bio,
-            "total_gee": tco2e, "total_bio": bio_co2
+            "total_gee": quantidade_litros * coef[POS["total_gee"]],
+            "total_bio": quantidade_litros * coef[POS["total_bio"]]
         }
 
-    # --- MÉTODOS ESTACIONÁRIOS E GERAÇÃO DE TABELAS (Mantidos do anterior) ---
+    # --- MÉTODOS ESTACIONÁRIOS E GERAÇÃO DE TABELAS ---
     def calcular_estacionaria(self, nome, qtd):
-        # ... (MANTER O CÓDIGO DA RESPOSTA ANTERIOR AQUI - OMITIDO PARA BREVIDADE) ...
-        # (Se precisar, me avise que repito ele, mas a ideia é só adicionar o calcular_movel na classe)
-        # Para facilitar, vou repetir o calcular_estacionaria básico abaixo
-        return self.calcular_movel(2, {'combustivel_direto': nome, 'qtd': qtd}) # Reuso da lógica
+        """Combustão estacionária = Opção 2 (combustível direto) pelos mesmos coeficientes por unidade"""
+        res = self.calcular_movel(2, {'combustivel_direto': nome, 'qtd': qtd})
+        # Nomes usados pela Tabela 1 (estacionaria.py)
+        res['componente_fossil'] = res['comp_fossil']
+        res['componente_bio'] = res['comp_bio']
+        res['total_biogenico'] = res['total_bio']
+        return res
+
+    # --- MÉTODOS EM LOTE (VETORIZADOS) ---
+    def calcular_lote(self, df_entrada):
+        """
+        Versão vetorizada de calcular_movel para muitos lançamentos de uma vez.
+        df_entrada: DataFrame com as mesmas chaves de dados_input ('opcao', 'qtd',
+        'tipo_veiculo', 'ano', 'combustivel_direto'); colunas ausentes valem como vazias.
+        Retorna um DataFrame (mesmo índice) com as colunas de calcular_movel achatadas.
+        """
+        idx = df_entrada.index
+        vazio = pd.Series(None, index=idx, dtype=object)
+        opcao = df_entrada['opcao'].to_numpy(dtype=float)
+        qtd = df_entrada['qtd'].to_numpy(dtype=float)
+        tipo = df_entrada['tipo_veiculo'] if 'tipo_veiculo' in df_entrada else vazio
+        direto = df_entrada['combustivel_direto'] if 'combustivel_direto' in df_entrada else vazio
+        ano = df_entrada['ano'] if 'ano' in df_entrada else vazio
+
+        op_veiculo = (opcao == 1) | (opcao == 3)
+        op_distancia = opcao == 3
+
+        # 1. Veículo -> Combustível e consumo médio (Opções 1 e 3)
+        frota = self.db.get('combustao_movel', {}).get('frota_veiculos', {})
+        desconhecidos = set(tipo[op_veiculo].unique()) - set(frota)
+        if desconhecidos:
+            raise KeyError(f"Tipos de veículo não cadastrados: {sorted(map(str, desconhecidos))}")
+        comb_veiculo = tipo.map({k: v['combustivel_associado'] for k, v in frota.items()})
+        consumo_veiculo = tipo.map({k: v.get('consumo_medio_kml', 1.0) for k, v in frota.items()}).to_numpy(dtype=float)
+
+        combustivel = pd.Series(
+            np.where(op_veiculo, comb_veiculo.to_numpy(dtype=object),
+                     np.where(opcao == 2, direto.to_numpy(dtype=object), "")),
+            index=idx, dtype=object
+        ).fillna("")
+        distancia = np.where(op_distancia, qtd, 0.0)
+        consumo_medio = np.where(op_distancia, consumo_veiculo, 0.0)
+        litros = np.where(op_veiculo | (opcao == 2), qtd, 0.0)
+        np.divide(qtd, consumo_veiculo, out=litros, where=op_distancia)
+
+        # 2. Composição por combustível (calculada uma vez por nome distinto)
+        cod_comb, nomes = pd.factorize(combustivel)
+        composicoes = [self._get_composicao(nome) for nome in nomes]
+        fracao_f = np.array([c[0] for c in composicoes], dtype=float)[cod_comb]
+        comp_fossil = np.array([c[2] for c in composicoes], dtype=object)[cod_comb]
+        comp_bio = np.array([c[3] for c in composicoes], dtype=object)[cod_comb]
+
+        # 3. Chave do ano (Opções 1 e 3, com ano e parcela fóssil)
+        tabela = self.coeficientes
+        cod_ano, anos = pd.factorize(ano)
+        chaves = [SEM_ANO] + sorted(set(tabela.chave_ano(_ano_como_texto(a)) for a in anos) - {SEM_ANO})
+        pos_chave = {c: i for i, c in enumerate(chaves)}
+        # (o 0 extra no fim atende cod_ano == -1, isto é, ano vazio)
+        cod_chave = np.array([pos_chave[tabela.chave_ano(_ano_como_texto(a))] for a in anos] + [0], dtype=np.int64)[cod_ano]
+        usa_ano = op_veiculo & (cod_ano >= 0) & (litros * fracao_f > 0)
+        cod_chave = np.where(usa_ano, cod_chave, 0)
+
+        # 4. Uma busca por par (combustível, ano) distinto e uma multiplicação por linha
+        codigos, pares = pd.factorize(cod_comb * len(chaves) + cod_chave)
+        coef = tabela.matriz([(nomes[p // len(chaves)], chaves[p % len(chaves)]) for p in pares])[codigos]
+
+        resultado = {
+            "versao_fatores": self.versao_fatores,
+            "chave_ano": np.array(chaves, dtype=object)[cod_chave],
+            "unidade_entrada": np.where(op_distancia, "km", "litros"),
+            "combustivel_utilizado": combustivel,
+            "distancia_informada": distancia,
+            "consumo_calculado_litros": litros,
+            "consumo_medio_usado": consumo_medio,
+            "comp_fossil": comp_fossil, "comp_bio": comp_bio,
+            "qtd_fossil": litros * coef[:, POS["fracao_fossil"]],
+            "qtd_bio": litros * coef[:, POS["fracao_bio"]],
+        }
+        for coluna in COLUNAS[2:]:
+            if coluna.startswith("fatores_"):
+                resultado[coluna] = coef[:, POS[coluna]]
+            else:
+                resultado[coluna] = litros * coef[:, POS[coluna]]
+        return pd.DataFrame(resultado, index=idx)
 
     def get_lista_tabela2_ref(self):
         frosseis = [{"id": 25, "nome": "Gasolina Automotiva (pura)", "unidade": "Litros"}, {"id": 32, "nome": "Óleo Diesel (puro)", "unidade": "Litros"}]
         bios = [{"id": 49, "nome": "Etanol Anidro", "unidade": "Litros"}, {"id": 52, "nome": "Biodiesel (B100)", "unidade": "Litros"}]
         return frosseis, bios
 
-    def gerar_tabela_2(self, lista_inventario, setor):
-        # ... (MANTER IGUAL ANTERIOR) ...
-        return [], []
+    def gerar_tabela_2(self, inventario, setor):
+        """
+        Resumo da Tabela 1 por componente fóssil e bio, para o setor escolhido.
+        Lê os totais correntes do Inventario (registrados no primeiro uso e atualizados
+        a cada lançamento), sem reagregar todas as linhas a cada render.
+        """
+        if not isinstance(inventario, Inventario):
+            inventario = Inventario(inventario)
+        for nome, (coluna_comp, somas) in TABELA2_AGREGADOS.items():
+            if not inventario.tem_agregado(nome):
+                inventario.adicionar_agregado(nome, ["Setor", coluna_comp], somas)
+
+        ref_fossil, ref_bio = self.get_lista_tabela2_ref()
+        fosseis = self._linhas_tabela_2(inventario.agregado('tabela2_fossil'), setor, ref_fossil, biogenico=False)
+        bios = self._linhas_tabela_2(inventario.agregado('tabela2_bio'), setor, ref_bio, biogenico=True)
+        return fosseis, bios
+
+    def _linhas_tabela_2(self, df_totais, setor, referencia, biogenico):
+        coluna_comp = df_totais.columns[1]
+        df_setor = df_totais[(df_totais["Setor"] == setor) & (df_totais[coluna_comp] != "-")]
+        totais = {linha[0]: linha[1:] for linha in df_setor.iloc[:, 1:6].itertuples(index=False)}
+
+        # Referência primeiro (sempre aparece), depois demais componentes lançados
+        itens = [(item['id'], item['nome'], item['unidade']) for item in referencia]
+        nomes_ref = {item['nome'] for item in referencia}
+        itens += [("-", nome, self.get_unidade(nome)) for nome in sorted(totais) if nome not in nomes_ref]
+
+        linhas = []
+        for id_ref, nome, unidade in itens:
+            qtd, co2, ch4, n2o = totais.get(nome, (0.0, 0.0, 0.0, 0.0))
+            total = ch4 * self.gwp['CH4'] + n2o * self.gwp['N2O']
+            if not biogenico:
+                total += co2 * self.gwp['CO2']
+            linhas.append({
+                "ID": id_ref, "Combustível": nome, "Unidade": unidade, "Quantidade": qtd,
+                "CO2 biogênico (t)" if biogenico else "CO2 (t)": co2, "CH4 (t)": ch4, "N2O (t)": n2o,
+                "Emissões totais (t CO2e)": total
+            })
+        return linhas
     
     def calcular_tabela3_inputs_diretos(self, c, ch, n):
-        return (c + ch*28 + n*265)
\ No newline at end of file
+        return c * self.gwp['CO2'] + ch * self.gwp['CH4'] + n * self.gwp['N2O']
+
+
+def _ano_como_texto(ano):
+    """Normaliza o ano como em calcular_movel (str), tratando 2023.0 vindo de planilhas"""
+    if isinstance(ano, float) and ano.is_integer():
+        return str(int(ano))
+    return str(ano)
+
+
+# --- BASE DE FATORES COMPARTILHADA (UMA POR PROCESSO) ---
+_compartilhados = {}
+_lock_compartilhados = threading.Lock()
+
+
+def _assinatura_arquivos(caminhos):
+    """(mtime, tamanho) de cada arquivo; barato o bastante para checar a cada rerun"""
+    assinatura = []
+    for caminho in caminhos:
+        try:
+            st_arq = os.stat(caminho)
+            assinatura.append((st_arq.st_mtime_ns, st_arq.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+def _hash_arquivos(caminhos):
+    h = hashlib.sha256()
+    for caminho in caminhos:
+        try:
+            with open(caminho, 'rb') as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b'<ausente>')
+    return h.hexdigest()
+
+
+def get_compartilhado(construtor, *caminhos):
+    """
+    Retorna construtor(*caminhos), compartilhado por todas as sessões do processo.
+    Reconstrói sozinho quando o mtime e o conteúdo (sha256) dos arquivos mudam.
+    A instância é compartilhada: trate-a como somente leitura.
+    """
+    chave = (construtor, caminhos)
+    assinatura = _assinatura_arquivos(caminhos)
+    atual = _compartilhados.get(chave)
+    if atual is not None and atual['assinatura'] == assinatura:
+        return atual['obj']
+
+    with _lock_compartilhados:
+        atual = _compartilhados.get(chave)
+        if atual is not None and atual['assinatura'] == assinatura:
+            return atual['obj']
+        conteudo = _hash_arquivos(caminhos)
+        if atual is not None and atual['hash'] == conteudo:
+            # Só o mtime mudou (ex.: arquivo salvo sem alteração)
+            atual['assinatura'] = assinatura
+            return atual['obj']
+        obj = construtor(*caminhos)
+        _compartilhados[chave] = {'obj': obj, 'assinatura': assinatura, 'hash': conteudo}
+        return obj
+
+
+def carregar_calculadora(data_path='data/fatores.json', csv_path='data/lista_comb.csv', compilado='data/fatores.bin'):
+    """
+    Usa a base compilada quando ela corresponde às fontes atuais (mesmo sha256);
+    senão (ausente ou desatualizada) lê e valida fatores.json/lista_comb.csv.
+    """
+    if compilado and os.path.exists(compilado):
+        try:
+            base = base_fatores.BaseCompilada(compilado)
+            if base.hash == base_fatores.hash_das_fontes(data_path, csv_path):
+                return GHGCalculator.de_base_compilada(base)
+        except (base_fatores.ErroBaseFatores, OSError, ValueError):
+            pass  # Binário corrompido ou de outro layout: as fontes continuam valendo
+    return GHGCalculator(data_path, csv_path)
+
+
+def get_calculadora(data_path='data/fatores.json', csv_path='data/lista_comb.csv', compilado='data/fatores.bin'):
+    """GHGCalculator compartilhado do processo (recarrega se as fontes ou a base compilada mudarem)"""
+    return get_compartilhado(carregar_calculadora, data_path, csv_path, compilado)
+
+
+if __name__ == "__main__":
+    # python -m src.calculadora batch ... (ver src/cli.py)
+    import sys
+    from src.cli import main
+    sys.exit(main())
\ No newline at end of file
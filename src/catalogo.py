@@ -0,0 +1,78 @@
+import pandas as pd
+
+
+class CatalogoCombustiveis:
+    """
+    Índice dos combustíveis montado uma única vez a partir de lista_comb.csv
+    e das misturas de 'combustao_estacionaria' no fatores.json.
+    Todas as consultas (unidade, componentes, frações) são acessos a dicionário.
+    """
+
+    def __init__(self, df_comb, db):
+        self.nomes = []
+        self.unidades = {}
+        self.componentes = {}
+        self.fracoes = {}
+
+        # 1. CSV: unidade e componentes fóssil/bio de cada combustível
+        if not df_comb.empty:
+            for nome, unidade, fossil, bio in df_comb[['Combustível', 'Unidade', 'Combustível fóssil', 'biocombustível']].itertuples(index=False):
+                if nome in self.unidades:
+                    continue
+                self.nomes.append(nome)
+                self.unidades[nome] = unidade
+                self.componentes[nome] = (_limpa(fossil), _limpa(bio))
+
+        # 2. JSON: misturas com frações (e componentes, quando informados)
+        misturas = db.get('combustao_estacionaria', {})
+        for nome, mistura in misturas.items():
+            fossil, bio = self.componentes.get(nome, (nome, "-"))
+            self.componentes[nome] = (mistura.get('comp_fossil', fossil), mistura.get('comp_bio', bio))
+            self.fracoes[nome] = (mistura.get('fracao_fossil', 1.0), mistura.get('fracao_bio', 0.0))
+
+        # 3. Frações dos combustíveis que só existem no CSV
+        fracoes_por_par = {self.componentes[nome]: fracao for nome, fracao in self.fracoes.items()}
+        for nome, (fossil, bio) in self.componentes.items():
+            if nome in self.fracoes:
+                continue
+            if fossil == "-":
+                self.fracoes[nome] = (0.0, 1.0)
+            elif bio == "-":
+                self.fracoes[nome] = (1.0, 0.0)
+            else:
+                # Mistura sem fração própria: reaproveita a de uma mistura com os mesmos componentes
+                self.fracoes[nome] = fracoes_por_par.get((fossil, bio), (1.0, 0.0))
+
+    @classmethod
+    def de_listas(cls, nomes, unidades, componentes, fracoes):
+        """Monta o catálogo já resolvido (ex.: lido da base compilada), sem o CSV"""
+        catalogo = cls(pd.DataFrame(), {})
+        catalogo.nomes = list(nomes)
+        catalogo.unidades = dict(unidades)
+        catalogo.componentes = dict(componentes)
+        catalogo.fracoes = dict(fracoes)
+        return catalogo
+
+    def __contains__(self, nome):
+        return nome in self.componentes
+
+    def get_unidade(self, nome):
+        return self.unidades.get(nome, "unidade")
+
+    def get_componentes(self, nome):
+        """Retorna (comp_fossil, comp_bio); combustível desconhecido é tratado como fóssil puro"""
+        return self.componentes.get(nome, (nome, "-"))
+
+    def get_fracoes(self, nome):
+        """Retorna (fracao_fossil, fracao_bio)"""
+        return self.fracoes.get(nome, (1.0, 0.0))
+
+    def get_composicao(self, nome):
+        """Retorna (fracao_fossil, fracao_bio, comp_fossil, comp_bio)"""
+        return self.get_fracoes(nome) + self.get_componentes(nome)
+
+
+def _limpa(valor):
+    if pd.isna(valor) or str(valor).strip() == "":
+        return "-"
+    return str(valor).strip()
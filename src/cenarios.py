@@ -0,0 +1,265 @@
+"""
+Cenários de recálculo ("e se?") sobre os inventários já lançados.
+
+Cada lançamento guarda a atividade (Qtd Fóssil/Bio, t.km) e as referências dos fatores
+(Comp. Fóssil, Comp. Bio, Ano Fatores, Modal). Um índice de dependências liga cada fator
+às linhas que o usam, então trocar o fator de um combustível recalcula só essas linhas.
+GWP não muda as massas de cada gás: trocá-lo só recombina as colunas em CO2e.
+
+Um Cenario guarda apenas o que muda em relação à base carregada; comparar cenários
+soma a diferença das linhas afetadas aos totais da base, sem copiar o inventário.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from src.coeficientes import GASES, SEM_ANO
+from src.inventario import CATEGORIAS, TOTAIS_INVENTARIO
+
+# Conjuntos de GWP (100 anos) do IPCC; no AR6 o CH4 é o de origem fóssil (combustão)
+GWP_IPCC = {
+    "AR5": {"CO2": 1, "CH4": 28, "N2O": 265},
+    "AR6": {"CO2": 1, "CH4": 29.8, "N2O": 273},
+}
+
+# Colunas de referência de fator indexadas por inventário: tipo da referência -> coluna
+REFERENCIAS = {
+    'inventario': {"fossil": "Comp. Fóssil", "bio": "Comp. Bio"},
+    'inventario_movel': {"fossil": "Comp. Fóssil", "bio": "Comp. Bio", "ano": "Ano Fatores"},
+    'inventario_t3': {},
+    'inventario_escopo3': {"modal": "Modal"},
+}
+
+
+class Cenario:
+    """
+    Alterações em relação à base de fatores carregada (tudo opcional):
+        gwp:         {gás: GWP}
+        fatores:     {componente de fatores_base: {gás: kg/un}}
+        fatores_ano: {linha de fatores_ch4_n2o_por_ano: {'CH4'/'N2O': kg/l}}
+        fatores_tkm: {modal: kg CO2e/t.km}
+    """
+
+    def __init__(self, nome, gwp=None, fatores=None, fatores_ano=None, fatores_tkm=None):
+        self.nome = nome
+        self.gwp = dict(gwp or {})
+        self.fatores = {comp: dict(gases) for comp, gases in (fatores or {}).items()}
+        self.fatores_ano = {chave: dict(gases) for chave, gases in (fatores_ano or {}).items()}
+        self.fatores_tkm = dict(fatores_tkm or {})
+
+    def gwp_efetivo(self, calc):
+        return {**calc.gwp, **self.gwp}
+
+    def muda_gwp(self, calc):
+        return any(calc.gwp.get(g) != v for g, v in self.gwp.items())
+
+
+class IndiceFatores:
+    """
+    Índice referência de fator -> posições das linhas de um Inventario.
+    Acompanha o inventário de forma incremental: a cada uso indexa só as linhas novas
+    (e refaz tudo se as linhas mudaram de posição ou se uma referência de linha existente
+    foi reescrita, ex.: upsert trocando o combustível).
+    """
+
+    def __init__(self, referencias):
+        self.referencias = referencias
+        self._marca = None
+        self._n = 0
+        self._grupos = {}
+
+    def atualizar(self, inv):
+        marca = (inv.geracao, max((inv.reescrita(c) for c in self.referencias.values()), default=0))
+        if self._marca != marca or len(inv) < self._n:
+            self._marca, self._n, self._grupos = marca, 0, {}
+        if len(inv) == self._n:
+            return self
+        for tipo, coluna in self.referencias.items():
+            if coluna not in inv.colunas:
+                continue
+            codigos, valores = pd.factorize(pd.Series(inv.coluna(coluna)[self._n:], dtype=object))
+            ordem = np.argsort(codigos, kind="stable")
+            limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+            for g, valor in enumerate(valores):
+                self._grupos.setdefault((tipo, valor), []).append(ordem[limites[g]:limites[g + 1]] + self._n)
+        self._n = len(inv)
+        return self
+
+    def linhas(self, tipo, valor):
+        """Posições (ordenadas) das linhas cuja referência 'tipo' vale 'valor'"""
+        partes = self._grupos.get((tipo, valor))
+        if not partes:
+            return np.zeros(0, dtype=np.int64)
+        if len(partes) > 1:
+            partes[:] = [np.concatenate(partes)]
+        return partes[0]
+
+
+_indices = weakref.WeakKeyDictionary()
+
+
+def indice_de(inv, chave):
+    """IndiceFatores do inventário (um por objeto Inventario, atualizado a cada chamada)"""
+    indice = _indices.get(inv)
+    if indice is None:
+        indice = _indices[inv] = IndiceFatores(REFERENCIAS.get(chave, {}))
+    return indice.atualizar(inv)
+
+
+# --- RECÁLCULO DAS LINHAS AFETADAS ---
+def linhas_afetadas(inv, chave, calc, cenario):
+    """Posições das linhas cujo resultado muda no cenário (todas, se o GWP mudar e houver CO2e de gases)"""
+    if chave not in REFERENCIAS or not inv:
+        return np.zeros(0, dtype=np.int64)
+    if cenario.muda_gwp(calc) and chave != 'inventario_escopo3':
+        return np.arange(len(inv))
+    indice = indice_de(inv, chave)
+    partes = [indice.linhas(tipo, comp) for comp in cenario.fatores for tipo in ("fossil", "bio")]
+    partes += [indice.linhas("ano", ano) for ano in cenario.fatores_ano]
+    partes += [indice.linhas("modal", modal) for modal in cenario.fatores_tkm]
+    partes = [p for p in partes if len(p)]
+    return np.unique(np.concatenate(partes)) if partes else np.zeros(0, dtype=np.int64)
+
+
+def recalcular(inv, chave, calc, cenario):
+    """
+    Recalcula no cenário só as linhas afetadas.
+    Retorna (linhas, {coluna: novos valores}) pronto para Inventario.atualizar.
+    """
+    linhas = linhas_afetadas(inv, chave, calc, cenario)
+    if len(linhas) == 0:
+        return linhas, {}
+    gwp = cenario.gwp_efetivo(calc)
+    col = _Colunas(inv, linhas)
+    if chave == 'inventario':
+        valores = _tabela1(col, cenario, gwp)
+    elif chave == 'inventario_movel':
+        valores = _movel(col, cenario, gwp)
+    elif chave == 'inventario_t3':
+        valores = _tabela3(col, gwp)
+    else:
+        valores = _transporte(col, cenario)
+    return linhas, valores
+
+
+def aplicar(inv, chave, calc, cenario):
+    """Grava o cenário no próprio inventário (só as linhas afetadas). Retorna quantas mudaram."""
+    linhas, valores = recalcular(inv, chave, calc, cenario)
+    if len(linhas):
+        valores["Versão Fatores"] = np.full(len(linhas), f"{calc.versao_fatores} ({cenario.nome})", dtype=object)
+        inv.atualizar(linhas, valores)
+    return len(linhas)
+
+
+class _Colunas:
+    """Valores das linhas afetadas, lidos coluna a coluna do Inventario"""
+
+    def __init__(self, inv, linhas):
+        self.inv = inv
+        self.linhas = linhas
+
+    def numero(self, nome):
+        if nome not in self.inv.colunas:
+            return np.zeros(len(self.linhas))
+        return np.nan_to_num(pd.to_numeric(self.inv.coluna(nome)[self.linhas], errors='coerce').astype(float))
+
+    def texto(self, nome):
+        if nome not in self.inv.colunas:
+            return np.full(len(self.linhas), None, dtype=object)
+        return self.inv.coluna(nome)[self.linhas]
+
+
+def _fator(referencias, atual, alteracoes, gas):
+    """Fator do gás por linha: o do cenário onde a referência foi alterada, senão o guardado"""
+    novo = atual.copy()
+    for ref, gases in alteracoes.items():
+        if gas in gases:
+            novo[referencias == ref] = gases[gas]
+    return novo
+
+
+def _tabela1(col, cenario, gwp):
+    valores = {}
+    emis = {}
+    for lado, comp, qtd in (("Fóssil", "Comp. Fóssil", "Qtd Fóssil"), ("Bio", "Comp. Bio", "Qtd Bio")):
+        referencias = col.texto(comp)
+        quantidade = col.numero(qtd)
+        for g in GASES:
+            fe = _fator(referencias, col.numero(f"FE {lado} {g} (kg/un)"), cenario.fatores, g)
+            valores[f"FE {lado} {g} (kg/un)"] = fe
+            emis[lado, g] = valores[f"Emis. {lado} {g} (t)"] = quantidade * fe / 1000
+    valores["Total GEE (tCO2e)"] = sum(emis["Fóssil", g] * gwp[g] for g in GASES) + emis["Bio", "CH4"] * gwp["CH4"] + emis["Bio", "N2O"] * gwp["N2O"]
+    valores["Biogênicas (tCO2)"] = emis["Bio", "CO2"] * gwp["CO2"]
+    return valores
+
+
+def _movel(col, cenario, gwp):
+    comp_f, comp_b = col.texto("Comp. Fóssil"), col.texto("Comp. Bio")
+    qtd_f, qtd_b = col.numero("Qtd Combustível Fóssil"), col.numero("Qtd Biocombustível")
+    ano = col.texto("Ano Fatores")
+    com_ano = pd.notna(ano) & (ano != SEM_ANO)
+    fe_co2_f = _fator(comp_f, col.numero("FE Fóssil CO2 (kg/l)"), cenario.fatores, "CO2")
+    fe_co2_b = _fator(comp_b, col.numero("FE Bio CO2 (kg/l)"), cenario.fatores, "CO2")
+    valores = {
+        "FE Fóssil CO2 (kg/l)": fe_co2_f, "FE Bio CO2 (kg/l)": fe_co2_b,
+        "Emissões de CO2 fóssil (t)": qtd_f * fe_co2_f / 1000,
+        "Emissões de CO2 biogênico (t)": qtd_b * fe_co2_b / 1000 * gwp["CO2"],
+    }
+    for g in ("CH4", "N2O"):
+        # CH4/N2O fósseis: linha do ano quando houver, senão o fator do componente
+        fe_antigo = col.numero(f"FE Comercial {g} (kg/l)")
+        fe = np.where(com_ano, _fator(ano, fe_antigo, cenario.fatores_ano, g), _fator(comp_f, fe_antigo, cenario.fatores, g))
+        # A parcela bio não guarda o fator: é o que sobra da emissão depois da parcela fóssil
+        bio = col.numero(f"Emissões de {g} (t)") - qtd_f * fe_antigo / 1000
+        for comp, gases in cenario.fatores.items():
+            if g in gases:
+                bio = np.where(comp_b == comp, qtd_b * gases[g] / 1000, bio)
+        valores[f"FE Comercial {g} (kg/l)"] = fe
+        valores[f"Emissões de {g} (t)"] = qtd_f * fe / 1000 + bio
+    valores["Emissões totais (t CO2e)"] = (valores["Emissões de CO2 fóssil (t)"] * gwp["CO2"]
+                                           + valores["Emissões de CH4 (t)"] * gwp["CH4"] + valores["Emissões de N2O (t)"] * gwp["N2O"])
+    return valores
+
+
+def _tabela3(col, gwp):
+    return {"Emissões de GEE totais (t CO2e)": col.numero("Emissões de CO2 fóssil (t)") * gwp["CO2"]
+            + col.numero("Emissões de CH4 (t)") * gwp["CH4"] + col.numero("Emissões de N2O (t)") * gwp["N2O"]}
+
+
+def _transporte(col, cenario):
+    modal = col.texto("Modal")
+    emissoes = col.numero("Emissões (t CO2e)")
+    tkm = col.numero("t.km")
+    for nome, fator in cenario.fatores_tkm.items():
+        emissoes = np.where(modal == nome, tkm * fator / 1000, emissoes)
+    return {"Emissões (t CO2e)": emissoes}
+
+
+# --- COMPARAÇÃO ---
+def comparar(inventarios, calc, cenarios):
+    """
+    Totais por categoria na base e em cada cenário, lado a lado (t CO2e).
+    Cada cenário = totais da base + (novo - antigo) nas linhas afetadas.
+    """
+    base = dict.fromkeys(CATEGORIAS, 0.0)
+    deltas = {c.nome: dict.fromkeys(CATEGORIAS, 0.0) for c in cenarios}
+    for chave, totais in TOTAIS_INVENTARIO.items():
+        inv = inventarios.get(chave)
+        if not inv:
+            continue
+        for categoria, coluna in totais:
+            if coluna in inv.colunas:
+                base[categoria] += np.nansum(pd.to_numeric(inv.coluna(coluna), errors='coerce'))
+        for cenario in cenarios:
+            linhas, valores = recalcular(inv, chave, calc, cenario)
+            for categoria, coluna in totais:
+                if coluna in valores:
+                    antigos = pd.to_numeric(inv.coluna(coluna)[linhas], errors='coerce')
+                    deltas[cenario.nome][categoria] += np.nansum(valores[coluna]) - np.nansum(antigos)
+
+    tabela = pd.DataFrame({"Base": base})
+    for cenario in cenarios:
+        tabela[cenario.nome] = tabela["Base"] + pd.Series(deltas[cenario.nome])
+    tabela = tabela[tabela.abs().sum(axis=1) > 0]
+    return tabela.rename_axis("Categoria").reset_index()
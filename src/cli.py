@@ -0,0 +1,328 @@
+"""
+Cálculo em lote sem navegador:
+
+    python -m src.calculadora batch --estacionaria compras.csv --movel frota.xlsx --saida resultados/
+
+Lê os arquivos no mesmo layout da importação em lote das páginas, calcula com o
+GHGCalculator em vários processos e grava estacionaria/movel/erros na pasta de saída.
+
+    python -m src.calculadora compilar --saida data/fatores.bin
+
+Valida fatores.json/lista_comb.csv e grava a base compilada (ver src/base_fatores.py),
+usada automaticamente enquanto corresponder às fontes.
+
+    python -m src.calculadora consolidar --estrutura grupo.csv --abordagem controle_operacional --saida grupo.csv
+
+Consolida os inventários salvos das subsidiárias (ver src/consolidacao.py).
+
+    python -m src.calculadora exportar --organizacao ACME --ano 2024 --saida acme_2024.zip
+
+Exporta um inventário salvo como pacote Parquet (ver src/colunar.py).
+
+    python -m src.calculadora ingerir --pasta //erp/ghg --organizacao ACME --ano 2024 --observar 300
+
+Processa os arquivos novos ou alterados da pasta monitorada e grava o resultado no
+inventário salvo (ver src/ingestao.py); com --observar, repete a cada N segundos.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src import base_fatores, colunar, consolidacao, exportacao, importacao, ingestao, persistencia
+from src.calculadora import carregar_calculadora
+from src.inventario import Inventario
+
+FORMATOS = ("csv", "parquet", "xlsx")
+# Tipo de arquivo -> chave do inventário (esquema das colunas do Parquet)
+INVENTARIO_DO_TIPO = {tipo: chave for tipo, chave in ingestao.PASTAS.values()}
+
+# Calculadora de cada processo do pool (montada uma vez no initializer)
+_calc = None
+
+
+def _inicia_processo(data_path, csv_path):
+    global _calc
+    _calc = carregar_calculadora(data_path, csv_path)
+
+
+class _BlocoCSV:
+    """Bloco já formatado como CSV (sem cabeçalho) pelo processo do pool"""
+
+    def __init__(self, df):
+        self.colunas = list(df.columns)
+        self.texto = df.to_csv(index=False, header=False)
+        self.linhas = len(df)
+
+
+def _processa_bloco(tipo, bloco, linha_inicial, setor, formato):
+    """Valida, calcula e (para CSV) formata um bloco; roda dentro do processo do pool"""
+    erros = []
+    validar = importacao.validar_estacionaria if tipo == 'estacionaria' else importacao.validar_movel
+    entrada, _ = validar(bloco, linha_inicial, _calc, erros)
+    if entrada.empty:
+        return None, erros
+    res = _calc.calcular_lote(entrada)
+    if tipo == 'estacionaria':
+        linhas = importacao.linhas_estacionaria(entrada, res, _calc, setor)
+    else:
+        linhas = importacao.linhas_movel(entrada, res)
+    # A formatação do CSV é a parte mais cara: fica no pool, não no processo principal
+    return (_BlocoCSV(linhas) if formato == "csv" else linhas), erros
+
+
+# --- ESCRITA INCREMENTAL ---
+class _Saida:
+    """Grava blocos de um DataFrame em CSV, Parquet ou XLSX sem acumular o resultado inteiro"""
+
+    def __init__(self, caminho, formato, chave=None):
+        self.caminho = caminho
+        self.formato = formato
+        self.chave = chave  # Inventário das linhas (tipos das colunas do Parquet)
+        self.linhas = 0
+        self._escritor = None
+        self._wb = None
+
+    def escrever(self, df):
+        if isinstance(df, _BlocoCSV):
+            if self._escritor is None:
+                self._escritor = open(self.caminho, 'w', encoding='utf-8-sig', newline='')
+                self._escritor.write(pd.DataFrame(columns=df.colunas).to_csv(index=False))
+            self._escritor.write(df.texto)
+            self.linhas += df.linhas
+            return
+        if self.formato == "csv":
+            df.to_csv(self.caminho, mode='w' if self.linhas == 0 else 'a', header=self.linhas == 0,
+                      index=False, encoding='utf-8-sig' if self.linhas == 0 else 'utf-8')
+        elif self.formato == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._escritor is None:
+                # Tipos do esquema do inventário, não os inferidos do primeiro bloco
+                self._escritor = pq.ParquetWriter(self.caminho, colunar.schema_linhas(self.chave, df))
+            self._escritor.write_table(pa.Table.from_pandas(df, schema=self._escritor.schema, preserve_index=False))
+        else:
+            from src.exportacao import escrever_linhas
+            if self._wb is None:
+                import xlsxwriter
+                self._wb = xlsxwriter.Workbook(self.caminho, {'constant_memory': True})
+                self._ws = self._wb.add_worksheet('Resultados')
+                self._ws.write_row(0, 0, list(df.columns), self._wb.add_format({'bold': True}))
+            escrever_linhas(self._ws, [df[c].to_numpy() for c in df.columns], self.linhas + 1)
+        self.linhas += len(df)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+        if self._wb is not None:
+            self._wb.close()
+
+
+def processar_arquivo(caminho, tipo, saida, erros, executor, setor=None, tamanho_bloco=importacao.TAMANHO_BLOCO, janela=8):
+    """
+    Envia os blocos do arquivo ao executor e grava os resultados na ordem original.
+    Mantém no máximo 'janela' blocos em voo, então a memória não depende do tamanho do arquivo.
+    """
+    colunas = importacao.COLUNAS_ESTACIONARIA if tipo == 'estacionaria' else importacao.COLUNAS_MOVEL
+    pendentes = deque()
+
+    def grava_proximo():
+        linhas, erros_bloco = pendentes.popleft().result()
+        if linhas is not None:
+            saida.escrever(linhas)
+        erros.escrever(pd.DataFrame(
+            [{"Arquivo": os.path.basename(caminho), **e} for e in erros_bloco], columns=["Arquivo", "Linha", "Erro"]
+        ))
+
+    with open(caminho, 'rb') as arquivo:
+        for bloco, linha_inicial, _ in importacao.ler_em_blocos(arquivo, caminho, colunas, tamanho_bloco):
+            pendentes.append(executor.submit(_processa_bloco, tipo, bloco, linha_inicial, setor, saida.formato))
+            if len(pendentes) >= janela:
+                grava_proximo()
+    while pendentes:
+        grava_proximo()
+
+
+class _ExecutorLocal:
+    """Mesmo contrato do ProcessPoolExecutor, rodando no próprio processo (--processos 1)"""
+
+    class _Feito:
+        def __init__(self, valor):
+            self._valor = valor
+
+        def result(self):
+            return self._valor
+
+    def submit(self, funcao, *args):
+        return self._Feito(funcao(*args))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.calculadora", description="Cálculo de emissões em lote (GHG Protocol)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("batch", help="Calcula arquivos de atividade de combustão estacionária e móvel")
+    p.add_argument("--estacionaria", nargs="*", default=[], help="Arquivos CSV/XLSX no layout da Tabela 1")
+    p.add_argument("--movel", nargs="*", default=[], help="Arquivos CSV/XLSX no layout da combustão móvel")
+    p.add_argument("--saida", required=True, help="Pasta onde os resultados serão gravados")
+    p.add_argument("--formato", choices=FORMATOS, default="csv")
+    p.add_argument("--setor", default="Energia", help="Setor gravado nas linhas da Tabela 1")
+    p.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--bloco", type=int, default=importacao.TAMANHO_BLOCO, help="Linhas por bloco")
+    p.add_argument("--fatores", default="data/fatores.json")
+    p.add_argument("--combustiveis", default="data/lista_comb.csv")
+
+    c = sub.add_parser("compilar", help="Valida a base de fatores e grava o binário versionado")
+    c.add_argument("--fatores", default="data/fatores.json")
+    c.add_argument("--combustiveis", default="data/lista_comb.csv")
+    c.add_argument("--saida", default="data/fatores.bin")
+
+    g = sub.add_parser("consolidar", help="Consolida os inventários salvos de um grupo econômico")
+    g.add_argument("--estrutura", required=True, help="CSV com Organização, Participação (%%) e Controle Operacional")
+    g.add_argument("--abordagem", choices=list(consolidacao.ABORDAGENS), default="participacao_societaria")
+    g.add_argument("--anos", nargs="*", type=int, help="Anos base (padrão: todos os salvos)")
+    g.add_argument("--banco", default=persistencia.CAMINHO_PADRAO)
+    g.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    g.add_argument("--saida", required=True, help="CSV com os totais por subsidiária")
+
+    e = sub.add_parser("exportar", help="Exporta um inventário salvo como pacote Parquet (ZIP)")
+    e.add_argument("--organizacao", required=True)
+    e.add_argument("--ano", type=int, required=True)
+    e.add_argument("--banco", default=persistencia.CAMINHO_PADRAO)
+    e.add_argument("--saida", required=True, help="Arquivo .zip de saída")
+
+    i = sub.add_parser("ingerir", help="Ingere os arquivos novos/alterados de uma pasta monitorada")
+    i.add_argument("--pasta", required=True, help="Pasta com as subpastas estacionaria/ e movel/")
+    i.add_argument("--organizacao", required=True)
+    i.add_argument("--ano", type=int, required=True)
+    i.add_argument("--setor", default="Energia", help="Setor gravado nas linhas da Tabela 1")
+    i.add_argument("--observar", type=float, metavar="SEGUNDOS", help="Continua varrendo a pasta neste intervalo")
+    i.add_argument("--banco", default=persistencia.CAMINHO_PADRAO)
+    i.add_argument("--fatores", default="data/fatores.json")
+    i.add_argument("--combustiveis", default="data/lista_comb.csv")
+    args = parser.parse_args(argv)
+
+    if args.comando == "compilar":
+        return compilar(args)
+    if args.comando == "consolidar":
+        return consolidar(args)
+    if args.comando == "ingerir":
+        return ingerir(args)
+    if args.comando == "exportar":
+        if not colunar.disponivel():
+            parser.error("exportar requer o pacote pyarrow")
+        return exportar(args)
+
+    if not args.estacionaria and not args.movel:
+        parser.error("informe ao menos um arquivo em --estacionaria ou --movel")
+    if args.formato == "parquet":
+        try:
+            import pyarrow  # noqa: F401  (dependência opcional)
+        except ImportError:
+            parser.error("--formato parquet requer o pacote pyarrow")
+    os.makedirs(args.saida, exist_ok=True)
+
+    if args.processos > 1:
+        executor = ProcessPoolExecutor(args.processos, initializer=_inicia_processo,
+                                       initargs=(args.fatores, args.combustiveis))
+    else:
+        _inicia_processo(args.fatores, args.combustiveis)
+        executor = _ExecutorLocal()
+
+    erros = _Saida(os.path.join(args.saida, "erros.csv"), "csv")
+    with executor:
+        for tipo, arquivos in (("estacionaria", args.estacionaria), ("movel", args.movel)):
+            if not arquivos:
+                continue
+            saida = _Saida(os.path.join(args.saida, f"{tipo}.{args.formato}"), args.formato, INVENTARIO_DO_TIPO[tipo])
+            try:
+                for caminho in arquivos:
+                    processar_arquivo(caminho, tipo, saida, erros, executor, args.setor, args.bloco, janela=2 * max(args.processos, 1))
+            finally:
+                saida.fechar()
+            print(f"{tipo}: {saida.linhas} linhas calculadas -> {saida.caminho}")
+    erros.fechar()
+    print(f"erros: {erros.linhas} linhas rejeitadas -> {erros.caminho}")
+    return 0
+
+
+def compilar(args):
+    try:
+        info = base_fatores.compilar(args.fatores, args.combustiveis, args.saida)
+    except base_fatores.ErroBaseFatores as e:
+        print("Base de fatores inválida:", file=sys.stderr)
+        for problema in e.problemas:
+            print(f"  - {problema}", file=sys.stderr)
+        return 1
+    for aviso in info['avisos']:
+        print(f"aviso: {aviso}", file=sys.stderr)
+    print(f"versão {info['versao']} ({info['bytes']:,} bytes) -> {args.saida}")
+    return 0
+
+
+def consolidar(args):
+    with open(args.estrutura, 'rb') as f:
+        estrutura = consolidacao.ler_estrutura(f)
+    organizacoes = set(estrutura["organizacao"])
+    pares = [(org, ano) for org, ano in persistencia.BancoInventario(args.banco).listar_inventarios()
+             if org in organizacoes and (not args.anos or ano in args.anos)]
+    totais = consolidacao.calcular_subsidiarias(pares, args.banco, args.processos)
+    resultado = consolidacao.consolidar(totais, estrutura, args.abordagem)
+    resultado['subsidiarias'].to_csv(args.saida, index=False, encoding='utf-8-sig')
+    print(resultado['grupo'].to_string(index=False))
+    print(f"{len(pares)} inventários consolidados -> {args.saida}")
+    return 0
+
+
+def exportar(args):
+    banco = persistencia.BancoInventario(args.banco)
+    empresa = banco.carregar_empresa(args.organizacao, args.ano)
+    if empresa is None:
+        print(f"Inventário não encontrado: {args.organizacao} / {args.ano}", file=sys.stderr)
+        return 1
+    inventarios = {chave: persistencia.restaurar(banco, args.organizacao, args.ano, chave, Inventario())
+                   for chave in exportacao.ABAS_INVENTARIO}
+    with open(args.saida, 'wb') as f:
+        f.write(colunar.gerar_pacote(empresa, inventarios))
+    print(f"{sum(len(inv) for inv in inventarios.values())} lançamentos -> {args.saida}")
+    return 0
+
+
+def ingerir(args):
+    banco = persistencia.BancoInventario(args.banco)
+    empresa = banco.carregar_empresa(args.organizacao, args.ano) or {'nome': args.organizacao, 'ano': args.ano}
+    banco.salvar_empresa(empresa)
+    calc = carregar_calculadora(args.fatores, args.combustiveis)
+    # Carregados uma vez: nos ciclos seguintes só os arquivos novos custam alguma coisa
+    inventarios = {chave: persistencia.restaurar(banco, args.organizacao, args.ano, chave, Inventario())
+                   for _, chave in ingestao.PASTAS.values()}
+    destino = f"{args.organizacao}/{args.ano}"
+
+    def ao_ciclo(resumo):
+        for arquivo in resumo['arquivos']:
+            situacao = f"erro: {arquivo['Erro']}" if arquivo['Erro'] else f"{arquivo['Linhas']} linhas, {arquivo['Rejeitadas']} rejeitadas"
+            print(f"{arquivo['Arquivo']} ({arquivo['Situação']}): {situacao}")
+        gravadas = persistencia.sincronizar(banco, empresa, inventarios)
+        print(f"{gravadas} lançamentos gravados; {resumo['inalterados']} arquivos sem mudança")
+
+    if args.observar:
+        try:
+            ingestao.observar(args.pasta, calc, inventarios, args.observar, destino, args.setor, ao_ciclo)
+        except KeyboardInterrupt:
+            pass
+        return 0
+    resumo = ingestao.ingerir(args.pasta, calc, inventarios, destino, args.setor)
+    ao_ciclo(resumo)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import numpy as np
+
+GASES = ("CO2", "CH4", "N2O")
+SEM_ANO = "-"
+
+# Vetor de coeficientes por unidade de combustível (litro, m³, kg...)
+COLUNAS = (
+    ["fracao_fossil", "fracao_bio"]
+    + [f"fatores_fossil_{g}" for g in GASES] + [f"fatores_bio_{g}" for g in GASES]
+    + [f"emis_fossil_{g}" for g in GASES] + [f"emis_bio_{g}" for g in GASES]
+    + ["total_gee", "total_bio"]
+)
+POS = {nome: i for i, nome in enumerate(COLUNAS)}
+
+
+class TabelaCoeficientes:
+    """
+    Coeficientes por unidade de combustível, indexados por (combustível, chave do ano).
+    Como o cálculo é linear na quantidade, cada lançamento vira uma busca e uma multiplicação.
+    Montada a partir de fatores_base, combustao_estacionaria e fatores_ch4_n2o_por_ano,
+    ou recebida pronta (vetores) da base compilada.
+    """
+
+    def __init__(self, db, catalogo, gwp, vetores=None):
+        self.db = db
+        self.catalogo = catalogo
+        self.gwp = gwp
+        tabela_anos = db.get('combustao_movel', {}).get('fatores_ch4_n2o_por_ano', {})
+        self.fatores_ano = {k: v for k, v in tabela_anos.items() if isinstance(v, dict) and v}
+        self._cache = {}
+        if vetores is not None:
+            self._cache = dict(vetores)
+            return
+
+        frota = db.get('combustao_movel', {}).get('frota_veiculos', {})
+        combustiveis = set(catalogo.componentes) | {v['combustivel_associado'] for v in frota.values()}
+        for nome in combustiveis:
+            for chave in [SEM_ANO] + list(self.fatores_ano):
+                self.get(nome, chave)
+
+    def chave_ano(self, ano):
+        """Resolve o ano informado para a linha de fatores_ch4_n2o_por_ano usada ('padrao' se não houver)"""
+        ano = str(ano)
+        if ano in self.fatores_ano:
+            return ano
+        return 'padrao' if 'padrao' in self.fatores_ano else SEM_ANO
+
+    def get(self, combustivel, chave_ano=SEM_ANO):
+        """Retorna o vetor (np.ndarray, ordem de COLUNAS) do par; calcula e guarda se ainda não existir"""
+        chave = (combustivel, chave_ano)
+        if chave not in self._cache:
+            self._cache[chave] = self._calcula(combustivel, chave_ano)
+        return self._cache[chave]
+
+    def itens(self):
+        """[((combustível, chave do ano), vetor), ...] já calculados, em ordem"""
+        return sorted(self._cache.items())
+
+    def matriz(self, chaves):
+        """Empilha os vetores de uma lista de chaves (combustível, ano) numa matriz"""
+        if not chaves:
+            return np.zeros((0, len(COLUNAS)))
+        return np.vstack([self.get(c, a) for c, a in chaves])
+
+    def _fator_base(self, nome_tecnico):
+        fatores_base = self.db.get('fatores_base', {})
+        if nome_tecnico == "-" or nome_tecnico not in fatores_base:
+            return {"CO2": 0, "CH4": 0, "N2O": 0}
+        return fatores_base[nome_tecnico]
+
+    def _calcula(self, combustivel, chave_ano):
+        fracao_f, fracao_b, comp_fossil, comp_bio = self.catalogo.get_composicao(combustivel)
+        fator_f = dict(self._fator_base(comp_fossil))
+        fator_b = dict(self._fator_base(comp_bio))
+
+        # Ajuste de Ano: CH4 e N2O fósseis (só faz sentido se houver parcela fóssil)
+        if chave_ano in self.fatores_ano and fracao_f > 0:
+            fator_f['CH4'] = self.fatores_ano[chave_ano]['CH4']
+            fator_f['N2O'] = self.fatores_ano[chave_ano]['N2O']
+
+        emis_f = {g: fracao_f * fator_f[g] for g in GASES}
+        emis_b = {g: fracao_b * fator_b[g] for g in GASES}
+        tco2e = (
+            (emis_f['CO2']*self.gwp['CO2']) + (emis_f['CH4']*self.gwp['CH4']) + (emis_f['N2O']*self.gwp['N2O']) +
+            (emis_b['CH4']*self.gwp['CH4']) + (emis_b['N2O']*self.gwp['N2O'])
+        ) / 1000.0
+        bio_co2 = (emis_b['CO2'] * self.gwp['CO2']) / 1000.0
+
+        return np.array(
+            [fracao_f, fracao_b]
+            + [fator_f[g] for g in GASES] + [fator_b[g] for g in GASES]
+            + [emis_f[g] for g in GASES] + [emis_b[g] for g in GASES]
+            + [tco2e, bio_co2],
+            dtype=float
+        )
@@ -0,0 +1,234 @@
+"""
+Exportação e importação colunar (Parquet) dos inventários.
+
+Cada inventário vira um arquivo Parquet escrito direto das colunas do Inventario, em
+row groups de LINHAS_POR_GRUPO (sem montar DataFrame nem passar por células de planilha).
+O esquema é estável: as colunas conhecidas de cada inventário saem sempre na mesma
+ordem e com o mesmo tipo (float64 ou texto), mesmo ausentes; colunas extras vão no fim.
+Os metadados guardam quais colunas o Inventario tinha, então a leitura devolve exatamente
+essas (inclusive as que só tinham valores vazios) e descarta as que o esquema completou.
+Os dados da empresa (Introdução) vão num arquivo próprio e nos metadados de cada arquivo.
+
+No pacote (.zip) cada tabela é um arquivo: empresa.parquet e <chave do inventário>.parquet.
+pyarrow é dependência opcional, importada só aqui.
+"""
+import io
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from src.inventario import Inventario
+
+VERSAO_ESQUEMA = "1"
+LINHAS_POR_GRUPO = 100_000
+ARQUIVO_EMPRESA = "empresa.parquet"
+
+_TEXTO, _NUMERO = "texto", "numero"
+_GASES_T1 = [f"{tipo} {lado} {g} {unidade}" for tipo, unidade in (("FE", "(kg/un)"), ("Emis.", "(t)"))
+             for lado in ("Fóssil", "Bio") for g in ("CO2", "CH4", "N2O")]
+
+# Colunas conhecidas de cada inventário (mesma ordem das páginas) e seu tipo
+ESQUEMAS = {
+    'inventario': (
+        [(c, _TEXTO) for c in ("Registro", "Descrição", "Setor", "Combustível", "Unidade")]
+        + [("Quantidade Total", _NUMERO), ("Comp. Fóssil", _TEXTO), ("Comp. Bio", _TEXTO), ("Qtd Fóssil", _NUMERO), ("Qtd Bio", _NUMERO)]
+        + [(c, _NUMERO) for c in _GASES_T1]
+        + [("Total GEE (tCO2e)", _NUMERO), ("Biogênicas (tCO2)", _NUMERO), ("Versão Fatores", _TEXTO), ("Período", _TEXTO)]
+    ),
+    'inventario_t3': (
+        [("Registro da fonte", _TEXTO), ("Descrição da fonte", _TEXTO)]
+        + [(c, _NUMERO) for c in ("Emissões de CO2 fóssil (t)", "Emissões de CH4 (t)", "Emissões de N2O (t)",
+                                  "Emissões de CO2 biogênico (t)", "Emissões de GEE totais (t CO2e)")]
+        + [("Versão Fatores", _TEXTO), ("Período", _TEXTO)]
+    ),
+    'inventario_movel': (
+        [(c, _TEXTO) for c in ("Registro", "Descrição", "Tipo Veículo", "Método", "Unidades", "Combustível Base", "Comp. Fóssil", "Comp. Bio")]
+        + [(c, _NUMERO) for c in ("Qtd Combustível Fóssil", "Qtd Biocombustível", "FE Fóssil CO2 (kg/l)", "FE Bio CO2 (kg/l)",
+                                  "FE Comercial CH4 (kg/l)", "FE Comercial N2O (kg/l)", "Emissões de CO2 fóssil (t)",
+                                  "Emissões de CH4 (t)", "Emissões de N2O (t)", "Emissões totais (t CO2e)", "Emissões de CO2 biogênico (t)")]
+        + [("Ano Fatores", _TEXTO), ("Versão Fatores", _TEXTO), ("Período", _TEXTO)]
+    ),
+    'inventario_escopo2': (
+        [("Registro", _TEXTO), ("Período", _TEXTO), ("Método", _TEXTO)]
+        + [(c, _NUMERO) for c in ("Consumo (MWh)", "Emissões localização (t CO2e)", "Emissões mercado (t CO2e)", "Leituras", "Leituras sem fator")]
+        + [("Versão Fatores", _TEXTO)]
+    ),
+    'inventario_escopo3': (
+        [("Categoria", _TEXTO), ("Transportadora", _TEXTO), ("Modal", _TEXTO), ("Período", _TEXTO)]
+        + [(c, _NUMERO) for c in ("Embarques", "Peso (t)", "t.km", "Emissões (t CO2e)")]
+        + [("Versão Fatores", _TEXTO)]
+    ),
+}
+
+
+def disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Exportação/importação Parquet requer o pacote pyarrow") from e
+    return pa, pq
+
+
+# --- ESQUEMA ---
+def esquema(chave, inv=None):
+    """[(coluna, tipo)] do arquivo: as conhecidas do inventário e, no fim, as extras do Inventario"""
+    colunas = list(ESQUEMAS.get(chave, []))
+    conhecidas = {c for c, _ in colunas}
+    if inv is not None:
+        colunas += [(c, _NUMERO if inv.coluna(c).dtype == np.float64 else _TEXTO)
+                    for c in inv.colunas if c not in conhecidas]
+    return colunas
+
+
+def schema_linhas(chave, df):
+    """
+    Schema Arrow fixo para gravar linhas de um inventário em blocos (ex.: a CLI em lote): colunas
+    conhecidas com o tipo de ESQUEMAS, extras pelo dtype do DataFrame. Assim um primeiro bloco
+    só com vazios (ex.: sem Período) não fixa o tipo nulo para os blocos seguintes.
+    """
+    tipos = dict(ESQUEMAS.get(chave, []))
+    return _schema_arrow([(c, tipos.get(c, _NUMERO if pd.api.types.is_numeric_dtype(df[c]) else _TEXTO))
+                          for c in df.columns], {})
+
+
+def _schema_arrow(colunas, metadados):
+    pa, _ = _pyarrow()
+    campos = [pa.field(c, pa.float64() if tipo == _NUMERO else pa.string()) for c, tipo in colunas]
+    return pa.schema(campos, metadata={k: json.dumps(v, ensure_ascii=False, default=str) for k, v in metadados.items()})
+
+
+def _array(valores, tipo, n):
+    pa, _ = _pyarrow()
+    if valores is None:
+        return pa.nulls(n, pa.float64() if tipo == _NUMERO else pa.string())
+    if tipo == _NUMERO:
+        if valores.dtype != np.float64:
+            valores = pd.to_numeric(pd.Series(valores, dtype=object), errors='coerce').to_numpy(dtype=float)
+        return pa.array(valores, type=pa.float64(), from_pandas=True)  # NaN -> nulo
+    if valores.dtype == np.float64:
+        return pa.array([None if v != v else repr(v) for v in valores.tolist()], type=pa.string())
+    return pa.array([None if v is None or v != v else v if type(v) is str else str(v) for v in valores], type=pa.string())
+
+
+# --- ESCRITA ---
+def escrever_inventario(destino, chave, inv, empresa_dados=None, ao_progresso=None):
+    """Grava um Inventario em Parquet (caminho ou arquivo binário), um row group por bloco de linhas"""
+    pa, pq = _pyarrow()
+    colunas = esquema(chave, inv)
+    schema = _schema_arrow(colunas, {"ghg.inventario": chave, "ghg.versao_esquema": VERSAO_ESQUEMA,
+                                     "ghg.empresa": empresa_dados or {}, "ghg.colunas": inv.colunas})
+    presentes = set(inv.colunas)
+    total = len(inv)
+    with pq.ParquetWriter(destino, schema, compression='zstd') as escritor:
+        for ini in range(0, max(total, 1), LINHAS_POR_GRUPO):
+            fim = min(ini + LINHAS_POR_GRUPO, total)
+            arrays = [_array(inv.coluna(c)[ini:fim] if c in presentes else None, tipo, fim - ini) for c, tipo in colunas]
+            escritor.write_batch(pa.record_batch(arrays, schema=schema))
+            if ao_progresso:
+                ao_progresso(fim / total if total else 1.0)
+
+
+def escrever_empresa(destino, empresa_dados):
+    """Dados da Introdução como tabela Campo/Valor (texto), como a capa do XLSX"""
+    pa, pq = _pyarrow()
+    schema = _schema_arrow([("Campo", _TEXTO), ("Valor", _TEXTO)], {"ghg.versao_esquema": VERSAO_ESQUEMA})
+    tabela = pa.table({
+        "Campo": pa.array([str(k) for k in empresa_dados], type=pa.string()),
+        "Valor": pa.array([None if v is None else str(v) for v in empresa_dados.values()], type=pa.string()),
+    }, schema=schema)
+    pq.write_table(tabela, destino, compression='zstd')
+
+
+def gerar_pacote(empresa_dados, inventarios, ao_progresso=None):
+    """ZIP com empresa.parquet e um Parquet por inventário não vazio. Retorna os bytes."""
+    saida = io.BytesIO()
+    presentes = [(chave, inv) for chave, inv in inventarios.items() if inv]
+    total = sum(len(inv) for _, inv in presentes) or 1
+    feitas = 0
+    # Parquet já vem comprimido: o ZIP só empacota (ZIP_STORED)
+    with zipfile.ZipFile(saida, 'w', compression=zipfile.ZIP_STORED) as pacote:
+        buffer = io.BytesIO()
+        escrever_empresa(buffer, empresa_dados)
+        pacote.writestr(ARQUIVO_EMPRESA, buffer.getvalue())
+        for chave, inv in presentes:
+            buffer = io.BytesIO()
+            progresso = None
+            if ao_progresso:
+                progresso = lambda f, base=feitas, n=len(inv): ao_progresso((base + f * n) / total)
+            escrever_inventario(buffer, chave, inv, empresa_dados, progresso)
+            pacote.writestr(f"{chave}.parquet", buffer.getvalue())
+            feitas += len(inv)
+    return saida.getvalue()
+
+
+# --- LEITURA ---
+def ler_inventario(origem):
+    """
+    Lê um Parquet de inventário direto para as colunas de um Inventario.
+    Textos repetidos vêm do dicionário do arquivo (uma cópia de cada valor, como o interning).
+    Retorna (chave do inventário, Inventario, dados da empresa).
+    """
+    pa, pq = _pyarrow()
+    arquivo = pq.ParquetFile(origem)
+    metadados = {k.decode('utf-8'): json.loads(v) for k, v in (arquivo.schema_arrow.metadata or {}).items()
+                 if k.startswith(b"ghg.")}
+    textos = [f.name for f in arquivo.schema_arrow if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)]
+    tabela = pq.read_table(origem, read_dictionary=textos)
+    presentes = metadados.get("ghg.colunas")
+    colunas = {}
+    for nome, coluna in zip(tabela.column_names, tabela.columns):
+        if presentes is not None and nome not in presentes:
+            continue  # Coluna do esquema que o inventário original não tinha
+        if presentes is None and tabela.num_rows and coluna.null_count == tabela.num_rows:
+            continue  # Arquivo sem a lista de colunas (ex.: gerado fora desta ferramenta)
+        coluna = coluna.combine_chunks() if coluna.num_chunks != 1 else coluna.chunk(0)
+        if pa.types.is_dictionary(coluna.type):
+            dicionario = np.array(coluna.dictionary.to_pylist() + [None], dtype=object)
+            indices = coluna.indices.fill_null(len(coluna.dictionary)).to_numpy(zero_copy_only=False)
+            colunas[nome] = dicionario[indices]
+        else:
+            colunas[nome] = coluna.to_numpy(zero_copy_only=False).astype(np.float64)
+    if presentes is not None:
+        colunas = {nome: colunas[nome] for nome in presentes if nome in colunas}  # Ordem do Inventario original
+    return metadados.get("ghg.inventario"), Inventario.de_colunas(colunas), metadados.get("ghg.empresa", {})
+
+
+def ler_empresa(origem):
+    _, pq = _pyarrow()
+    tabela = pq.read_table(origem)
+    return dict(zip(tabela.column("Campo").to_pylist(), tabela.column("Valor").to_pylist()))
+
+
+def ler_pacote(arquivo):
+    """
+    Lê o ZIP de gerar_pacote (ou um .parquet avulso de inventário).
+    Retorna (dados da empresa, {chave do inventário: Inventario}); os dados da empresa
+    vêm dos metadados dos inventários (tipos preservados) ou, sem eles, de empresa.parquet.
+    """
+    conteudo = arquivo.read() if hasattr(arquivo, 'read') else open(arquivo, 'rb').read()
+    if not zipfile.is_zipfile(io.BytesIO(conteudo)):
+        chave, inv, empresa = ler_inventario(io.BytesIO(conteudo))
+        return empresa, {chave: inv}
+    empresa, capa, inventarios = {}, {}, {}
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as pacote:
+        for nome in pacote.namelist():
+            if not nome.endswith(".parquet"):
+                continue
+            if nome == ARQUIVO_EMPRESA:
+                capa = ler_empresa(io.BytesIO(pacote.read(nome)))
+                continue
+            chave, inv, dados = ler_inventario(io.BytesIO(pacote.read(nome)))
+            inventarios[chave or nome[:-len(".parquet")]] = inv
+            empresa = empresa or dados
+    return empresa or capa, inventarios
@@ -0,0 +1,149 @@
+"""
+Consolidação de um grupo econômico (várias organizações e anos base salvos no banco).
+
+Cada subsidiária é totalizada num processo do pool (as somas rodam no próprio SQLite) e o
+grupo é consolidado pela abordagem do GHG Protocol escolhida:
+    participação societária -> emissões x participação efetiva do grupo
+    controle operacional    -> 100% das emissões das controladas, 0% das demais
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src import persistencia
+from src.importacao import detectar_separador
+from src.inventario import CATEGORIAS, TOTAIS_INVENTARIO
+
+ABORDAGENS = {
+    "participacao_societaria": "Participação societária",
+    "controle_operacional": "Controle operacional",
+}
+
+COLUNAS_ESTRUTURA = {"Organização": "organizacao", "Participação (%)": "participacao", "Controle Operacional": "controle"}
+_VERDADEIRO = {"sim", "s", "x", "1", "true", "verdadeiro", "yes", "y"}
+
+
+def ler_estrutura(arquivo):
+    """CSV com Organização, Participação (%) e Controle Operacional (Sim/Não) de cada subsidiária"""
+    df = pd.read_csv(arquivo, sep=detectar_separador(arquivo), dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    faltando = [c for c in COLUNAS_ESTRUTURA if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes na estrutura societária: {', '.join(faltando)}")
+    df = df[list(COLUNAS_ESTRUTURA)].rename(columns=COLUNAS_ESTRUTURA)
+    df["organizacao"] = df["organizacao"].str.strip()
+    participacao = pd.to_numeric(df["participacao"].str.replace(",", ".", regex=False).str.rstrip("%"), errors='coerce')
+    if participacao.isna().any() or ((participacao < 0) | (participacao > 100)).any():
+        raise ValueError("Participação (%) deve ser um número entre 0 e 100 em todas as linhas")
+    df["participacao"] = participacao / 100.0
+    df["controle"] = df["controle"].str.strip().str.lower().isin(_VERDADEIRO)
+    return df.drop_duplicates("organizacao", keep="last").reset_index(drop=True)
+
+
+# --- TOTAIS POR SUBSIDIÁRIA (POOL DE PROCESSOS) ---
+_banco = None
+
+
+def _inicia_processo(caminho_banco):
+    global _banco
+    _banco = persistencia.BancoInventario(caminho_banco)
+
+
+def _totais_subsidiaria(par):
+    organizacao, ano = par
+    linhas = []
+    for chave, totais in TOTAIS_INVENTARIO.items():
+        lancamentos, somas = _banco.somar(organizacao, ano, chave, [coluna for _, coluna in totais])
+        if lancamentos:
+            linhas.extend((organizacao, int(ano), chave, categoria, soma, lancamentos)
+                          for (categoria, _), soma in zip(totais, somas))
+    return linhas
+
+
+def calcular_subsidiarias(pares, caminho_banco=persistencia.CAMINHO_PADRAO, processos=None, ao_progresso=None):
+    """
+    Totais de cada (organização, ano) em paralelo. ao_progresso(fracao) a cada subsidiária concluída.
+    Retorna um DataFrame com Organização, Ano, Inventário, Categoria, Total (t) e Lançamentos.
+    """
+    pares = list(pares)
+    processos = min(processos or os.cpu_count() or 1, max(len(pares), 1))
+    linhas = []
+
+    def coleta(resultados):
+        for i, resultado in enumerate(resultados, start=1):
+            linhas.extend(resultado)
+            if ao_progresso:
+                ao_progresso(i / len(pares))
+
+    if processos > 1:
+        with ProcessPoolExecutor(processos, initializer=_inicia_processo, initargs=(caminho_banco,)) as executor:
+            coleta(executor.map(_totais_subsidiaria, pares, chunksize=max(1, len(pares) // (processos * 4))))
+    else:
+        _inicia_processo(caminho_banco)
+        coleta(map(_totais_subsidiaria, pares))
+    return pd.DataFrame(linhas, columns=["Organização", "Ano", "Inventário", "Categoria", "Total (t)", "Lançamentos"])
+
+
+def chave_consolidacao(estrutura, pares, abordagem, caminho_banco=persistencia.CAMINHO_PADRAO):
+    """Identifica o resultado: estrutura, subsidiárias/anos, abordagem e estado do banco (mtime/tamanho)"""
+    h = hashlib.sha256()
+    h.update(estrutura.to_csv(index=False).encode('utf-8'))
+    h.update(json.dumps([sorted(map(list, pares)), abordagem], default=str).encode('utf-8'))
+    for caminho in (caminho_banco, caminho_banco + '-wal'):
+        try:
+            st_arq = os.stat(caminho)
+            h.update(f"{st_arq.st_mtime_ns}:{st_arq.st_size}".encode('ascii'))
+        except OSError:
+            h.update(b'-')
+    return h.hexdigest()[:32]
+
+
+# --- CONSOLIDAÇÃO DO GRUPO ---
+def consolidar(totais, estrutura, abordagem="participacao_societaria"):
+    """
+    Aplica a abordagem de consolidação aos totais das subsidiárias.
+    Retorna {'grupo': Ano x Categoria, 'subsidiarias': uma linha por organização/ano,
+             'fora_da_estrutura': organizações com inventário mas sem linha na estrutura}.
+    """
+    if abordagem not in ABORDAGENS:
+        raise ValueError(f"Abordagem inválida: {abordagem} (use {', '.join(ABORDAGENS)})")
+    fator = estrutura.set_index("organizacao")["participacao" if abordagem == "participacao_societaria" else "controle"].astype(float)
+
+    por_categoria = totais.groupby(["Organização", "Ano", "Categoria"], sort=False)["Total (t)"].sum().reset_index()
+    por_categoria["Fator"] = por_categoria["Organização"].map(fator)
+    fora = sorted(por_categoria.loc[por_categoria["Fator"].isna(), "Organização"].unique())
+    por_categoria = por_categoria.dropna(subset=["Fator"])
+    por_categoria["Consolidado (t)"] = por_categoria["Total (t)"] * por_categoria["Fator"]
+
+    grupo = por_categoria.pivot_table(index="Ano", columns="Categoria", values="Consolidado (t)", aggfunc="sum", fill_value=0.0)
+    subsidiarias = por_categoria.pivot_table(index=["Organização", "Ano", "Fator"], columns="Categoria",
+                                             values="Consolidado (t)", aggfunc="sum", fill_value=0.0)
+    ordem = [c for c in CATEGORIAS if c in grupo.columns]
+    grupo = grupo.reindex(columns=ordem).rename_axis(columns=None).reset_index()
+    subsidiarias = subsidiarias.reindex(columns=ordem).rename_axis(columns=None).reset_index()
+    return {
+        'grupo': grupo,
+        'subsidiarias': subsidiarias,
+        'fora_da_estrutura': fora,
+    }
+
+
+def resultado_para_json(resultado):
+    """Resultado de consolidar() em JSON (bytes), para o cache em disco das tarefas"""
+    return json.dumps({
+        'grupo': resultado['grupo'].to_dict(orient='split', index=False),
+        'subsidiarias': resultado['subsidiarias'].to_dict(orient='split', index=False),
+        'fora_da_estrutura': list(resultado['fora_da_estrutura']),
+    }, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def resultado_de_json(dados):
+    """Inverso de resultado_para_json"""
+    bruto = json.loads(dados)
+    return {
+        'grupo': pd.DataFrame(bruto['grupo']['data'], columns=bruto['grupo']['columns']),
+        'subsidiarias': pd.DataFrame(bruto['subsidiarias']['data'], columns=bruto['subsidiarias']['columns']),
+        'fora_da_estrutura': bruto['fora_da_estrutura'],
+    }
@@ -0,0 +1,136 @@
+"""
+Consulta paginada de um Inventario no servidor: filtro, ordenação e página.
+
+A tela recebe só as linhas da página e os totais; o trabalho pesado fica em cache por
+versão do inventário (códigos das colunas de texto, ordenações e totais), então mudar
+de página ou de ordenação não refaz nada proporcional ao inventário inteiro.
+A busca por texto procura nos valores distintos de cada coluna e marca as linhas pelos códigos.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+MAX_FILTROS_EM_CACHE = 8
+
+
+class ConsultaInventario:
+    """Filtra, ordena e pagina um Inventario; entrega a página como DataFrame"""
+
+    def __init__(self, inv):
+        self.inv = inv
+        self._versao = None
+
+    def _valida_cache(self):
+        if self._versao != self.inv.versao:
+            self._versao = self.inv.versao
+            self._codigos = {}
+            self._ordens = {}
+            self._filtros = {}
+            self._totais = {}
+
+    # --- COLUNAS ---
+    def colunas_texto(self):
+        return [c for c in self.inv.colunas if self.inv.coluna(c).dtype == object]
+
+    def colunas_numericas(self):
+        return [c for c in self.inv.colunas if self.inv.coluna(c).dtype == np.float64]
+
+    def valores(self, coluna):
+        """Valores distintos de uma coluna de texto (para os filtros da tela)"""
+        return list(self._fatorado(coluna)[1])
+
+    def _fatorado(self, coluna):
+        self._valida_cache()
+        if coluna not in self._codigos:
+            self._codigos[coluna] = pd.factorize(pd.Series(self.inv.coluna(coluna), dtype=object))
+        return self._codigos[coluna]
+
+    # --- FILTRO E ORDENAÇÃO ---
+    def filtrar(self, texto="", filtros=None):
+        """
+        Posições das linhas que contêm 'texto' (sem diferenciar maiúsculas) em alguma coluna de texto
+        e cujos valores estão em filtros {coluna: [valores aceitos]}. Sem filtro, todas as linhas.
+        """
+        self._valida_cache()
+        texto = (texto or "").strip().lower()
+        filtros = {c: tuple(v) for c, v in (filtros or {}).items() if v}
+        chave = (texto, tuple(sorted(filtros.items())))
+        if chave in self._filtros:
+            return self._filtros[chave]
+
+        mascara = np.ones(len(self.inv), dtype=bool)
+        if texto:
+            encontrado = np.zeros(len(self.inv), dtype=bool)
+            for coluna in self.colunas_texto():
+                codigos, valores = self._fatorado(coluna)
+                casam = pd.Index(valores).astype(str).str.lower().str.contains(texto, regex=False)
+                if casam.any():
+                    encontrado |= np.isin(codigos, np.flatnonzero(casam))
+            mascara &= encontrado
+        for coluna, aceitos in filtros.items():
+            codigos, valores = self._fatorado(coluna)
+            mascara &= np.isin(codigos, pd.Index(valores).get_indexer(list(aceitos)))
+
+        if len(self._filtros) >= MAX_FILTROS_EM_CACHE:
+            self._filtros.pop(next(iter(self._filtros)))
+        self._filtros[chave] = linhas = np.flatnonzero(mascara)
+        return linhas
+
+    def ordenar(self, linhas, coluna=None, crescente=True):
+        """Reordena as posições filtradas pela coluna (ordem completa da coluna em cache)"""
+        if not coluna:
+            return linhas
+        self._valida_cache()
+        if coluna not in self._ordens:
+            valores = self.inv.coluna(coluna)
+            if valores.dtype == object:
+                codigos, unicos = self._fatorado(coluna)
+                # Ordena os valores distintos e leva a posição de cada um para as linhas (vazios no fim)
+                posicao = np.argsort(np.argsort(pd.Index(unicos).astype(str), kind="stable"))
+                valores = np.where(codigos >= 0, posicao[codigos] if len(unicos) else 0, len(unicos))
+            self._ordens[coluna] = np.argsort(valores, kind="stable")
+        ordem = self._ordens[coluna]
+        if not crescente:
+            ordem = ordem[::-1]
+        if len(linhas) == len(self.inv):
+            return ordem
+        selecionada = np.zeros(len(self.inv), dtype=bool)
+        selecionada[linhas] = True
+        return ordem[selecionada[ordem]]
+
+    # --- RESULTADO ---
+    def pagina(self, linhas, numero, tamanho):
+        """DataFrame só com as linhas da página (numero começa em 1)"""
+        trecho = linhas[(numero - 1) * tamanho:numero * tamanho]
+        return pd.DataFrame({c: self.inv.coluna(c)[trecho] for c in self.inv.colunas}, index=trecho + 1)
+
+    def totais(self, linhas, colunas):
+        """Somas das colunas numéricas nas linhas filtradas (as do inventário inteiro ficam em cache)"""
+        self._valida_cache()
+        todas = len(linhas) == len(self.inv)
+        resultado = {}
+        for coluna in colunas:
+            if coluna not in self.inv.colunas:
+                continue
+            if todas and coluna in self._totais:
+                resultado[coluna] = self._totais[coluna]
+                continue
+            valores = self.inv.coluna(coluna)
+            valores = valores if todas else valores[linhas]
+            resultado[coluna] = float(np.nansum(pd.to_numeric(valores, errors='coerce')))
+            if todas:
+                self._totais[coluna] = resultado[coluna]
+        return resultado
+
+
+_consultas = weakref.WeakKeyDictionary()
+
+
+def consulta_de(inv):
+    """ConsultaInventario do inventário (uma por objeto, caches preservados entre reruns)"""
+    consulta = _consultas.get(inv)
+    if consulta is None:
+        consulta = _consultas[inv] = ConsultaInventario(inv)
+    return consulta
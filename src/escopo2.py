@@ -0,0 +1,160 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.base_fatores import hash_fontes, versao_de
+from src.importacao import detectar_separador
+
+RESOLUCOES = ("anual", "mensal", "horaria")
+_DURACAO = {"anual": pd.DateOffset(years=1), "mensal": pd.DateOffset(months=1), "horaria": pd.Timedelta(hours=1)}
+
+
+class SerieFatores:
+    """
+    Série temporal de fatores de emissão da rede (tCO2e/MWh), anual, mensal ou horária.
+    Cada fator vale a partir de 'inicio' até o início do próximo período.
+    """
+
+    def __init__(self, inicio, fator, resolucao="anual", estender_ultimo=None):
+        if resolucao not in RESOLUCOES:
+            raise ValueError(f"Resolução inválida: {resolucao} (use {', '.join(RESOLUCOES)})")
+        df = pd.DataFrame({"inicio": pd.to_datetime(inicio), "fator": np.asarray(fator, dtype=float)})
+        self.df = df.sort_values("inicio").drop_duplicates("inicio", keep="last").reset_index(drop=True)
+        self.resolucao = resolucao
+        # O SIN publica o fator anual com atraso: por padrão o último ano vale para os seguintes
+        self.estender_ultimo = (resolucao == "anual") if estender_ultimo is None else estender_ultimo
+        self._inicios = self.df["inicio"].to_numpy(dtype="datetime64[ns]")
+        self._fatores = self.df["fator"].to_numpy()
+        self._fim = (self.df["inicio"].iloc[-1] + _DURACAO[resolucao]).to_datetime64() if len(self.df) else None
+
+    @classmethod
+    def anual(cls, fatores_por_ano):
+        """A partir de {'2023': 0.0430, ...} (formato do fatores_emissao.json)"""
+        anos = sorted(fatores_por_ano)
+        return cls([f"{ano}-01-01" for ano in anos], [fatores_por_ano[a] for a in anos], "anual")
+
+    @classmethod
+    def de_dataframe(cls, df, resolucao, coluna_inicio="inicio", coluna_fator="fator"):
+        return cls(df[coluna_inicio], df[coluna_fator], resolucao)
+
+    def fatores_para(self, instantes):
+        """
+        Fator vigente em cada instante (busca binária vetorizada sobre os inícios dos períodos).
+        Instantes fora da série recebem NaN.
+        """
+        t = pd.to_datetime(instantes).to_numpy(dtype="datetime64[ns]")
+        if not len(self._inicios):
+            return np.full(len(t), np.nan)
+        pos = np.searchsorted(self._inicios, t, side="right") - 1
+        fatores = self._fatores[np.clip(pos, 0, None)]
+        invalido = (pos < 0) | np.isnat(t)
+        if not self.estender_ultimo:
+            invalido |= t >= self._fim
+        return np.where(invalido, np.nan, fatores)
+
+
+class CalculadoraEscopo2:
+    """
+    Emissões de energia elétrica comprada (Escopo 2) pelas abordagens de localização e de mercado.
+    Leituras: DataFrame com 'instalacao', 'data_hora' e 'kwh' (de anual até 15 minutos).
+    """
+
+    def __init__(self, caminho='data/fatores_emissao.json'):
+        db, self.versao_fatores = {}, None
+        if os.path.exists(caminho):
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            db = json.loads(conteudo.decode('utf-8'))
+            self.versao_fatores = versao_de(hash_fontes([conteudo]))
+        sin = db.get('escopo2', {}).get('energia_eletrica_sin', {})
+        self.unidade_entrada = sin.get('unidade_entrada', 'kWh')
+        self.fatores_anuais = sin.get('fatores_medios_anuais', {})
+        self.serie_sin = SerieFatores.anual(self.fatores_anuais)
+
+    def get_anos(self):
+        return sorted(self.fatores_anuais, reverse=True)
+
+    def calcular(self, leituras, serie=None, instrumentos=None, serie_residual=None):
+        """
+        serie: fatores da rede (localização); padrão = média anual do SIN.
+        instrumentos: DataFrame 'instalacao' + 'fator' (tCO2e/MWh) de contratos/certificados (mercado).
+        serie_residual: fatores do mix residual para quem não tem instrumento (padrão = serie).
+        Retorna as leituras com fator e emissões (tCO2e) das duas abordagens.
+        """
+        serie = self.serie_sin if serie is None else serie
+        serie_residual = serie if serie_residual is None else serie_residual
+        mwh = leituras["kwh"].to_numpy(dtype=float) / 1000.0
+
+        fator_loc = serie.fatores_para(leituras["data_hora"])
+        fator_res = fator_loc if serie_residual is serie else serie_residual.fatores_para(leituras["data_hora"])
+        fator_mer = fator_res
+        if instrumentos is not None and len(instrumentos):
+            contratado = leituras["instalacao"].map(
+                instrumentos.drop_duplicates("instalacao", keep="last").set_index("instalacao")["fator"]
+            ).to_numpy(dtype=float)
+            fator_mer = np.where(np.isnan(contratado), fator_res, contratado)
+
+        resultado = leituras[["instalacao", "data_hora", "kwh"]].copy()
+        resultado["fator_localizacao"] = fator_loc
+        resultado["tco2e_localizacao"] = mwh * fator_loc
+        resultado["fator_mercado"] = fator_mer
+        resultado["tco2e_mercado"] = mwh * fator_mer
+        return resultado
+
+    def resumir(self, resultado, freq="M"):
+        """Totais por instalação e período (freq do pandas: 'M' mensal, 'Y' anual, 'Q' trimestral)"""
+        periodo = pd.to_datetime(resultado["data_hora"]).dt.to_period(freq)
+        resumo = resultado.assign(
+            periodo=periodo,
+            sem_fator=np.isnan(resultado["fator_localizacao"].to_numpy()),
+        ).groupby(["instalacao", "periodo"], sort=True).agg(
+            kwh=("kwh", "sum"),
+            tco2e_localizacao=("tco2e_localizacao", "sum"),
+            tco2e_mercado=("tco2e_mercado", "sum"),
+            leituras=("kwh", "size"),
+            leituras_sem_fator=("sem_fator", "sum"),
+        ).reset_index()
+        resumo["periodo"] = resumo["periodo"].astype(str)
+        return resumo
+
+
+# --- LEITURA DE ARQUIVOS (layout das páginas) ---
+COLUNAS_LEITURAS = {"Instalação": "instalacao", "Data/Hora": "data_hora", "Consumo (kWh)": "kwh"}
+COLUNAS_SERIE = {"Início": "inicio", "Fator (tCO2e/MWh)": "fator"}
+COLUNAS_INSTRUMENTOS = {"Instalação": "instalacao", "Fator (tCO2e/MWh)": "fator"}
+
+
+def _ler_csv(arquivo, colunas):
+    df = pd.read_csv(arquivo, sep=detectar_separador(arquivo), encoding='utf-8-sig', usecols=list(colunas))
+    return df.rename(columns=colunas)
+
+
+def _datas(serie):
+    """ISO (2023-01-31 10:15) primeiro; se não servir, formato brasileiro (31/01/2023 10:15)"""
+    datas = pd.to_datetime(serie, format='ISO8601', errors='coerce')
+    if datas.isna().mean() > 0.5:
+        datas = pd.to_datetime(serie, dayfirst=True, errors='coerce')
+    return datas
+
+
+def ler_leituras(arquivo):
+    df = _ler_csv(arquivo, COLUNAS_LEITURAS)
+    df["data_hora"] = _datas(df["data_hora"])
+    df["kwh"] = pd.to_numeric(df["kwh"], errors='coerce')
+    df["instalacao"] = df["instalacao"].astype(str)
+    return df
+
+
+def ler_serie(arquivo, resolucao):
+    df = _ler_csv(arquivo, COLUNAS_SERIE)
+    df["inicio"] = _datas(df["inicio"])
+    return SerieFatores.de_dataframe(df.dropna(), resolucao)
+
+
+def ler_instrumentos(arquivo):
+    df = _ler_csv(arquivo, COLUNAS_INSTRUMENTOS)
+    df["instalacao"] = df["instalacao"].astype(str)
+    df["fator"] = pd.to_numeric(df["fator"], errors='coerce')
+    return df.dropna()
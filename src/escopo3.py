@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.base_fatores import hash_fontes, versao_de
+from src.importacao import TAMANHO_BLOCO, converter_numeros, ler_em_blocos, ler_periodos, registrar_erros
+from src.series import COLUNA_PERIODO
+
+# Período (AAAA-MM, MM/AAAA ou AAAA) é opcional, como na importação do Escopo 1
+COLUNAS_TRANSPORTE = ["Categoria", "Transportadora", "Modal", "Peso (t)", "Distância (km)"]
+CHAVES_RESUMO = ["Categoria", "Transportadora", "Modal", COLUNA_PERIODO]
+SOMAS_RESUMO = ["Embarques", "Peso (t)", "t.km", "Emissões (t CO2e)"]
+PARCIAIS_ANTES_DE_COMPACTAR = 16
+
+
+class CalculadoraTransporte:
+    """
+    Transporte e distribuição (Escopo 3, categorias 4 e 9) pelo método de t.km:
+    emissões = peso (t) x distância (km) x fator do modal (kg CO2e/t.km).
+    """
+
+    def __init__(self, caminho='data/fatores_emissao.json'):
+        db, self.versao_fatores = {}, None
+        if os.path.exists(caminho):
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            db = json.loads(conteudo.decode('utf-8'))
+            self.versao_fatores = versao_de(hash_fontes([conteudo]))
+        self.fatores = db.get('escopo3', {}).get('transporte', {}).get('fatores_tkm', {})
+        self.modais = list(self.fatores)
+        # Último elemento = modal desconhecido (código -1 do get_indexer)
+        self._vetor_fatores = np.append(np.array([self.fatores[m] for m in self.modais], dtype=float), np.nan)
+        self._indice_modais = pd.Index(self.modais)
+        self._normalizados = {m.strip().lower(): m for m in self.modais}
+
+    def get_modais(self):
+        return self.modais
+
+    def normalizar_modal(self, modal):
+        """Aceita o nome do modal sem diferenciar maiúsculas/espaços; desconhecido vira NaN"""
+        return pd.Series(modal).astype(str).str.strip().str.lower().map(self._normalizados)
+
+    def calcular(self, modal, peso_t, distancia_km):
+        """Vetorizado: retorna (t.km, tCO2e) por embarque; modal desconhecido resulta em NaN"""
+        codigos = self._indice_modais.get_indexer(pd.Index(modal, dtype=object))
+        tkm = np.asarray(peso_t, dtype=float) * np.asarray(distancia_km, dtype=float)
+        return tkm, tkm * self._vetor_fatores[codigos] / 1000.0
+
+
+class ResumoTransporte:
+    """
+    Totais por categoria, transportadora, modal e período acumulados bloco a bloco.
+    Cada bloco é agrupado (vetorizado) e as parciais são recompactadas de tempos em tempos,
+    então a memória depende do número de grupos, não do número de embarques.
+    """
+
+    def __init__(self):
+        self._parciais = []
+
+    def adicionar(self, embarques):
+        """embarques: DataFrame com CHAVES_RESUMO + 'Peso (t)', 't.km', 'Emissões (t CO2e)'"""
+        if embarques.empty:
+            return
+        self._parciais.append(_agrupa(embarques.assign(Embarques=1)))
+        if len(self._parciais) >= PARCIAIS_ANTES_DE_COMPACTAR:
+            self._parciais = [_agrupa(pd.concat(self._parciais, ignore_index=True))]
+
+    @property
+    def detalhado(self):
+        if not self._parciais:
+            return pd.DataFrame(columns=CHAVES_RESUMO + SOMAS_RESUMO)
+        self._parciais = [_agrupa(pd.concat(self._parciais, ignore_index=True))]
+        return self._parciais[0]
+
+    def por(self, coluna):
+        """Totais por 'Categoria', 'Transportadora' ou 'Modal'"""
+        return self.detalhado.groupby(coluna, sort=True)[SOMAS_RESUMO].sum().reset_index()
+
+
+def _agrupa(df):
+    totais = df.groupby(CHAVES_RESUMO, sort=True, dropna=False)[SOMAS_RESUMO].sum().reset_index()
+    periodo = totais[COLUNA_PERIODO].astype(object)
+    totais[COLUNA_PERIODO] = periodo.where(periodo.notna(), None)  # Sem período: vazio (texto), não NaN
+    return totais
+
+
+# --- ARQUIVOS GRANDES (CSV/XLSX EM BLOCOS) ---
+def validar_transporte(bloco, linha_inicial, calc, erros):
+    """Separa os embarques válidos do bloco já calculados; anota os problemas em erros"""
+    linhas = np.arange(linha_inicial, linha_inicial + len(bloco))
+    modal = calc.normalizar_modal(bloco["Modal"].to_numpy())
+    peso = converter_numeros(bloco["Peso (t)"])
+    distancia = converter_numeros(bloco["Distância (km)"])
+    periodo, periodo_invalido = ler_periodos(bloco)
+
+    invalido = np.zeros(len(bloco), dtype=bool)
+    n_erros = 0
+    for mascara, mensagem in (
+        (modal.isna().to_numpy(), f"Modal inválido (use {', '.join(calc.get_modais())})"),
+        (~(peso > 0).to_numpy(), "Peso deve ser um número maior que zero"),
+        (~(distancia > 0).to_numpy(), "Distância deve ser um número maior que zero"),
+        (periodo_invalido, "Período inválido (use AAAA-MM, MM/AAAA ou AAAA)"),
+    ):
+        mascara = mascara & ~invalido
+        n_erros += registrar_erros(erros, mascara, linhas, mensagem)
+        invalido |= mascara
+
+    ok = ~invalido
+    tkm, tco2e = calc.calcular(modal.to_numpy()[ok], peso.to_numpy()[ok], distancia.to_numpy()[ok])
+    embarques = pd.DataFrame({
+        "Categoria": bloco["Categoria"].str.strip().to_numpy()[ok],
+        "Transportadora": bloco["Transportadora"].str.strip().to_numpy()[ok],
+        "Modal": modal.to_numpy()[ok],
+        COLUNA_PERIODO: periodo[ok],
+        "Peso (t)": peso.to_numpy()[ok],
+        "t.km": tkm,
+        "Emissões (t CO2e)": tco2e,
+    })
+    return embarques, n_erros
+
+
+def processar_arquivo(arquivo, nome_arquivo, calc, ao_progresso=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê o log de embarques em blocos e acumula os totais sem guardar as linhas.
+    Retorna {'resumo': ResumoTransporte, 'validas', 'invalidas', 'erros'}.
+    """
+    resultado = {'resumo': ResumoTransporte(), 'validas': 0, 'invalidas': 0, 'erros': []}
+    for bloco, linha_inicial, fracao in ler_em_blocos(arquivo, nome_arquivo, COLUNAS_TRANSPORTE, tamanho_bloco):
+        embarques, n_erros = validar_transporte(bloco, linha_inicial, calc, resultado['erros'])
+        resultado['resumo'].adicionar(embarques)
+        resultado['validas'] += len(embarques)
+        resultado['invalidas'] += n_erros
+        if ao_progresso:
+            ao_progresso(fracao)
+    return resultado
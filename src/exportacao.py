@@ -0,0 +1,87 @@
+import datetime
+from io import BytesIO
+
+import numpy as np
+
+LINHAS_POR_BLOCO = 5_000
+
+# Abas do relatório: chave do session_state -> nome da aba
+ABAS_INVENTARIO = {
+    'inventario': "Estacionária - Tabela 1",
+    'inventario_t3': "Estacionária - Tabela 3",
+    'inventario_movel': "Combustão Móvel",
+    'inventario_escopo2': "Escopo 2 - Energia Elétrica",
+    'inventario_escopo3': "Escopo 3 - Transporte",
+}
+
+
+def gerar_excel(empresa_dados, inventarios, ao_progresso=None):
+    """
+    Monta o XLSX com a capa (Introdução) e uma aba por inventário.
+    Usa o modo constant_memory do xlsxwriter: as linhas vão para disco à medida que
+    são escritas, lidas das colunas do Inventario em blocos. Retorna os bytes do arquivo.
+    inventarios: dict chave -> Inventario (ou None), com as chaves de ABAS_INVENTARIO.
+    ao_progresso(fracao) é chamado a cada bloco de linhas escrito.
+    """
+    import xlsxwriter
+
+    output = BytesIO()
+    wb = xlsxwriter.Workbook(output, {'constant_memory': True})
+    fmt_cabecalho = wb.add_format({'bold': True})
+    fmt_data = wb.add_format({'num_format': 'dd/mm/yyyy'})
+
+    # 1. Aba de Introdução (Capa)
+    ws = wb.add_worksheet('Introdução')
+    ws.write_row(0, 0, ['Campo', 'Valor'], fmt_cabecalho)
+    for i, (campo, valor) in enumerate(empresa_dados.items(), start=1):
+        ws.write_string(i, 0, str(campo))
+        if isinstance(valor, (datetime.date, datetime.datetime)):
+            ws.write_datetime(i, 1, valor, fmt_data)
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            ws.write_number(i, 1, valor)
+        else:
+            ws.write_string(i, 1, "" if valor is None else str(valor))
+
+    # 2. Uma aba por inventário, escrita linha a linha
+    total = sum(len(inv) for inv in inventarios.values() if inv is not None)
+    escritas = 0
+    for chave, nome_aba in ABAS_INVENTARIO.items():
+        inv = inventarios.get(chave)
+        if inv is None or not inv:
+            continue
+        ws = wb.add_worksheet(nome_aba)
+        for linhas in _escreve_inventario(ws, inv, fmt_cabecalho):
+            escritas += linhas
+            if ao_progresso:
+                ao_progresso(escritas / total)
+
+    wb.close()
+    return output.getvalue()
+
+
+def _escreve_inventario(ws, inv, fmt_cabecalho):
+    """Escreve a aba em blocos; gera quantas linhas cada bloco escreveu"""
+    colunas = inv.colunas
+    ws.write_row(0, 0, colunas, fmt_cabecalho)
+    total = len(inv)
+    for ini in range(0, total, LINHAS_POR_BLOCO):
+        fim = min(ini + LINHAS_POR_BLOCO, total)
+        escrever_linhas(ws, [inv.coluna(nome)[ini:fim] for nome in colunas], ini + 1)
+        yield fim - ini
+
+
+def escrever_linhas(ws, colunas, primeira_linha):
+    """Escreve um bloco de linhas (lista de arrays, um por coluna) a partir de primeira_linha"""
+    celulas = [_celulas(valores) for valores in colunas]
+    for i, valores in enumerate(zip(*celulas), start=primeira_linha):
+        ws.write_row(i, 0, valores)
+
+
+def _celulas(valores):
+    """Converte um trecho de coluna em valores aceitos pelo xlsxwriter (NaN/None -> célula vazia)"""
+    if valores.dtype == np.float64:
+        celulas = valores.astype(object)
+        celulas[np.isnan(valores)] = None
+        return celulas.tolist()
+    return [None if v is None or v != v else v.item() if isinstance(v, np.generic)
+            else v if isinstance(v, (str, int, float)) else str(v) for v in valores]
@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from src.series import COLUNA_PERIODO, normalizar_periodos
+
+TAMANHO_BLOCO = 20_000
+MAX_ERROS = 1_000  # Guardamos só os primeiros erros para a memória não crescer com o arquivo
+
+COLUNAS_ESTACIONARIA = ["Registro", "Descrição", "Combustível", "Quantidade"]
+COLUNAS_MOVEL = ["Registro", "Descrição", "Opção", "Tipo Veículo", "Ano", "Combustível", "Quantidade"]
+# Opcional nos dois layouts: mês (AAAA-MM, MM/AAAA, data) ou ano do dado de atividade
+COLUNAS_OPCIONAIS = [COLUNA_PERIODO]
+
+
+# --- LEITURA EM BLOCOS ---
+def ler_em_blocos(arquivo, nome_arquivo, colunas, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê um CSV/XLSX em blocos de até tamanho_bloco linhas.
+    Gera (df_bloco, linha_inicial, fracao_lida); linha_inicial é a linha do arquivo
+    (cabeçalho = linha 1) do primeiro registro do bloco.
+    """
+    if nome_arquivo.lower().endswith((".xlsx", ".xlsm")):
+        yield from _ler_xlsx(arquivo, colunas, tamanho_bloco)
+    else:
+        yield from _ler_csv(arquivo, colunas, tamanho_bloco)
+
+
+def _ler_csv(arquivo, colunas, tamanho_bloco):
+    tamanho_total = _tamanho(arquivo)
+    linha = 2
+    leitor = pd.read_csv(arquivo, chunksize=tamanho_bloco, dtype=str, keep_default_na=False,
+                         sep=detectar_separador(arquivo), encoding='utf-8-sig')
+    for bloco in leitor:
+        _confere_colunas(bloco.columns, colunas)
+        fracao = min(arquivo.tell() / tamanho_total, 1.0) if tamanho_total else 1.0
+        yield bloco.reset_index(drop=True), linha, fracao
+        linha += len(bloco)
+
+
+def _ler_xlsx(arquivo, colunas, tamanho_bloco):
+    from openpyxl import load_workbook  # Dependência opcional, só para XLSX
+
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        total = max((ws.max_row or 1) - 1, 1)
+        linhas = ws.iter_rows(values_only=True)
+        cabecalho = [str(c).strip() if c is not None else "" for c in next(linhas, ())]
+        _confere_colunas(cabecalho, colunas)
+
+        buffer = []
+        linha = 2
+        for valores in linhas:
+            buffer.append(["" if v is None else str(v) for v in valores[:len(cabecalho)]])
+            if len(buffer) == tamanho_bloco:
+                yield pd.DataFrame(buffer, columns=cabecalho), linha, min((linha - 2 + len(buffer)) / total, 1.0)
+                linha += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=cabecalho), linha, 1.0
+    finally:
+        wb.close()
+
+
+def detectar_separador(arquivo):
+    """Planilhas brasileiras costumam exportar CSV com ';' — decide pelo cabeçalho"""
+    posicao = arquivo.tell()
+    cabecalho = arquivo.readline()
+    arquivo.seek(posicao)
+    if isinstance(cabecalho, bytes):
+        cabecalho = cabecalho.decode('utf-8', errors='ignore')
+    return ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+
+
+def _tamanho(arquivo):
+    try:
+        posicao = arquivo.tell()
+        arquivo.seek(0, 2)
+        tamanho = arquivo.tell()
+        arquivo.seek(posicao)
+        return tamanho
+    except (AttributeError, OSError):
+        return 0
+
+
+def _confere_colunas(encontradas, esperadas):
+    faltando = [c for c in esperadas if c not in list(encontradas)]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(faltando)}")
+
+
+# --- VALIDAÇÃO ---
+def converter_numeros(serie):
+    """Converte uma coluna de texto em números aceitando vírgula decimal; inválidos viram NaN"""
+    texto = serie.astype(str).str.strip()
+    com_virgula = texto.str.contains(",", regex=False) & ~texto.str.contains(".", regex=False)
+    texto = texto.where(~com_virgula, texto.str.replace(",", ".", regex=False))
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def ler_periodos(bloco):
+    """(períodos normalizados, inválidos) da coluna opcional Período; sem a coluna, tudo vazio"""
+    if COLUNA_PERIODO not in bloco:
+        return np.full(len(bloco), None, dtype=object), np.zeros(len(bloco), dtype=bool)
+    return normalizar_periodos(bloco[COLUNA_PERIODO].to_numpy(dtype=object))
+
+
+def registrar_erros(erros, mascara, linhas, mensagem):
+    """Anota em erros (até MAX_ERROS) as linhas marcadas na máscara. Retorna quantas foram marcadas."""
+    for linha in linhas[mascara][:max(MAX_ERROS - len(erros), 0)]:
+        erros.append({"Linha": int(linha), "Erro": mensagem})
+    return int(mascara.sum())
+
+
+def validar_estacionaria(bloco, linha_inicial, calc, erros):
+    """Separa as linhas válidas do bloco; anota os problemas em erros. Retorna (entrada_lote, n_erros)"""
+    linhas = np.arange(linha_inicial, linha_inicial + len(bloco))
+    combustivel = bloco["Combustível"].str.strip()
+    qtd = converter_numeros(bloco["Quantidade"])
+    periodo, periodo_invalido = ler_periodos(bloco)
+
+    invalido = np.zeros(len(bloco), dtype=bool)
+    n_erros = 0
+    combustiveis_validos = set(calc.get_combustiveis_estacionaria())
+    for mascara, mensagem in (
+        (~combustivel.isin(combustiveis_validos).to_numpy(), "Combustível não encontrado no catálogo"),
+        (~(qtd > 0).to_numpy(), "Quantidade deve ser um número maior que zero"),
+        (periodo_invalido, "Período inválido (use AAAA-MM, MM/AAAA ou AAAA)"),
+    ):
+        mascara = mascara & ~invalido
+        n_erros += registrar_erros(erros, mascara, linhas, mensagem)
+        invalido |= mascara
+
+    ok = ~invalido
+    entrada = pd.DataFrame({
+        "Registro": bloco["Registro"].to_numpy()[ok],
+        "Descrição": bloco["Descrição"].to_numpy()[ok],
+        "opcao": 2,
+        "combustivel_direto": combustivel.to_numpy()[ok],
+        "qtd": qtd.to_numpy()[ok],
+        "periodo": periodo[ok],
+    })
+    return entrada, n_erros
+
+
+def validar_movel(bloco, linha_inicial, calc, erros):
+    """Mesmo contrato de validar_estacionaria, para as Opções 1, 2 e 3 da combustão móvel"""
+    linhas = np.arange(linha_inicial, linha_inicial + len(bloco))
+    opcao = pd.to_numeric(bloco["Opção"].str.strip(), errors='coerce')
+    tipo = bloco["Tipo Veículo"].str.strip()
+    ano = bloco["Ano"].str.strip().str.replace(r"\.0$", "", regex=True)
+    combustivel = bloco["Combustível"].str.strip()
+    qtd = converter_numeros(bloco["Quantidade"])
+    periodo, periodo_invalido = ler_periodos(bloco)
+
+    frota = calc.db.get('combustao_movel', {}).get('frota_veiculos', {})
+    permite_ano = tipo.map({k: v.get('permite_ano', True) for k, v in frota.items()}).fillna(False).to_numpy(dtype=bool)
+    usa_veiculo = opcao.isin([1, 3]).to_numpy()
+
+    invalido = np.zeros(len(bloco), dtype=bool)
+    n_erros = 0
+    for mascara, mensagem in (
+        (~opcao.isin([1, 2, 3]).to_numpy(), "Opção deve ser 1, 2 ou 3"),
+        (usa_veiculo & ~tipo.isin(list(frota)).to_numpy(), "Tipo de veículo não cadastrado"),
+        (usa_veiculo & permite_ano & (ano != "").to_numpy() & ~ano.isin(calc.get_anos_frota()).to_numpy(), "Ano da frota inválido"),
+        ((opcao == 2).to_numpy() & ~combustivel.isin(list(calc.catalogo.componentes)).to_numpy(), "Combustível não encontrado no catálogo"),
+        (~(qtd >= 0).to_numpy(), "Quantidade deve ser um número maior ou igual a zero"),
+        (periodo_invalido, "Período inválido (use AAAA-MM, MM/AAAA ou AAAA)"),
+    ):
+        mascara = mascara & ~invalido
+        n_erros += registrar_erros(erros, mascara, linhas, mensagem)
+        invalido |= mascara
+
+    ok = ~invalido
+    # Mesmo tratamento dos formulários: sem ano (ou veículo sem ano) vira "N/A"
+    ano = ano.where(permite_ano & (ano != "").to_numpy(), "N/A")
+    entrada = pd.DataFrame({
+        "Registro": bloco["Registro"].to_numpy()[ok],
+        "Descrição": bloco["Descrição"].to_numpy()[ok],
+        "opcao": opcao.to_numpy()[ok].astype(int),
+        "tipo_veiculo": np.where(usa_veiculo, tipo.to_numpy(dtype=object), "Diversos")[ok],
+        "ano": np.where(usa_veiculo, ano.to_numpy(dtype=object), None)[ok],
+        "combustivel_direto": np.where(usa_veiculo, None, combustivel.to_numpy(dtype=object))[ok],
+        "qtd": qtd.to_numpy()[ok],
+        "periodo": periodo[ok],
+    })
+    return entrada, n_erros
+
+
+# --- MONTAGEM DAS LINHAS DO INVENTÁRIO (mesmas colunas dos formulários) ---
+def linhas_estacionaria(entrada, res, calc, setor=None):
+    """Colunas da Tabela 1 (ver novo_lancamento em estacionaria.py)"""
+    return pd.DataFrame({
+        "Registro": entrada["Registro"], "Descrição": entrada["Descrição"], "Setor": setor,
+        "Combustível": entrada["combustivel_direto"],
+        "Unidade": entrada["combustivel_direto"].map(calc.get_unidade),
+        "Quantidade Total": entrada["qtd"],
+        "Comp. Fóssil": res["comp_fossil"], "Comp. Bio": res["comp_bio"],
+        "Qtd Fóssil": res["qtd_fossil"], "Qtd Bio": res["qtd_bio"],
+        "FE Fóssil CO2 (kg/un)": res["fatores_fossil_CO2"], "FE Fóssil CH4 (kg/un)": res["fatores_fossil_CH4"], "FE Fóssil N2O (kg/un)": res["fatores_fossil_N2O"],
+        "FE Bio CO2 (kg/un)": res["fatores_bio_CO2"], "FE Bio CH4 (kg/un)": res["fatores_bio_CH4"], "FE Bio N2O (kg/un)": res["fatores_bio_N2O"],
+        "Emis. Fóssil CO2 (t)": res["emis_fossil_CO2"] / 1000, "Emis. Fóssil CH4 (t)": res["emis_fossil_CH4"] / 1000, "Emis. Fóssil N2O (t)": res["emis_fossil_N2O"] / 1000,
+        "Emis. Bio CO2 (t)": res["emis_bio_CO2"] / 1000, "Emis. Bio CH4 (t)": res["emis_bio_CH4"] / 1000, "Emis. Bio N2O (t)": res["emis_bio_N2O"] / 1000,
+        "Total GEE (tCO2e)": res["total_gee"], "Biogênicas (tCO2)": res["total_bio"],
+        "Versão Fatores": res["versao_fatores"],
+        "Período": entrada["periodo"] if "periodo" in entrada else None,
+    })
+
+
+def linhas_movel(entrada, res):
+    """Colunas do inventário móvel (ver salvar_resultado em movel.py)"""
+    return pd.DataFrame({
+        "Registro": entrada["Registro"], "Descrição": entrada["Descrição"],
+        "Tipo Veículo": entrada["tipo_veiculo"],
+        "Método": "Opção " + entrada["opcao"].astype(str) + " (Importação)",
+        "Unidades": res["unidade_entrada"],
+        "Combustível Base": res["combustivel_utilizado"],
+        "Comp. Fóssil": res["comp_fossil"],
+        "Comp. Bio": res["comp_bio"],
+        "Qtd Combustível Fóssil": res["qtd_fossil"],
+        "Qtd Biocombustível": res["qtd_bio"],
+        "FE Fóssil CO2 (kg/l)": res["fatores_fossil_CO2"],
+        "FE Bio CO2 (kg/l)": res["fatores_bio_CO2"],
+        "FE Comercial CH4 (kg/l)": res["fatores_fossil_CH4"],
+        "FE Comercial N2O (kg/l)": res["fatores_fossil_N2O"],
+        "Emissões de CO2 fóssil (t)": res["emis_fossil_CO2"] / 1000,
+        "Emissões de CH4 (t)": (res["emis_fossil_CH4"] + res["emis_bio_CH4"]) / 1000,
+        "Emissões de N2O (t)": (res["emis_fossil_N2O"] + res["emis_bio_N2O"]) / 1000,
+        "Emissões totais (t CO2e)": res["total_gee"],
+        "Emissões de CO2 biogênico (t)": res["total_bio"],
+        "Ano Fatores": res["chave_ano"],
+        "Versão Fatores": res["versao_fatores"],
+        "Período": entrada["periodo"] if "periodo" in entrada else None,
+    })
+
+
+# --- PIPELINE COMPLETO ---
+def importar_arquivo(arquivo, nome_arquivo, tipo, calc, ao_bloco, ao_progresso=None, tamanho_bloco=TAMANHO_BLOCO, setor=None):
+    """
+    Importa um arquivo bloco a bloco. tipo: 'estacionaria' ou 'movel'.
+    ao_bloco(df_linhas) recebe as linhas válidas já calculadas de cada bloco;
+    ao_progresso(fracao) é chamado após cada bloco; setor vai para as linhas da Tabela 1.
+    Retorna {'validas': int, 'invalidas': int, 'erros': [{'Linha', 'Erro'}, ...]}.
+    """
+    colunas = COLUNAS_ESTACIONARIA if tipo == 'estacionaria' else COLUNAS_MOVEL
+    validar = validar_estacionaria if tipo == 'estacionaria' else validar_movel
+    resumo = {'validas': 0, 'invalidas': 0, 'erros': []}
+
+    for bloco, linha_inicial, fracao in ler_em_blocos(arquivo, nome_arquivo, colunas, tamanho_bloco):
+        entrada, n_erros = validar(bloco, linha_inicial, calc, resumo['erros'])
+        resumo['invalidas'] += n_erros
+        if not entrada.empty:
+            res = calc.calcular_lote(entrada)
+            if tipo == 'estacionaria':
+                ao_bloco(linhas_estacionaria(entrada, res, calc, setor))
+            else:
+                ao_bloco(linhas_movel(entrada, res))
+            resumo['validas'] += len(entrada)
+        if ao_progresso:
+            ao_progresso(fracao)
+    return resumo
@@ -0,0 +1,212 @@
+"""
+Análise de incerteza por Monte Carlo dos totais do inventário.
+
+Cada lançamento recebe um multiplicador de atividade próprio (independente entre linhas) e
+cada fator de emissão um multiplicador compartilhado por todas as linhas que usam o mesmo
+fator (correlação total, como recomenda o IPCC). As amostras são sorteadas em blocos como
+matrizes NumPy (amostras x linhas); por grupo de linhas com os mesmos fatores, a soma
+ponderada vira um produto de matrizes.
+
+Com atividade normal (padrão), a soma das linhas de um grupo é exatamente normal
+multivariada (média = soma das emissões, covariância = sigma² x soma de e·eᵀ), então cada
+grupo sorteia só (amostras x gases) em vez de (amostras x linhas). Com atividade lognormal
+o sorteio é feito linha a linha.
+"""
+import numpy as np
+import pandas as pd
+
+# Distribuição e meia-largura do intervalo de 95% (em % da média) por tipo de incerteza
+INCERTEZAS_PADRAO = {
+    "atividade": ("normal", 5.0),
+    "CO2": ("normal", 5.0),
+    "CH4": ("lognormal", 100.0),
+    "N2O": ("lognormal", 150.0),
+    "rede": ("normal", 10.0),
+    "transporte": ("lognormal", 30.0),
+}
+DISTRIBUICOES = ("normal", "lognormal")
+PERCENTIS = (2.5, 50.0, 97.5)
+ELEMENTOS_POR_BLOCO = 4_000_000  # amostras x linhas sorteadas de uma vez (float32)
+
+# Emissões de cada inventário: (categoria, gás, coluna em t do gás, coluna(s) que identificam o fator, tipo de incerteza)
+# Coluna do fator None = valor já calculado em outra ferramenta (só incerteza de atividade)
+# Mesmo componente (Comp. Fóssil/Comp. Bio) = mesmo fator em todos os inventários; CH4/N2O da combustão
+# móvel vêm da linha de fatores_ch4_n2o_por_ano (Ano Fatores) de cada combustível.
+COMPONENTES = {
+    'inventario': [
+        ("Escopo 1", "CO2", "Emis. Fóssil CO2 (t)", "Comp. Fóssil", "CO2"),
+        ("Escopo 1", "CH4", "Emis. Fóssil CH4 (t)", "Comp. Fóssil", "CH4"),
+        ("Escopo 1", "N2O", "Emis. Fóssil N2O (t)", "Comp. Fóssil", "N2O"),
+        ("Escopo 1", "CH4", "Emis. Bio CH4 (t)", "Comp. Bio", "CH4"),
+        ("Escopo 1", "N2O", "Emis. Bio N2O (t)", "Comp. Bio", "N2O"),
+        ("CO2 biogênico", "CO2", "Emis. Bio CO2 (t)", "Comp. Bio", "CO2"),
+    ],
+    'inventario_t3': [
+        ("Escopo 1", "CO2", "Emissões de CO2 fóssil (t)", None, None),
+        ("Escopo 1", "CH4", "Emissões de CH4 (t)", None, None),
+        ("Escopo 1", "N2O", "Emissões de N2O (t)", None, None),
+        ("CO2 biogênico", "CO2", "Emissões de CO2 biogênico (t)", None, None),
+    ],
+    'inventario_movel': [
+        ("Escopo 1", "CO2", "Emissões de CO2 fóssil (t)", "Comp. Fóssil", "CO2"),
+        ("Escopo 1", "CH4", "Emissões de CH4 (t)", ("Combustível Base", "Ano Fatores"), "CH4"),
+        ("Escopo 1", "N2O", "Emissões de N2O (t)", ("Combustível Base", "Ano Fatores"), "N2O"),
+        ("CO2 biogênico", "CO2", "Emissões de CO2 biogênico (t)", "Comp. Bio", "CO2"),
+    ],
+    'inventario_escopo2': [
+        ("Escopo 2 (localização)", "CO2e", "Emissões localização (t CO2e)", "Período", "rede"),
+    ],
+    'inventario_escopo3': [
+        ("Escopo 3", "CO2e", "Emissões (t CO2e)", "Modal", "transporte"),
+    ],
+}
+CATEGORIAS_TOTAL = ("Escopo 1", "Escopo 2 (localização)", "Escopo 3")
+
+
+def _multiplicadores(rng, forma, distribuicao, meia_largura_pct):
+    """Multiplicadores com média 1 (float32); meia_largura_pct = metade do IC 95% em % da média"""
+    sigma = meia_largura_pct / 100.0 / 1.96
+    if sigma <= 0:
+        return np.ones(forma, dtype=np.float32)
+    z = rng.standard_normal(forma, dtype=np.float32)
+    if distribuicao == "lognormal":
+        s = np.float32(np.sqrt(np.log1p(sigma ** 2)))
+        return np.exp(z * s - s * s / 2)
+    return np.maximum(z * np.float32(sigma) + 1, 0)  # Normal truncada em zero
+
+
+class _Grupo:
+    """Linhas de um inventário que usam os mesmos fatores: emissões (linhas x componentes) e ids de fator"""
+
+    def __init__(self, emissoes, fatores):
+        self.emissoes = emissoes
+        self.fatores = fatores
+        self.soma = emissoes.sum(axis=0, dtype=np.float64)
+        # Raiz R da matriz soma de e·eᵀ (RᵀR); autovalores por ser possivelmente singular
+        autovalores, autovetores = np.linalg.eigh(emissoes.T.astype(np.float64) @ emissoes)
+        self.raiz = (autovetores * np.sqrt(np.clip(autovalores, 0, None))).T
+
+    def atividade(self, rng, b, distribuicao, meia_largura_pct):
+        """Soma por componente das emissões do grupo com a incerteza de atividade (b x componentes)"""
+        if distribuicao == "normal":
+            z = rng.standard_normal((b, len(self.soma)))
+            return self.soma + (meia_largura_pct / 100.0 / 1.96) * (z @ self.raiz)
+        return _multiplicadores(rng, (b, len(self.emissoes)), distribuicao, meia_largura_pct) @ self.emissoes
+
+
+def _colunas_fator(col_fator, df):
+    """Colunas presentes que identificam o fator, como tupla; None se não houver nenhuma"""
+    colunas = (col_fator,) if isinstance(col_fator, str) else tuple(col_fator or ())
+    return tuple(c for c in colunas if c in df.columns) or None
+
+
+def _prepara(inventarios, gwp, incertezas):
+    """Monta os grupos de cada inventário e o mapa componente -> (categoria, gás)"""
+    saidas = {}
+    fatores = {}
+    preparados = []
+    for chave, componentes in COMPONENTES.items():
+        inv = inventarios.get(chave)
+        df = getattr(inv, 'df', inv)
+        if df is None or len(df) == 0:
+            continue
+        componentes = [(cat, gas, col, _colunas_fator(col_fator, df), tipo) for cat, gas, col, col_fator, tipo in componentes
+                       if col in df.columns]
+        if not componentes:
+            continue
+        emissoes = np.column_stack([
+            pd.to_numeric(df[col], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64) * gwp.get(gas, 1.0)
+            for _, gas, col, _, _ in componentes
+        ])
+        saida = np.array([saidas.setdefault((cat, gas), len(saidas)) for cat, gas, _, _, _ in componentes])
+
+        # Assinatura de cada linha = valores das colunas de fator usadas; linhas iguais formam um grupo
+        colunas_fator = list(dict.fromkeys(c for componente in componentes for c in componente[3] or ()))
+        if colunas_fator:
+            assinatura = df[colunas_fator].astype(str).agg("\x1f".join, axis=1) if len(colunas_fator) > 1 else df[colunas_fator[0]].astype(str)
+            codigos, valores = pd.factorize(assinatura)
+        else:
+            codigos, valores = np.zeros(len(df), dtype=np.int64), np.array([""])
+        ordem = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+
+        grupos = []
+        for g in range(len(valores)):
+            linhas = ordem[limites[g]:limites[g + 1]]
+            primeira = df.iloc[linhas[0]]
+            ids = []
+            for _, gas, _, col_fator, tipo in componentes:
+                if col_fator is None or tipo not in incertezas:
+                    ids.append(-1)
+                else:
+                    referencia = "\x1f".join(str(primeira[c]) for c in col_fator)
+                    ids.append(fatores.setdefault((tipo, chave if tipo in ("rede", "transporte") else "", referencia), len(fatores)))
+            grupos.append(_Grupo(emissoes[linhas].astype(np.float32), np.array(ids, dtype=np.int64)))
+        preparados.append((chave, emissoes.sum(axis=0), saida, grupos))
+    return preparados, saidas, fatores
+
+
+def simular(inventarios, gwp, n_amostras=10_000, incertezas=None, semente=None, ao_progresso=None):
+    """
+    inventarios: dict chave -> Inventario (ou DataFrame), com as chaves de COMPONENTES.
+    incertezas: sobrepõe INCERTEZAS_PADRAO ({tipo: (distribuição, meia-largura %)}).
+    Retorna (amostras, resumo): amostras é um DataFrame (n_amostras x categoria/gás, em t CO2e)
+    e resumo traz estimativa pontual, média e percentis por categoria e gás, com os totais.
+    """
+    incertezas = {**INCERTEZAS_PADRAO, **(incertezas or {})}
+    for tipo, (distribuicao, _) in incertezas.items():
+        if distribuicao not in DISTRIBUICOES:
+            raise ValueError(f"Distribuição inválida para {tipo}: {distribuicao} (use {', '.join(DISTRIBUICOES)})")
+    rng = np.random.default_rng(semente)
+    preparados, saidas, fatores = _prepara(inventarios, gwp, incertezas)
+    resultado = np.zeros((n_amostras, len(saidas)))
+    pontual = np.zeros(len(saidas))
+    tipos_fator = [tipo for tipo, _, _ in fatores]
+    if incertezas["atividade"][0] == "normal":
+        n_linhas = max(sum(len(g.soma) for _, _, _, grupos in preparados for g in grupos), 1)
+    else:
+        n_linhas = max(sum(len(g.emissoes) for _, _, _, grupos in preparados for g in grupos), 1)
+    bloco = max(1, min(n_amostras, ELEMENTOS_POR_BLOCO // n_linhas))
+
+    for ini in range(0, n_amostras, bloco):
+        b = min(bloco, n_amostras - ini)
+        # Fatores: um sorteio por fator e amostra, compartilhado por todos os inventários
+        mult_fator = np.ones((b, len(fatores) + 1), dtype=np.float32)  # última coluna = sem incerteza de fator
+        for i, tipo in enumerate(tipos_fator):
+            mult_fator[:, i] = _multiplicadores(rng, b, *incertezas[tipo])
+
+        for _, _, saida, grupos in preparados:
+            for grupo in grupos:
+                por_componente = grupo.atividade(rng, b, *incertezas["atividade"]) * mult_fator[:, grupo.fatores]
+                np.add.at(resultado[ini:ini + b].T, saida, por_componente.T)
+        if ao_progresso:
+            ao_progresso((ini + b) / n_amostras)
+
+    for _, total, saida, _ in preparados:
+        np.add.at(pontual, saida, total)
+    return _resumo(resultado, pontual, saidas)
+
+
+def _resumo(resultado, pontual, saidas):
+    rotulos = list(saidas)
+    colunas = pd.MultiIndex.from_tuples(rotulos, names=["Categoria", "Gás"]) if rotulos else None
+    amostras = pd.DataFrame(resultado, columns=colunas)
+
+    linhas = [(cat, gas, pontual[i], resultado[:, i]) for (cat, gas), i in saidas.items()]
+    for cat in dict.fromkeys(cat for cat, _ in rotulos):
+        idx = [i for (c, _), i in saidas.items() if c == cat]
+        linhas.append((cat, "Total", pontual[idx].sum(), resultado[:, idx].sum(axis=1)))
+    idx_total = [i for (c, _), i in saidas.items() if c in CATEGORIAS_TOTAL]
+    if idx_total:
+        linhas.append(("Total (Escopos 1, 2 e 3)", "Total", pontual[idx_total].sum(), resultado[:, idx_total].sum(axis=1)))
+
+    registros = []
+    for cat, gas, estimativa, valores in linhas:
+        p = np.percentile(valores, PERCENTIS)
+        registros.append({
+            "Categoria": cat, "Gás": gas, "Estimativa (t CO2e)": estimativa, "Média": valores.mean(),
+            **{f"P{q:g}": v for q, v in zip(PERCENTIS, p)},
+            "Incerteza -%": 100 * (estimativa - p[0]) / estimativa if estimativa else 0.0,
+            "Incerteza +%": 100 * (p[-1] - estimativa) / estimativa if estimativa else 0.0,
+        })
+    return amostras, pd.DataFrame(registros)
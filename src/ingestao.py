@@ -0,0 +1,205 @@
+"""
+Ingestão incremental de uma pasta monitorada (arquivos mensais do ERP).
+
+A pasta tem uma subpasta por tipo, no mesmo layout da importação em lote:
+
+    <pasta>/estacionaria/*.csv|xlsx   -> Tabela 1 (inventario)
+    <pasta>/movel/*.csv|xlsx          -> combustão móvel (inventario_movel)
+
+Um manifesto (MANIFESTO, dentro da pasta) guarda o sha256 de cada arquivo já processado,
+por destino (organização/ano). A cada varredura só os arquivos novos ou com conteúdo
+alterado passam pela calculadora; tamanho e data iguais ao manifesto nem chegam a ser lidos.
+As linhas de cada arquivo levam COLUNA_ORIGEM: um arquivo alterado substitui as suas
+linhas no inventário, sem tocar nas dos demais. As linhas entram por upsert da chave de
+registro (CHAVES_REGISTRO), então um lançamento que já existe (do formulário ou de outro
+arquivo) é substituído em vez de duplicado. Arquivos apagados da pasta mantêm as linhas já ingeridas.
+Pela página, só pastas dentro de RAIZ_PASTAS podem ser monitoradas (resolver_pasta).
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src import importacao
+from src.inventario import Inventario, com_indice
+
+RAIZ_PASTAS = os.path.join('data', 'entrada')  # Pastas monitoradas ficam dentro desta
+MANIFESTO = '.ingestao.json'
+VERSAO_MANIFESTO = 1
+COLUNA_ORIGEM = "Arquivo Origem"
+EXTENSOES = ('.csv', '.xlsx', '.xlsm')
+TAMANHO_LEITURA_HASH = 1 << 20
+
+# Subpasta -> (tipo da importação, chave do inventário no session_state)
+PASTAS = {
+    'estacionaria': ('estacionaria', 'inventario'),
+    'movel': ('movel', 'inventario_movel'),
+}
+
+
+# --- PASTA MONITORADA ---
+def resolver_pasta(pasta, raiz=RAIZ_PASTAS):
+    """
+    Caminho real da pasta monitorada informada relativa à raiz (vazio = a própria raiz).
+    Caminhos que saem da raiz (absolutos, '..' ou links simbólicos para fora) levantam ValueError.
+    """
+    base = os.path.realpath(raiz)
+    caminho = os.path.realpath(os.path.join(base, str(pasta or "").strip()))
+    if os.path.commonpath([base, caminho]) != base:
+        raise ValueError(f"A pasta monitorada deve ficar dentro de {raiz}")
+    return caminho
+
+
+# --- MANIFESTO ---
+class Manifesto:
+    """Hash, tamanho e data de cada arquivo já ingerido, separados por destino"""
+
+    def __init__(self, pasta, destino=""):
+        self.caminho = os.path.join(pasta, MANIFESTO)
+        self.destino = str(destino)
+        self._dados = {'versao': VERSAO_MANIFESTO, 'destinos': {}}
+        self.alterado = False
+        if os.path.exists(self.caminho):
+            with open(self.caminho, encoding='utf-8') as f:
+                dados = json.load(f)
+            if dados.get('versao') == VERSAO_MANIFESTO:
+                self._dados = dados
+
+    @property
+    def arquivos(self):
+        return self._dados['destinos'].setdefault(self.destino, {})
+
+    def salvar(self):
+        temporario = f"{self.caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._dados, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)  # Atômico: uma varredura interrompida não corrompe o manifesto
+        self.alterado = False
+
+
+def hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for parte in iter(lambda: f.read(TAMANHO_LEITURA_HASH), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+
+# --- VARREDURA ---
+def listar(pasta):
+    """[(caminho relativo, tipo, chave do inventário, os.stat_result)] dos arquivos das subpastas conhecidas"""
+    arquivos = []
+    for subpasta, (tipo, chave) in PASTAS.items():
+        diretorio = os.path.join(pasta, subpasta)
+        if not os.path.isdir(diretorio):
+            continue
+        for entrada in sorted(os.scandir(diretorio), key=lambda e: e.name):
+            if entrada.is_file() and entrada.name.lower().endswith(EXTENSOES) and not entrada.name.startswith(('.', '~$')):
+                arquivos.append((f"{subpasta}/{entrada.name}", tipo, chave, entrada.stat()))
+    return arquivos
+
+
+def pendentes(pasta, manifesto, inventarios, arquivos=None):
+    """
+    Arquivos a processar: [(relativo, tipo, chave, stat, sha256, situação)], situação 'novo' ou 'alterado'.
+    Os arquivos do manifesto voltam a ser processados se o inventário recebido não tem nenhuma
+    linha vinda da pasta (ex.: sessão nova); um arquivo cujas linhas foram todas substituídas por
+    outro (mesma chave) não volta. Arquivos só "tocados" (mesmo hash) têm a data atualizada no manifesto.
+    """
+    origens = {}
+    for _, chave in PASTAS.values():
+        inv = inventarios.get(chave)
+        origens[chave] = set(pd.unique(inv.coluna(COLUNA_ORIGEM))) if inv and COLUNA_ORIGEM in inv.colunas else set()
+
+    resultado = []
+    for relativo, tipo, chave, stat in listar(pasta) if arquivos is None else arquivos:
+        entrada = manifesto.arquivos.get(relativo)
+        presente = entrada is not None and (entrada.get('linhas', 0) == 0 or bool(origens[chave]))
+        if presente and entrada['tamanho'] == stat.st_size and entrada['mtime_ns'] == stat.st_mtime_ns:
+            continue
+        sha = hash_arquivo(os.path.join(pasta, relativo))
+        if presente and entrada['sha256'] == sha:
+            entrada['mtime_ns'] = stat.st_mtime_ns
+            manifesto.alterado = True
+            continue
+        situacao = 'novo' if entrada is None or relativo not in origens[chave] else 'alterado'
+        resultado.append((relativo, tipo, chave, stat, sha, situacao))
+    return resultado
+
+
+# --- INGESTÃO ---
+def ingerir(pasta, calc, inventarios, destino="", setor=None, ao_progresso=None, tamanho_bloco=importacao.TAMANHO_BLOCO):
+    """
+    Processa os arquivos novos/alterados da pasta e faz o upsert das linhas em inventarios
+    ({chave: Inventario}, alterados no lugar). Cada arquivo é calculado por inteiro antes de
+    substituir as linhas antigas, então um arquivo inválido não deixa o inventário pela metade.
+    Retorna {'arquivos': [{'Arquivo', 'Situação', 'Linhas', 'Rejeitadas', 'Erro'}], 'erros': [...], 'inalterados': int}.
+    """
+    manifesto = Manifesto(pasta, destino)
+    arquivos = listar(pasta)
+    fila = pendentes(pasta, manifesto, inventarios, arquivos)
+    total_bytes = sum(stat.st_size for _, _, _, stat, _, _ in fila) or 1
+    feitos = 0
+    resumo = {'arquivos': [], 'erros': [], 'inalterados': len(arquivos) - len(fila)}
+
+    for relativo, tipo, chave, stat, sha, situacao in fila:
+        blocos = []
+        progresso = None
+        if ao_progresso:
+            progresso = lambda f, base=feitos, n=stat.st_size: ao_progresso((base + f * n) / total_bytes)
+        linha = {"Arquivo": relativo, "Situação": situacao, "Linhas": 0, "Rejeitadas": 0, "Erro": None}
+        try:
+            with open(os.path.join(pasta, relativo), 'rb') as arquivo:
+                r = importacao.importar_arquivo(arquivo, relativo, tipo, calc, blocos.append, progresso,
+                                                tamanho_bloco, setor=setor)
+        except ValueError as e:
+            linha["Erro"] = str(e)
+            resumo['arquivos'].append(linha)
+            # Guardado com o erro: o mesmo arquivo só é tentado de novo quando mudar
+            manifesto.arquivos[relativo] = _entrada(stat, sha, 0, 0, str(e))
+            manifesto.salvar()
+            feitos += stat.st_size
+            continue
+
+        inv = inventarios.get(chave)
+        if inv is None:
+            inv = inventarios[chave] = Inventario()
+        com_indice(inv, chave)
+        if situacao == 'alterado':
+            inv.remover(np.flatnonzero(inv.coluna(COLUNA_ORIGEM) == relativo))
+        for bloco in blocos:
+            bloco[COLUNA_ORIGEM] = relativo
+            inv.upsert_lote(bloco)
+        linha.update({"Linhas": r['validas'], "Rejeitadas": r['invalidas']})
+        resumo['arquivos'].append(linha)
+        resumo['erros'] += [{"Arquivo": relativo, **e} for e in r['erros'][:max(importacao.MAX_ERROS - len(resumo['erros']), 0)]]
+        manifesto.arquivos[relativo] = _entrada(stat, sha, r['validas'], r['invalidas'])
+        manifesto.salvar()
+        feitos += stat.st_size
+    if manifesto.alterado:
+        manifesto.salvar()  # Datas dos arquivos só "tocados"
+    if ao_progresso:
+        ao_progresso(1.0)
+    return resumo
+
+
+def _entrada(stat, sha, linhas, invalidas, erro=None):
+    return {'sha256': sha, 'tamanho': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'linhas': linhas,
+            'invalidas': invalidas, 'erro': erro, 'processado_em': datetime.now().isoformat(timespec='seconds')}
+
+
+def observar(pasta, calc, inventarios, intervalo=60.0, destino="", setor=None, ao_ciclo=None, parar=None):
+    """
+    Varre a pasta a cada 'intervalo' segundos (polling, sem dependência de eventos do SO).
+    ao_ciclo(resumo) é chamado após cada varredura que processou algo; parar: threading.Event.
+    """
+    parar = parar or threading.Event()
+    while not parar.is_set():
+        resumo = ingerir(pasta, calc, inventarios, destino, setor)
+        if ao_ciclo and resumo['arquivos']:
+            ao_ciclo(resumo)
+        parar.wait(intervalo)
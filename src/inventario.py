@@ -0,0 +1,562 @@
+import itertools
+import sys
+import numpy as np
+import pandas as pd
+
+
+# Versões são únicas no processo: um inventário recriado nunca repete a versão de outro
+_versoes = itertools.count(1)
+
+# Chave de registro de cada inventário da sessão (o escopo é o próprio inventário):
+# lançar de novo a mesma chave substitui a linha em vez de duplicar.
+# Na Tabela 1 a mesma fonte pode queimar mais de um combustível, então ele entra na chave.
+# No Escopo 3 cada linha é o total de uma categoria/transportadora/modal no período.
+CHAVES_REGISTRO = {
+    'inventario': ("Registro", "Combustível", "Período"),
+    'inventario_t3': ("Registro da fonte", "Período"),
+    'inventario_movel': ("Registro", "Período"),
+    'inventario_escopo2': ("Registro", "Período"),
+    'inventario_escopo3': ("Categoria", "Transportadora", "Modal", "Período"),
+}
+
+# Totais de cada inventário: chave do session_state -> [(categoria do relatório, coluna somada), ...]
+TOTAIS_INVENTARIO = {
+    'inventario': [("Escopo 1", "Total GEE (tCO2e)"), ("CO2 biogênico", "Biogênicas (tCO2)")],
+    'inventario_t3': [("Escopo 1", "Emissões de GEE totais (t CO2e)"), ("CO2 biogênico", "Emissões de CO2 biogênico (t)")],
+    'inventario_movel': [("Escopo 1", "Emissões totais (t CO2e)"), ("CO2 biogênico", "Emissões de CO2 biogênico (t)")],
+    'inventario_escopo2': [("Escopo 2 (localização)", "Emissões localização (t CO2e)"), ("Escopo 2 (mercado)", "Emissões mercado (t CO2e)")],
+    'inventario_escopo3': [("Escopo 3", "Emissões (t CO2e)")],
+}
+CATEGORIAS = list(dict.fromkeys(cat for totais in TOTAIS_INVENTARIO.values() for cat, _ in totais))
+
+
+class Inventario:
+    """
+    Inventário colunar: cada coluna é um array tipado (float64 para números, object para textos)
+    com capacidade dobrada quando enche, então append custa O(1) amortizado.
+    Mantém a interface que as páginas já usam com listas (append, len, bool) e entrega
+    um DataFrame em cache (.df) que só é remontado quando os dados mudam.
+    Agregados registrados (adicionar_agregado) são mantidos como totais correntes.
+    Linhas já lançadas podem ser recalculadas no lugar (atualizar) ou apagadas (remover), sem recriar o inventário.
+    Com um índice de chave (indexar), upsert/remover_chave acham a linha por hash, sem varrer as colunas.
+    """
+
+    CAPACIDADE_INICIAL = 64
+
+    def __init__(self, registros=None):
+        self._colunas = {}
+        self._n = 0
+        self._capacidade = self.CAPACIDADE_INICIAL
+        self.versao = next(_versoes)  # Muda a cada alteração (usada como chave de caches)
+        self.geracao = self.versao  # Muda só quando as linhas existentes mudam de posição (limpar, remover)
+        self._reescritas = {}  # Coluna -> versão em que valores de linhas existentes dela mudaram por último
+        self._df_cache = None
+        self._df_versao = -1
+        self._agregados = {}
+        self._ids = np.empty(self._capacidade, dtype=np.int64)  # Id estável de cada linha, crescente na ordem das posições
+        self._proximo_id = 0
+        self.chave_indice = None  # Colunas da chave do índice (indexar)
+        self._indice = {}  # Chave normalizada -> id da linha mais recente com essa chave
+        self._repetidas = set()  # Chaves com mais de uma linha (lançadas por append/extend, não por upsert)
+        # Persistência por chave (ver persistencia.sincronizar)
+        self.id_salvo = 0  # Linhas com id abaixo deste já foram gravadas
+        self._alteradas = set()  # Ids de linhas gravadas que mudaram desde a última sincronização
+        self._apagadas = []  # Chaves gravadas de linhas apagadas desde a última sincronização
+        self._chaves_salvas = {}  # Id -> chave gravada, quando não é a chave de registro atual da linha
+        self.salvas_desatualizadas = False  # O escopo salvo deve ser substituído inteiro (ex.: carregado de um arquivo)
+        if registros is not None:
+            self.extend(registros)
+
+    @classmethod
+    def de_colunas(cls, colunas):
+        """Inventário a partir de arrays prontos (float64 ou object, todos do mesmo tamanho), sem cópia linha a linha"""
+        inv = cls()
+        n = len(next(iter(colunas.values()))) if colunas else 0
+        inv._capacidade = max(n, cls.CAPACIDADE_INICIAL)
+        for nome, valores in colunas.items():
+            dtype = np.float64 if valores.dtype == np.float64 else object
+            inv._colunas[nome] = np.empty(inv._capacidade, dtype=dtype)
+            inv._colunas[nome][:n] = valores
+        inv._ids = np.arange(inv._capacidade, dtype=np.int64)
+        inv._n = inv._proximo_id = n
+        return inv
+
+    def __len__(self):
+        return self._n
+
+    def __bool__(self):
+        return self._n > 0
+
+    def reescrita(self, nome):
+        """Versão em que linhas já existentes tiveram a coluna alterada (atualizar/upsert); 0 se nunca"""
+        return self._reescritas.get(nome, 0)
+
+    @property
+    def colunas(self):
+        return list(self._colunas)
+
+    def coluna(self, nome):
+        """Array (somente leitura) com os valores da coluna"""
+        valores = self._colunas[nome][:self._n]
+        valores.flags.writeable = False
+        return valores
+
+    # --- ESCRITA ---
+    def append(self, registro):
+        """Adiciona um lançamento (dict coluna -> valor)"""
+        self._garante_capacidade(1)
+        i = self._n
+        for nome, valor in registro.items():
+            if nome not in self._colunas:
+                self._nova_coluna(nome, _eh_numero(valor))
+            self._atribui(nome, i, valor)
+        for nome in self._colunas.keys() - registro.keys():
+            self._colunas[nome][i] = _vazio(self._colunas[nome].dtype)
+        self._ids[i] = self._proximo_id
+        self._proximo_id += 1
+        self._n += 1
+        if self.chave_indice:
+            self._indexa(np.array([i]))
+        for ag in self._agregados.values():
+            _acumula_registro(ag, registro, +1)
+        self._alterado()
+
+    def extend(self, registros):
+        """Adiciona vários lançamentos de uma vez (DataFrame ou lista de dicts)"""
+        if not isinstance(registros, pd.DataFrame):
+            registros = pd.DataFrame(list(registros))
+        qtd = len(registros)
+        if qtd == 0:
+            return
+        self._garante_capacidade(qtd)
+        ini, fim = self._n, self._n + qtd
+        for nome in registros.columns:
+            serie = registros[nome]
+            numerica = pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+            if nome not in self._colunas:
+                self._nova_coluna(nome, numerica)
+            destino = self._colunas[nome]
+            if destino.dtype == np.float64 and not numerica:
+                destino = self._para_texto(nome)
+            if destino.dtype == np.float64:
+                destino[ini:fim] = serie.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                destino[ini:fim] = [_interna(v) for v in serie.to_numpy(dtype=object)]
+        for nome in self._colunas.keys() - set(registros.columns):
+            self._colunas[nome][ini:fim] = _vazio(self._colunas[nome].dtype)
+        self._ids[ini:fim] = np.arange(self._proximo_id, self._proximo_id + qtd)
+        self._proximo_id += qtd
+        self._n = fim
+        if self.chave_indice:
+            self._indexa(np.arange(ini, fim))
+        for ag in self._agregados.values():
+            _acumula_bloco(ag, registros, +1)
+        self._alterado()
+
+    def atualizar(self, linhas, valores):
+        """
+        Substitui valores nas posições 'linhas' (dict coluna -> array do mesmo tamanho).
+        Agregados descontam os valores antigos e somam os novos; linhas já persistidas
+        ficam pendentes para a próxima sincronização regravar (pela chave).
+        """
+        self._substitui(linhas, valores, muda_chave=bool(self.chave_indice and set(valores) & set(self.chave_indice)))
+
+    def _substitui(self, linhas, valores, muda_chave):
+        linhas = np.asarray(linhas, dtype=np.int64)
+        if len(linhas) == 0 or not valores:
+            return
+        afetados = [ag for ag in self._agregados.values() if set(valores) & set(ag['chaves'] + ag['somas'])]
+        for ag in afetados:
+            _acumula_bloco(ag, self._subconjunto(linhas, ag), -1)
+        ids = self._ids[linhas]
+        salvas = ids < self.id_salvo
+        if muda_chave:
+            for id_linha, chave in zip(ids[salvas].tolist(), self._chaves(linhas[salvas])):
+                self._chaves_salvas.setdefault(id_linha, chave)  # A chave gravada continua a antiga
+            self._desindexa(linhas)
+        self._alteradas.update(ids[salvas].tolist())
+        reescritas = []
+        for nome, novos in valores.items():
+            novos = np.asarray(novos)
+            numerica = novos.dtype.kind in 'iuf'
+            if nome not in self._colunas:
+                self._nova_coluna(nome, numerica)
+            destino = self._colunas[nome]
+            if destino.dtype == np.float64 and not numerica:
+                destino = self._para_texto(nome)
+            if destino.dtype != np.float64:
+                novos = [_interna(v) for v in novos]
+            if not _iguais(destino[linhas], novos):
+                reescritas.append(nome)
+            destino[linhas] = novos
+        if muda_chave:
+            self._indexa(linhas)
+        for ag in afetados:
+            _acumula_bloco(ag, self._subconjunto(linhas, ag), +1)
+        self._alterado()
+        for nome in reescritas:
+            self._reescritas[nome] = self.versao
+
+    def remover(self, linhas):
+        """
+        Apaga as linhas nas posições dadas; as seguintes sobem (ordem preservada).
+        Agregados descontam as linhas removidas e, como as posições mudam, geracao também muda.
+        As chaves gravadas das linhas já persistidas ficam pendentes para a sincronização apagar.
+        """
+        linhas = np.unique(np.asarray(linhas, dtype=np.int64))
+        if len(linhas) == 0:
+            return
+        for ag in self._agregados.values():
+            _acumula_bloco(ag, self._subconjunto(linhas, ag), -1)
+        salvas = linhas[self._ids[linhas] < self.id_salvo]
+        gravadas = self._chaves_gravadas(salvas)
+        for id_linha in self._ids[salvas].tolist():
+            self._alteradas.discard(id_linha)
+            self._chaves_salvas.pop(id_linha, None)
+        self._apagadas.extend(gravadas)
+        if self.chave_indice:
+            removidas = self._chaves(linhas)
+            self._desindexa(linhas)
+        manter = np.ones(self._n, dtype=bool)
+        manter[linhas] = False
+        restantes = int(manter.sum())
+        for arr in self._colunas.values():
+            arr[:restantes] = arr[:self._n][manter]
+            arr[restantes:self._n] = _vazio(arr.dtype)  # Solta as referências dos textos removidos
+        self._ids[:restantes] = self._ids[:self._n][manter]  # Continuam crescentes: a ordem é preservada
+        self._n = restantes
+        if self.chave_indice:
+            if self._repetidas.intersection(removidas):
+                self.indexar(self.chave_indice)  # Uma linha anterior com a mesma chave volta ao índice
+            for chave in gravadas:
+                if chave in self._indice and self._indice[chave] < self.id_salvo:
+                    self._alteradas.add(self._indice[chave])  # Outra linha com a mesma chave: regravá-la
+        self._alterado()
+        self.geracao = self.versao
+
+    def copia(self):
+        """Cópia independente das linhas (sem agregados), para ler em outra thread enquanto esta muda"""
+        nova = Inventario()
+        nova._capacidade = max(self._n, self.CAPACIDADE_INICIAL)
+        for nome, arr in self._colunas.items():
+            nova._colunas[nome] = np.empty(nova._capacidade, dtype=arr.dtype)
+            nova._colunas[nome][:self._n] = arr[:self._n]
+        nova._ids = np.empty(nova._capacidade, dtype=np.int64)
+        nova._ids[:self._n] = self._ids[:self._n]
+        nova._n = self._n
+        nova._proximo_id = self._proximo_id
+        return nova
+
+    def limpar(self):
+        agregados = [(nome, ag['chaves'], ag['somas']) for nome, ag in self._agregados.items()]
+        chave_indice = self.chave_indice
+        apagadas = self._apagadas + self._chaves_gravadas(np.flatnonzero(self._ids[:self._n] < self.id_salvo))
+        substituir = self.salvas_desatualizadas
+        self.__init__()
+        self._apagadas, self.salvas_desatualizadas = apagadas, substituir
+        for nome, chaves, somas in agregados:
+            self.adicionar_agregado(nome, chaves, somas)
+        if chave_indice:
+            self.indexar(chave_indice)
+
+    # --- ÍNDICE DE CHAVE (UPSERT) ---
+    def indexar(self, colunas):
+        """
+        Passa a manter um índice hash chave -> linha pelas colunas dadas (ex.: Registro, Período).
+        O histórico é indexado uma vez; depois cada escrita só atualiza as suas chaves.
+        Linhas sem valor na primeira coluna (ex.: Registro em branco) ficam fora do índice:
+        nunca são substituídas por um upsert. Com chaves repetidas, vale a linha mais recente.
+        """
+        self.chave_indice = tuple(colunas)
+        self._indice = {}
+        self._repetidas = set()
+        self._indexa(np.arange(self._n))
+
+    @property
+    def indexado(self):
+        return self.chave_indice is not None
+
+    def posicao(self, chave):
+        """Posição da linha com a chave (valores na ordem de chave_indice; os que faltarem valem vazio), ou None"""
+        chave = (chave,) if isinstance(chave, str) else tuple(chave)
+        id_linha = self._indice.get(_chave_registro(chave + (None,) * (len(self.chave_indice) - len(chave))))
+        return None if id_linha is None else self._posicoes(np.array([id_linha]))[0]
+
+    def upsert(self, registro):
+        """Lança um registro (dict): substitui a linha com a mesma chave, se houver. True se substituiu."""
+        atualizadas, _ = self.upsert_lote(pd.DataFrame([registro]))
+        return atualizadas > 0
+
+    def upsert_lote(self, registros):
+        """
+        Upsert de vários lançamentos (DataFrame ou lista de dicts): chaves já presentes têm a
+        linha substituída (colunas ausentes ficam vazias), as demais são adicionadas no fim.
+        Dentro do lote, a última ocorrência de cada chave vence; reimportar o mesmo lote não muda nada.
+        Retorna (linhas substituídas, linhas adicionadas).
+        """
+        if not isinstance(registros, pd.DataFrame):
+            registros = pd.DataFrame(list(registros))
+        if not self.chave_indice or registros.empty:
+            self.extend(registros)
+            return 0, len(registros)
+        chaves = chaves_registro(registros, self.chave_indice)
+        ultima = {chave: i for i, chave in enumerate(chaves) if chave is not None}
+        existentes, ids, novas = [], [], []
+        for i, chave in enumerate(chaves):
+            if chave is not None and ultima[chave] != i:
+                continue  # Repetida mais adiante no lote
+            id_linha = self._indice.get(chave) if chave is not None else None
+            if id_linha is None:
+                novas.append(i)
+            else:
+                existentes.append(i)
+                ids.append(id_linha)
+        if existentes:
+            valores = {c: registros[c].to_numpy()[existentes] for c in registros.columns}
+            for nome in self._colunas.keys() - set(registros.columns):
+                valores[nome] = np.full(len(existentes), _vazio(self._colunas[nome].dtype),
+                                        dtype=self._colunas[nome].dtype)
+            # Mesma chave normalizada: o índice continua válido
+            self._substitui(self._posicoes(np.array(ids)), valores, muda_chave=False)
+        if novas:
+            self.extend(registros.iloc[novas].reset_index(drop=True))
+        return len(existentes), len(novas)
+
+    def remover_chave(self, chave):
+        """Apaga a linha com a chave; True se existia"""
+        posicao = self.posicao(chave)
+        if posicao is None:
+            return False
+        self.remover([posicao])
+        return True
+
+    # --- PERSISTÊNCIA ---
+    @property
+    def pendente(self):
+        """Há linhas novas, alteradas ou apagadas desde a última sincronização"""
+        return bool(self.salvas_desatualizadas or self._alteradas or self._apagadas
+                    or (self._n and self._ids[self._n - 1] >= self.id_salvo))
+
+    def pendencias(self):
+        """
+        (posições das linhas a gravar, chave gravada de cada uma ou None, chaves gravadas a apagar).
+        Com salvas_desatualizadas, todas as linhas são gravadas.
+        """
+        if self.salvas_desatualizadas:
+            posicoes = np.arange(self._n)
+        else:
+            novas = np.arange(np.searchsorted(self._ids[:self._n], self.id_salvo), self._n)
+            posicoes = np.union1d(self._posicoes(np.fromiter(self._alteradas, dtype=np.int64)), novas)
+        return posicoes, [self._chaves_salvas.get(i) for i in self._ids[posicoes].tolist()], list(self._apagadas)
+
+    def confirmar_salvas(self, posicoes, chaves):
+        """Registra a sincronização: 'chaves' = chave gravada de cada posição de pendencias()"""
+        for id_linha, chave, atual in zip(self._ids[posicoes].tolist(), chaves, self.chaves_de(posicoes)):
+            if chave == atual:
+                self._chaves_salvas.pop(id_linha, None)
+            else:
+                self._chaves_salvas[id_linha] = chave
+        self.id_salvo = self._proximo_id
+        self._alteradas.clear()
+        self._apagadas.clear()
+        self.salvas_desatualizadas = False
+
+    def chaves_de(self, linhas):
+        """Chave de registro (tupla normalizada) das posições dadas; None sem índice ou sem valor na chave"""
+        if not self.chave_indice:
+            return [None] * len(linhas)
+        return self._chaves(np.asarray(linhas, dtype=np.int64))
+
+    # --- AGREGADOS INCREMENTAIS ---
+    def adicionar_agregado(self, nome, agrupar_por, somar):
+        """
+        Passa a manter somas de 'somar' por grupo de 'agrupar_por'.
+        O histórico é agregado uma vez; depois cada lançamento só atualiza o seu grupo.
+        """
+        ag = {'chaves': list(agrupar_por), 'somas': list(somar), 'totais': {}}
+        if self._n:
+            _acumula_bloco(ag, self.df, +1)
+        self._agregados[nome] = ag
+
+    def tem_agregado(self, nome):
+        return nome in self._agregados
+
+    def agregado(self, nome):
+        """Totais correntes do agregado como DataFrame (uma linha por grupo, com 'Lançamentos')"""
+        ag = self._agregados[nome]
+        linhas = [list(chave) + list(valores) for chave, valores in ag['totais'].items()]
+        return pd.DataFrame(linhas, columns=ag['chaves'] + ag['somas'] + ['Lançamentos'])
+
+    # --- LEITURA ---
+    @property
+    def df(self):
+        """DataFrame com todos os lançamentos; remontado apenas se houve alteração"""
+        if self._df_versao != self.versao:
+            self._df_cache = pd.DataFrame({nome: arr[:self._n] for nome, arr in self._colunas.items()})
+            self._df_versao = self.versao
+        return self._df_cache
+
+    def linhas_desde(self, inicio):
+        """DataFrame apenas com as linhas a partir de 'inicio' (sem montar o inventário inteiro)"""
+        return pd.DataFrame({nome: arr[inicio:self._n] for nome, arr in self._colunas.items()})
+
+    def linhas_em(self, posicoes):
+        """DataFrame apenas com as linhas nas posições dadas"""
+        return pd.DataFrame({nome: arr[posicoes] for nome, arr in self._colunas.items()})
+
+    def registros(self):
+        """Lançamentos como lista de dicts (formato antigo do session_state)"""
+        return self.df.to_dict('records')
+
+    # --- INTERNOS ---
+    def _alterado(self):
+        self.versao = next(_versoes)
+
+    def _garante_capacidade(self, extra):
+        necessario = self._n + extra
+        if necessario <= self._capacidade:
+            return
+        while self._capacidade < necessario:
+            self._capacidade *= 2
+        for nome, arr in self._colunas.items():
+            novo = np.empty(self._capacidade, dtype=arr.dtype)
+            novo[:self._n] = arr[:self._n]
+            self._colunas[nome] = novo
+        ids = np.empty(self._capacidade, dtype=np.int64)
+        ids[:self._n] = self._ids[:self._n]
+        self._ids = ids
+
+    def _chaves(self, linhas):
+        return _chaves_registro([self._colunas[c][linhas] if c in self._colunas else None
+                                 for c in self.chave_indice], len(linhas))
+
+    def _indexa(self, linhas):
+        for chave, id_linha in zip(self._chaves(linhas), self._ids[linhas].tolist()):
+            if chave is not None:
+                if self._indice.setdefault(chave, id_linha) != id_linha:
+                    self._repetidas.add(chave)
+                    self._indice[chave] = id_linha
+
+    def _desindexa(self, linhas):
+        for chave, id_linha in zip(self._chaves(linhas), self._ids[linhas].tolist()):
+            if chave is not None and self._indice.get(chave) == id_linha:
+                del self._indice[chave]
+
+    def _chaves_gravadas(self, linhas):
+        """Chave com que cada linha já persistida foi gravada (sem Nones)"""
+        gravadas = [self._chaves_salvas.get(i, chave) for i, chave in zip(self._ids[linhas].tolist(), self.chaves_de(linhas))]
+        return [chave for chave in gravadas if chave is not None]
+
+    def _posicoes(self, ids):
+        """Posições atuais dos ids (busca binária: os ids crescem com a posição)"""
+        return np.searchsorted(self._ids[:self._n], ids)
+
+    def _subconjunto(self, linhas, ag):
+        """Colunas usadas pelo agregado, só nas linhas dadas"""
+        return pd.DataFrame({c: self._colunas[c][linhas] for c in ag['chaves'] + ag['somas'] if c in self._colunas})
+
+    def _nova_coluna(self, nome, numerica):
+        dtype = np.float64 if numerica else object
+        arr = np.empty(self._capacidade, dtype=dtype)
+        arr[:self._n] = _vazio(arr.dtype)
+        self._colunas[nome] = arr
+
+    def _para_texto(self, nome):
+        """Coluna numérica que recebeu texto passa a ser object (preservando os valores)"""
+        arr = self._colunas[nome].astype(object)
+        self._colunas[nome] = arr
+        return arr
+
+    def _atribui(self, nome, i, valor):
+        arr = self._colunas[nome]
+        if arr.dtype == np.float64:
+            if valor is None:
+                arr[i] = np.nan
+                return
+            if _eh_numero(valor):
+                arr[i] = valor
+                return
+            arr = self._para_texto(nome)
+        arr[i] = _interna(valor)
+
+
+def com_indice(inv, chave):
+    """Garante no inventário da sessão o índice de CHAVES_REGISTRO[chave] (montado uma única vez)"""
+    if not inv.indexado and chave in CHAVES_REGISTRO:
+        inv.indexar(CHAVES_REGISTRO[chave])
+    return inv
+
+
+def chaves_registro(df, colunas):
+    """Chaves de registro (tuplas normalizadas; None sem valor na primeira coluna) das linhas de um DataFrame"""
+    return _chaves_registro([df[c].to_numpy(dtype=object) if c in df else None for c in colunas], len(df))
+
+
+def _chave_registro(valores):
+    return _chaves_registro([[v] for v in valores], 1)[0]
+
+
+def _chaves_registro(colunas, n):
+    """
+    Chaves do índice de n linhas a partir dos arrays das colunas da chave (None = coluna ausente):
+    tuplas de textos (números viram texto, vazios viram None); None se a primeira coluna estiver vazia.
+    """
+    normalizadas = [[None] * n if c is None else
+                    [None if v is None or v is pd.NA or v == "" or v != v else v if type(v) is str else str(v) for v in c]
+                    for c in colunas]
+    return [chave if chave[0] is not None else None for chave in zip(*normalizadas)]
+
+
+def _chave_grupo(valores):
+    return tuple(None if v is None or (isinstance(v, float) and np.isnan(v)) else v for v in valores)
+
+
+def _soma_no_grupo(ag, chave, valores, sinal):
+    totais = ag['totais']
+    atual = totais.get(chave)
+    if atual is None:
+        atual = totais[chave] = np.zeros(len(ag['somas']) + 1)
+    atual += sinal * valores
+    if atual[-1] <= 0:
+        del totais[chave]
+
+
+def _acumula_registro(ag, registro, sinal):
+    chave = _chave_grupo(registro.get(c) for c in ag['chaves'])
+    valores = [registro.get(c) for c in ag['somas']]
+    valores = np.array([v if _eh_numero(v) else 0.0 for v in valores] + [1.0], dtype=float)
+    _soma_no_grupo(ag, chave, np.nan_to_num(valores), sinal)
+
+
+def _acumula_bloco(ag, df, sinal):
+    """Agrupa o bloco de uma vez (vetorizado) e soma cada grupo nos totais"""
+    bloco = pd.DataFrame(index=df.index)
+    for c in ag['chaves']:
+        bloco[c] = df[c].astype(object) if c in df else None
+    for c in ag['somas']:
+        bloco[c] = pd.to_numeric(df[c], errors='coerce').fillna(0.0) if c in df else 0.0
+    bloco['Lançamentos'] = 1.0
+    grupos = bloco.groupby(ag['chaves'], dropna=False, sort=False).sum()
+    for chave, valores in zip(grupos.index, grupos.to_numpy(dtype=float)):
+        chave = chave if isinstance(chave, tuple) else (chave,)
+        _soma_no_grupo(ag, _chave_grupo(chave), valores, sinal)
+
+
+def _iguais(antigos, novos):
+    """Valores iguais posição a posição (NaN igual a NaN)"""
+    antigos = pd.Series(antigos, dtype=antigos.dtype)
+    novos = pd.Series(novos, dtype=antigos.dtype)
+    return bool(((antigos == novos) | (antigos.isna() & novos.isna())).all())
+
+
+def _eh_numero(valor):
+    return isinstance(valor, (int, float, np.integer, np.floating)) and not isinstance(valor, (bool, np.bool_))
+
+
+def _vazio(dtype):
+    return np.nan if dtype == np.float64 else None
+
+
+def _interna(valor):
+    # Nomes de combustível/veículo se repetem muito: uma única cópia de cada texto
+    return sys.intern(valor) if type(valor) is str else valor
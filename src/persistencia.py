@@ -0,0 +1,262 @@
+import json
+import math
+import sqlite3
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.inventario import CHAVES_REGISTRO, chaves_registro, com_indice
+
+CAMINHO_PADRAO = 'data/inventario.db'
+TAMANHO_LOTE = 5_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS empresas (
+    organizacao TEXT NOT NULL,
+    ano_base INTEGER NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (organizacao, ano_base)
+);
+CREATE TABLE IF NOT EXISTS lancamentos (
+    id INTEGER PRIMARY KEY,
+    organizacao TEXT NOT NULL,
+    ano_base INTEGER NOT NULL,
+    escopo TEXT NOT NULL,
+    registro TEXT,
+    dados TEXT NOT NULL,
+    chave TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_lanc_org_ano_escopo ON lancamentos (organizacao, ano_base, escopo, id);
+CREATE INDEX IF NOT EXISTS ix_lanc_registro ON lancamentos (organizacao, ano_base, escopo, registro);
+"""
+INDICE_CHAVE = "CREATE UNIQUE INDEX IF NOT EXISTS ux_lanc_chave ON lancamentos (organizacao, ano_base, escopo, chave)"
+
+
+class BancoInventario:
+    """
+    Persistência local do inventário em SQLite (modo WAL: leitores não bloqueiam o escritor).
+    Cada lançamento é guardado como JSON, indexado por organização, ano base, escopo
+    (chave do inventário no session_state) e chave de registro (única no escopo, ver CHAVES_REGISTRO).
+    Uma conexão por thread, já que o Streamlit atende cada sessão numa thread.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._local = threading.local()
+        con = self._conexao()
+        with con:
+            con.executescript(SCHEMA)
+            if "chave" not in [c[1] for c in con.execute("PRAGMA table_info(lancamentos)")]:
+                _migra_chaves(con)
+            con.execute(INDICE_CHAVE)
+            if con.execute("PRAGMA user_version").fetchone()[0] < 1:
+                _migra_nan(con)
+                con.execute("PRAGMA user_version = 1")
+
+    def _conexao(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    # --- EMPRESAS ---
+    def salvar_empresa(self, dados):
+        con = self._conexao()
+        with con:
+            con.execute(
+                "INSERT OR REPLACE INTO empresas (organizacao, ano_base, dados) VALUES (?, ?, ?)",
+                (dados['nome'], int(dados['ano']), json.dumps(dados, ensure_ascii=False, default=str))
+            )
+
+    def carregar_empresa(self, organizacao, ano_base):
+        linha = self._conexao().execute(
+            "SELECT dados FROM empresas WHERE organizacao = ? AND ano_base = ?", (organizacao, int(ano_base))
+        ).fetchone()
+        return json.loads(linha[0]) if linha else None
+
+    def listar_inventarios(self):
+        """[(organizacao, ano_base), ...] com dados salvos"""
+        return self._conexao().execute(
+            "SELECT organizacao, ano_base FROM empresas ORDER BY organizacao, ano_base"
+        ).fetchall()
+
+    # --- LANÇAMENTOS ---
+    def salvar_lancamentos(self, organizacao, ano_base, escopo, df, chaves, apagar=(), substituir=False):
+        """
+        Grava um DataFrame de lançamentos numa única transação, em lotes de executemany.
+        Cada linha é um upsert pela sua chave (chaves[i]): a mesma chave atualiza o lançamento
+        no lugar (mantendo a ordem de inserção). 'apagar' são chaves removidas do escopo;
+        com substituir=True o escopo inteiro é trocado pelas linhas dadas.
+        """
+        con = self._conexao()
+        registros = _registros_json(df)
+        parametros = (organizacao, int(ano_base), escopo)
+        with con:
+            if substituir:
+                con.execute("DELETE FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ?", parametros)
+            for ini in range(0, len(apagar), TAMANHO_LOTE):
+                con.executemany(
+                    "DELETE FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ? AND chave = ?",
+                    [parametros + (chave,) for chave in apagar[ini:ini + TAMANHO_LOTE]]
+                )
+            for ini in range(0, len(registros), TAMANHO_LOTE):
+                con.executemany(
+                    "INSERT INTO lancamentos (organizacao, ano_base, escopo, registro, dados, chave) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (organizacao, ano_base, escopo, chave) DO UPDATE SET registro = excluded.registro, dados = excluded.dados",
+                    [parametros + (_registro(r), _json(r), chave)
+                     for r, chave in zip(registros[ini:ini + TAMANHO_LOTE], chaves[ini:ini + TAMANHO_LOTE])]
+                )
+
+    def contar(self, organizacao, ano_base, escopo):
+        return self._conexao().execute(
+            "SELECT COUNT(*) FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ?",
+            (organizacao, int(ano_base), escopo)
+        ).fetchone()[0]
+
+    def somar(self, organizacao, ano_base, escopo, colunas):
+        """(lançamentos, [soma de cada coluna]) calculados no próprio SQLite, sem trazer as linhas"""
+        somas = ", ".join("TOTAL(json_extract(dados, ?))" for _ in colunas)
+        linha = self._conexao().execute(
+            f"SELECT COUNT(*){', ' if colunas else ''}{somas} FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ?",
+            [f'$."{c}"' for c in colunas] + [organizacao, int(ano_base), escopo]
+        ).fetchone()
+        return linha[0], list(linha[1:])
+
+    def carregar(self, organizacao, ano_base, escopo, limite=None, deslocamento=0):
+        """Uma página de lançamentos (ou todos, sem limite) na ordem de inserção"""
+        sql = "SELECT dados FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ? ORDER BY id"
+        parametros = [organizacao, int(ano_base), escopo]
+        if limite is not None:
+            sql += " LIMIT ? OFFSET ?"
+            parametros += [int(limite), int(deslocamento)]
+        linhas = self._conexao().execute(sql, parametros).fetchall()
+        return pd.DataFrame([json.loads(l[0]) for l in linhas])
+
+    def carregar_blocos(self, organizacao, ano_base, escopo, tamanho=20_000, com_chaves=False):
+        """
+        Gera DataFrames de até 'tamanho' lançamentos, sem materializar o escopo inteiro de uma vez.
+        Com com_chaves=True gera (DataFrame, chaves gravadas das linhas).
+        """
+        cursor = self._conexao().execute(
+            "SELECT dados, chave FROM lancamentos WHERE organizacao = ? AND ano_base = ? AND escopo = ? ORDER BY id",
+            (organizacao, int(ano_base), escopo)
+        )
+        while True:
+            linhas = cursor.fetchmany(tamanho)
+            if not linhas:
+                break
+            bloco = pd.DataFrame([json.loads(l[0]) for l in linhas])
+            yield (bloco, [l[1] for l in linhas]) if com_chaves else bloco
+
+
+def _registro(registro):
+    valor = registro.get('Registro', registro.get('Registro da fonte'))
+    return None if valor is None else str(valor)
+
+
+# --- JSON DOS LANÇAMENTOS ---
+# NaN/infinito viram null: o JSON1 do SQLite (json_extract em somar) rejeita o token NaN do Python.
+def _registros_json(df):
+    df = df.astype(object)
+    vazio = df.isna() | df.isin([np.inf, -np.inf])
+    return df.where(~vazio, None).to_dict('records')
+
+
+def _json(registro):
+    return json.dumps(registro, ensure_ascii=False, default=str, allow_nan=False)
+
+
+def _migra_nan(con):
+    """Bancos gravados com NaN no JSON: regrava só os lançamentos que o SQLite não consegue ler"""
+    linhas = con.execute("SELECT id, dados FROM lancamentos WHERE NOT json_valid(dados)").fetchall()
+    con.executemany("UPDATE lancamentos SET dados = ? WHERE id = ?", [
+        (_json({k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in json.loads(dados).items()}), id_)
+        for id_, dados in linhas
+    ])
+
+
+# --- CHAVES GRAVADAS ---
+# Chave de registro -> JSON da tupla; linhas sem chave de registro recebem um identificador "#..." próprio.
+def _chave_banco(chave):
+    return chave if isinstance(chave, str) else json.dumps(list(chave), ensure_ascii=False)
+
+
+def _chave_inventario(texto):
+    return tuple(json.loads(texto)) if texto.startswith("[") else texto
+
+
+def _migra_chaves(con):
+    """Bancos anteriores à chave: cada lançamento recebe a sua chave de registro (ou '#id', se não tiver)"""
+    con.execute("ALTER TABLE lancamentos ADD COLUMN chave TEXT")
+    for (escopo,) in con.execute("SELECT DISTINCT escopo FROM lancamentos").fetchall():
+        linhas = con.execute("SELECT id, organizacao, ano_base, dados FROM lancamentos WHERE escopo = ? ORDER BY id",
+                             (escopo,)).fetchall()
+        chaves = [None] * len(linhas)
+        if escopo in CHAVES_REGISTRO:
+            chaves = chaves_registro(pd.DataFrame([json.loads(l[3]) for l in linhas]), CHAVES_REGISTRO[escopo])
+        ultima = {(l[1], l[2], chave): l[0] for l, chave in zip(linhas, chaves) if chave is not None}
+        con.executemany("UPDATE lancamentos SET chave = ? WHERE id = ?", [
+            (_chave_banco(chave) if chave is not None and ultima[l[1], l[2], chave] == l[0] else f"#{l[0]}", l[0])
+            for l, chave in zip(linhas, chaves)
+        ])
+
+
+# --- BANCO COMPARTILHADO E SINCRONIZAÇÃO COM A SESSÃO ---
+_bancos = {}
+_lock_bancos = threading.Lock()
+
+
+def get_banco(caminho=CAMINHO_PADRAO):
+    """Um BancoInventario por caminho no processo (as conexões continuam sendo por thread)"""
+    with _lock_bancos:
+        if caminho not in _bancos:
+            _bancos[caminho] = BancoInventario(caminho)
+        return _bancos[caminho]
+
+
+def sincronizar(banco, empresa_dados, inventarios):
+    """
+    Grava, em lote e pela chave de registro, o que mudou desde a última sincronização de cada Inventario:
+    linhas novas ou alteradas (atualizar/upsert) são upserts da sua chave e linhas apagadas são DELETE
+    da sua chave. Só as linhas tocadas são escritas, e lançamentos de outras sessões no mesmo escopo
+    ficam intactos. Linhas sem chave de registro (ex.: Registro em branco) recebem uma chave própria.
+    Sem organização/ano identificados (Introdução), nada é gravado e as linhas ficam pendentes.
+    """
+    if not empresa_dados.get('nome') or not empresa_dados.get('ano'):
+        return 0
+    gravadas = 0
+    for escopo, inv in inventarios.items():
+        if inv is None or not inv.pendente:
+            continue
+        com_indice(inv, escopo)
+        posicoes, anteriores, apagadas = inv.pendencias()
+        chaves = []
+        for atual, anterior in zip(inv.chaves_de(posicoes), anteriores):
+            chave = atual if atual is not None else anterior if anterior is not None else f"#{uuid.uuid4().hex}"
+            if anterior is not None and anterior != chave:
+                apagadas.append(anterior)  # A chave de registro da linha mudou
+            chaves.append(chave)
+        escritas = {_chave_banco(c) for c in chaves}
+        banco.salvar_lancamentos(empresa_dados['nome'], empresa_dados['ano'], escopo, inv.linhas_em(posicoes),
+                                 [_chave_banco(c) for c in chaves],
+                                 apagar=[c for c in dict.fromkeys(map(_chave_banco, apagadas)) if c not in escritas],
+                                 substituir=inv.salvas_desatualizadas)
+        inv.confirmar_salvas(posicoes, chaves)
+        gravadas += len(posicoes)
+    return gravadas
+
+
+def restaurar(banco, organizacao, ano_base, escopo, inventario):
+    """Carrega um escopo salvo para dentro de um Inventario vazio, bloco a bloco"""
+    com_indice(inventario, escopo)
+    chaves = []
+    for bloco, chaves_bloco in banco.carregar_blocos(organizacao, ano_base, escopo, com_chaves=True):
+        inventario.extend(bloco)
+        chaves.extend(_chave_inventario(c) for c in chaves_bloco)
+    inventario.confirmar_salvas(np.arange(len(inventario)), chaves)
+    return inventario
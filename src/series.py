@@ -0,0 +1,189 @@
+"""
+Séries temporais dos inventários pela coluna "Período".
+
+Cada lançamento guarda o seu período como texto: "AAAA-MM" (mensal), "AAAAQn" (trimestral)
+ou "AAAA" (anual). Para os totais, o período de cada linha vira (mês inicial, meses cobertos)
+uma única vez por versão do inventário (só os valores distintos são interpretados) e as somas
+por período/fonte saem de um np.bincount, sem laço por linha. Uma linha só entra numa
+frequência que a contém inteira: um total anual aparece na visão anual, não na mensal.
+"""
+import re
+import weakref
+
+import numpy as np
+import pandas as pd
+
+COLUNA_PERIODO = "Período"
+
+# Frequência -> (rótulo, meses por período, períodos em um ano)
+FREQUENCIAS = {
+    'M': ("Mensal", 1, 12),
+    'Q': ("Trimestral", 3, 4),
+    'Y': ("Anual", 12, 1),
+}
+
+_ANO = re.compile(r"^(\d{4})(?:\.0)?$")
+_ANO_MES = re.compile(r"^(\d{4})[-/](\d{1,2})(?:[-/]\d{1,2}(?:[ T].*)?)?$")
+_MES_ANO = re.compile(r"^(?:\d{1,2}/)?(\d{1,2})/(\d{4})$")
+_TRIMESTRE = re.compile(r"^(\d{4})-?[Qq]([1-4])$")
+
+
+def periodo(ano, mes=None):
+    """Texto do período: "AAAA" (anual) ou "AAAA-MM" (mensal)"""
+    return f"{int(ano):04d}" if mes is None else f"{int(ano):04d}-{int(mes):02d}"
+
+
+# --- NORMALIZAÇÃO ---
+def _normaliza(valor):
+    """Período em texto canônico; None se vazio; False se não reconhecido"""
+    if valor is None or valor != valor:
+        return None
+    texto = str(valor).strip()
+    if not texto:
+        return None
+    if m := _ANO.match(texto):
+        return m.group(1)
+    if m := _ANO_MES.match(texto):
+        ano, mes = int(m.group(1)), int(m.group(2))
+    elif m := _MES_ANO.match(texto):
+        ano, mes = int(m.group(2)), int(m.group(1))
+    elif m := _TRIMESTRE.match(texto):
+        return f"{m.group(1)}Q{m.group(2)}"
+    else:
+        return False
+    return periodo(ano, mes) if 1 <= mes <= 12 else False
+
+
+def normalizar_periodos(valores):
+    """
+    Aceita AAAA, AAAA-MM (ou data AAAA-MM-DD), MM/AAAA, DD/MM/AAAA e AAAAQn.
+    Retorna (array object com o texto canônico ou None, máscara dos inválidos);
+    cada valor distinto é interpretado uma vez.
+    """
+    codigos, unicos = pd.factorize(pd.Series(valores, dtype=object))
+    normalizados = [_normaliza(v) for v in unicos]
+    invalidos = np.array([v is False for v in normalizados] + [False])
+    texto = np.array([None if v is False else v for v in normalizados] + [None], dtype=object)
+    return texto[codigos], invalidos[codigos]
+
+
+def _intervalo(texto):
+    """(mês inicial contado desde o ano 0, meses cobertos); (-1, 0) se não houver período"""
+    texto = _normaliza(texto)
+    if not texto:
+        return -1, 0
+    if len(texto) == 4:
+        return int(texto) * 12, 12
+    if "Q" in texto:
+        return int(texto[:4]) * 12 + (int(texto[5]) - 1) * 3, 3
+    return int(texto[:4]) * 12 + int(texto[5:7]) - 1, 1
+
+
+def _indice(inicio, quantidade, freq):
+    """PeriodIndex contínuo a partir do período 'inicio' (em unidades da frequência)"""
+    _, meses, _ = FREQUENCIAS[freq]
+    mes = inicio * meses
+    return pd.period_range(pd.Period(year=mes // 12, month=mes % 12 + 1, freq='M').asfreq(freq), periods=quantidade, freq=freq)
+
+
+# --- ROLL-UPS ---
+class SeriesInventario:
+    """Totais por período (e por fonte) de um Inventario, em cache enquanto a versão não mudar"""
+
+    def __init__(self, inv):
+        self.inv = inv
+        self._versao = None
+
+    def _valida_cache(self):
+        if self._versao != self.inv.versao:
+            self._versao = self.inv.versao
+            self._inicio = self._meses = None
+            self._totais = {}
+
+    def _periodos(self):
+        self._valida_cache()
+        if self._inicio is None:
+            n = len(self.inv)
+            if COLUNA_PERIODO not in self.inv.colunas:
+                self._inicio, self._meses = np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=np.int64)
+            else:
+                codigos, unicos = pd.factorize(pd.Series(self.inv.coluna(COLUNA_PERIODO), dtype=object))
+                inicio, meses = zip(*([_intervalo(v) for v in unicos] + [(-1, 0)])) if len(unicos) else ((-1,), (0,))
+                self._inicio, self._meses = np.array(inicio, dtype=np.int64)[codigos], np.array(meses, dtype=np.int64)[codigos]
+        return self._inicio, self._meses
+
+    def totais(self, coluna, freq='M', por=None):
+        """
+        DataFrame com um período por linha (PeriodIndex contínuo, períodos sem lançamento = 0)
+        e uma coluna por valor de 'por' (ex.: Registro) ou só 'coluna' sem agrupamento.
+        """
+        chave = (coluna, freq, por)
+        self._valida_cache()
+        if chave in self._totais:
+            return self._totais[chave]
+        inicio, meses = self._periodos()
+        _, meses_freq, _ = FREQUENCIAS[freq]
+        usadas = (meses > 0) & (meses <= meses_freq)
+        if coluna not in self.inv.colunas or not usadas.any():
+            resultado = pd.DataFrame(dtype=float, index=pd.PeriodIndex([], freq=freq))
+        else:
+            valores = np.nan_to_num(pd.to_numeric(self.inv.coluna(coluna)[usadas], errors='coerce').astype(float))
+            periodos = inicio[usadas] // meses_freq
+            if por is None or por not in self.inv.colunas:
+                grupos, nomes = np.zeros(len(periodos), dtype=np.int64), [coluna]
+            else:
+                grupos, nomes = pd.factorize(pd.Series(self.inv.coluna(por)[usadas], dtype=object), use_na_sentinel=False)
+            primeiro, n_periodos, n_grupos = periodos.min(), periodos.max() - periodos.min() + 1, len(nomes)
+            somas = np.bincount((periodos - primeiro) * n_grupos + grupos, weights=valores, minlength=n_periodos * n_grupos)
+            resultado = pd.DataFrame(somas.reshape(n_periodos, n_grupos), columns=list(nomes),
+                                     index=_indice(primeiro, n_periodos, freq))
+        self._totais[chave] = resultado
+        return resultado
+
+    def variacao(self, coluna, freq='Y', por=None):
+        return variacao_anual(self.totais(coluna, freq, por), freq)
+
+    def sem_detalhe(self, coluna, freq):
+        """(lançamentos, soma de 'coluna') que não cabem na frequência: sem período ou mais longos que ela"""
+        inicio, meses = self._periodos()
+        fora = (meses == 0) | (meses > FREQUENCIAS[freq][1])
+        if coluna not in self.inv.colunas:
+            return int(fora.sum()), 0.0
+        return int(fora.sum()), float(np.nansum(pd.to_numeric(self.inv.coluna(coluna)[fora], errors='coerce')))
+
+
+def variacao_anual(totais, freq):
+    """Variação % sobre o mesmo período do ano anterior (ano a ano em qualquer frequência)"""
+    anterior = totais.shift(FREQUENCIAS[freq][2])
+    return ((totais - anterior) / anterior.abs() * 100).where(anterior != 0)
+
+
+_series = weakref.WeakKeyDictionary()
+
+
+def series_de(inv):
+    """SeriesInventario do inventário (uma por objeto, caches preservados entre reruns)"""
+    series = _series.get(inv)
+    if series is None:
+        series = _series[inv] = SeriesInventario(inv)
+    return series
+
+
+def consolidado(inventarios, totais_inventario, freq='M'):
+    """
+    Totais por período de cada categoria (ex.: "Escopo 1") somando os inventários.
+    totais_inventario: {chave do inventário: [(categoria, coluna), ...]} (ver inventario.TOTAIS_INVENTARIO).
+    """
+    partes = []
+    for chave, inv in inventarios.items():
+        if not inv:
+            continue
+        for categoria, coluna in totais_inventario.get(chave, []):
+            totais = series_de(inv).totais(coluna, freq)
+            if not totais.empty:
+                partes.append(totais[coluna].rename(categoria))
+    if not partes:
+        return pd.DataFrame(dtype=float, index=pd.PeriodIndex([], freq=freq))
+    resultado = pd.concat(partes, axis=1).fillna(0.0)
+    resultado = resultado.T.groupby(level=0, sort=False).sum().T  # Mesma categoria vinda de vários inventários
+    return resultado.reindex(pd.period_range(resultado.index.min(), resultado.index.max(), freq=freq), fill_value=0.0)
@@ -0,0 +1,189 @@
+"""
+Relatórios gerados em segundo plano, com progresso e resultado guardado em disco.
+
+O Streamlit só submete a tarefa e acompanha o progresso; a montagem roda num pool de
+threads do processo, fora da execução do script. O arquivo pronto fica em PASTA_PADRAO
+com o nome derivado do hash do conteúdo (inventários + versão dos fatores), então o
+mesmo relatório nunca é montado duas vezes, nem por outra sessão.
+Como cada versão do inventário gera um nome novo, a pasta é podada a cada gravação: saem os
+arquivos sem acesso há mais de IDADE_MAXIMA_CACHE e, se ainda passar de BYTES_MAXIMOS_CACHE,
+os acessados há mais tempo.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PASTA_PADRAO = 'data/relatorios'
+MAX_TAREFAS_SIMULTANEAS = 2
+BYTES_MAXIMOS_CACHE = 1 << 30  # 1 GiB
+IDADE_MAXIMA_CACHE = 7 * 24 * 3600  # segundos sem acesso
+
+_executor = ThreadPoolExecutor(max_workers=MAX_TAREFAS_SIMULTANEAS, thread_name_prefix="relatorio")
+_tarefas = {}
+_lock_tarefas = threading.Lock()
+
+
+class Tarefa:
+    """Uma montagem de relatório: progresso (0 a 1), erro e caminho do arquivo final"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.progresso = 0.0
+        self.erro = None
+        self.futuro = None
+
+    @property
+    def rodando(self):
+        return self.futuro is not None and not self.futuro.done()
+
+    @property
+    def pronta(self):
+        return not self.rodando and self.erro is None and os.path.exists(self.caminho)
+
+    def ler(self):
+        with open(self.caminho, 'rb') as f:
+            return f.read()
+
+
+# --- CHAVES DE CONTEÚDO ---
+_hashes = weakref.WeakKeyDictionary()
+
+
+def hash_inventario(inv):
+    """sha256 das colunas do Inventario (em cache enquanto a versão não mudar)"""
+    atual = _hashes.get(inv)
+    if atual is not None and atual[0] == inv.versao:
+        return atual[1]
+    h = hashlib.sha256()
+    for nome in inv.colunas:
+        valores = inv.coluna(nome)
+        h.update(nome.encode('utf-8'))
+        h.update(valores.tobytes() if valores.dtype == np.float64 else pd.util.hash_array(valores).tobytes())
+    _hashes[inv] = (inv.versao, h.hexdigest())
+    return _hashes[inv][1]
+
+
+def chave_relatorio(tipo, empresa_dados, inventarios, versao_fatores):
+    """Identifica o relatório pelo conteúdo: empresa, inventários e versão da base de fatores"""
+    h = hashlib.sha256()
+    h.update(json.dumps([tipo, versao_fatores, sorted((str(k), str(v)) for k, v in empresa_dados.items())]).encode('utf-8'))
+    for chave, inv in sorted(inventarios.items()):
+        h.update(f"{chave}:{hash_inventario(inv) if inv else '-'}".encode('utf-8'))
+    return h.hexdigest()[:32]
+
+
+# --- EXECUÇÃO ---
+def caminho_de(tipo, chave, extensao, pasta=PASTA_PADRAO):
+    return os.path.join(pasta, f"{tipo}_{chave}.{extensao}")
+
+
+def consultar(caminho):
+    """Tarefa já submetida (ou resultado achado no disco) para o caminho; None se não houver"""
+    with _lock_tarefas:
+        tarefa = _tarefas.get(caminho)
+        if tarefa is None and os.path.exists(caminho):
+            tarefa = _tarefas[caminho] = Tarefa(caminho)
+            tarefa.progresso = 1.0
+        if tarefa is not None and tarefa.pronta:
+            _toca(caminho)
+        return tarefa
+
+
+def submeter(caminho, construtor):
+    """
+    Agenda construtor(ao_progresso) -> bytes no pool, gravando o resultado em 'caminho'.
+    Se o arquivo já existe ou a mesma tarefa está rodando, devolve a existente.
+    """
+    with _lock_tarefas:
+        tarefa = _tarefas.get(caminho)
+        if tarefa is not None and (tarefa.rodando or tarefa.pronta):
+            return tarefa
+        tarefa = _tarefas[caminho] = Tarefa(caminho)
+        if os.path.exists(caminho):
+            tarefa.progresso = 1.0
+            _toca(caminho)
+            return tarefa
+        tarefa.futuro = _executor.submit(_executa, tarefa, construtor)
+        return tarefa
+
+
+def _executa(tarefa, construtor):
+    try:
+        def ao_progresso(fracao):
+            tarefa.progresso = min(max(fracao, 0.0), 0.99)
+
+        dados = construtor(ao_progresso)
+        os.makedirs(os.path.dirname(tarefa.caminho) or '.', exist_ok=True)
+        temporario = f"{tarefa.caminho}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as f:
+            f.write(dados)
+        os.replace(temporario, tarefa.caminho)  # Atômico: ninguém lê um arquivo pela metade
+        tarefa.progresso = 1.0
+        podar(os.path.dirname(tarefa.caminho) or '.', manter={tarefa.caminho})
+    except Exception as e:
+        tarefa.erro = str(e) or type(e).__name__
+
+
+# --- PODA DO CACHE ---
+def _toca(caminho):
+    """Marca o acesso (mtime) de um resultado reaproveitado: a poda remove primeiro os menos usados"""
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+
+
+def _tamanho(caminho):
+    try:
+        return os.path.getsize(caminho)
+    except OSError:
+        return 0
+
+
+def podar(pasta=PASTA_PADRAO, bytes_maximos=BYTES_MAXIMOS_CACHE, idade_maxima=IDADE_MAXIMA_CACHE, manter=()):
+    """
+    Apaga da pasta os resultados sem acesso há mais de idade_maxima segundos e, acima de
+    bytes_maximos, os de acesso mais antigo. Arquivos em 'manter' ou de tarefas rodando ficam.
+    Retorna quantos arquivos foram apagados.
+    """
+    with _lock_tarefas:
+        protegidos = {os.path.abspath(c) for c in manter}
+        protegidos |= {os.path.abspath(c) for c, t in _tarefas.items() if t.rodando}
+    arquivos = []
+    try:
+        entradas = list(os.scandir(pasta))
+    except OSError:
+        return 0
+    for entrada in entradas:
+        try:
+            if entrada.is_file() and os.path.abspath(entrada.path) not in protegidos:
+                st_arq = entrada.stat()
+                arquivos.append((st_arq.st_mtime, st_arq.st_size, entrada.path))
+        except OSError:
+            continue
+    limite = time.time() - idade_maxima
+    # Temporários recentes são gravações em andamento (de outro processo, inclusive)
+    arquivos = sorted(a for a in arquivos if not (a[2].endswith('.tmp') and a[0] >= limite))
+    total = sum(tamanho for _, tamanho, _ in arquivos) + sum(_tamanho(c) for c in protegidos)
+    apagados = 0
+    for mtime, tamanho, caminho in arquivos:
+        if mtime >= limite and total <= bytes_maximos:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue
+        total -= tamanho
+        apagados += 1
+        with _lock_tarefas:
+            tarefa = _tarefas.get(caminho)
+            if tarefa is not None and not tarefa.rodando:
+                del _tarefas[caminho]
+    return apagados
@@ -0,0 +1,224 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+from src import importacao
+
+EVENTOS_POR_BLOCO = 100_000
+VELOCIDADE_MAXIMA_KMH = 200.0  # Saltos de GPS/odômetro acima disso são descartados
+RAIO_TERRA_KM = 6371.0088
+
+# Campos do evento JSONL (um objeto por linha). Odômetro tem preferência; sem ele, usa lat/lon.
+#   {"veiculo": "ABC1D23", "ts": "2023-01-05T10:00:00Z", "odometro_km": 12345.6, "lat": -23.5, "lon": -46.6}
+CAMPO_VEICULO = "veiculo"
+CAMPO_TS = "ts"
+CAMPO_ODOMETRO = "odometro_km"
+CAMPO_LAT = "lat"
+CAMPO_LON = "lon"
+
+
+def ler_eventos(arquivo, nome_arquivo="", tamanho_bloco=EVENTOS_POR_BLOCO):
+    """
+    Gera DataFrames de até tamanho_bloco eventos (veiculo, ts, odometro_km, lat, lon) de um JSONL
+    (ou .jsonl.gz), sem carregar o arquivo inteiro. 'ts' aceita ISO 8601 ou epoch em segundos.
+    Um caminho (str) é aberto e fechado aqui; um arquivo recebido continua aberto para quem o passou.
+    """
+    abertos = []  # Fechados no fim, na ordem inversa (também se a leitura for interrompida)
+    if isinstance(arquivo, str):
+        nome_arquivo = nome_arquivo or arquivo
+        arquivo = open(arquivo, 'rb')
+        abertos.append(arquivo)
+    if nome_arquivo.lower().endswith(".gz"):
+        arquivo = gzip.GzipFile(fileobj=arquivo)  # Fechar o GzipFile não fecha o arquivo de baixo
+        abertos.append(arquivo)
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8')
+    try:
+        for bloco in pd.read_json(texto, lines=True, chunksize=tamanho_bloco, dtype=False, convert_dates=False):
+            yield _normaliza(bloco)
+    finally:
+        texto.detach()
+        for aberto in reversed(abertos):
+            aberto.close()
+
+
+def _normaliza(bloco):
+    ts = bloco[CAMPO_TS] if CAMPO_TS in bloco else pd.Series(np.nan, index=bloco.index)
+    if pd.api.types.is_numeric_dtype(ts):
+        ts = pd.to_datetime(ts, unit='s', utc=True, errors='coerce')
+    else:
+        ts = pd.to_datetime(ts, format='ISO8601', utc=True, errors='coerce')
+    eventos = pd.DataFrame({
+        "veiculo": bloco[CAMPO_VEICULO].astype(object) if CAMPO_VEICULO in bloco else None,
+        "ts": ts.astype("datetime64[ns, UTC]"),
+    })
+    for campo in (CAMPO_ODOMETRO, CAMPO_LAT, CAMPO_LON):
+        eventos[campo] = pd.to_numeric(bloco[campo], errors='coerce') if campo in bloco else np.nan
+    return eventos
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(a))
+
+
+def _ultimo_valido(valido, grupo):
+    """Para cada linha, posição da última linha válida do mesmo grupo até ela (-1 se não houver)"""
+    pos = np.where(valido, np.arange(len(valido)), -1)
+    pos = np.maximum.accumulate(pos) if len(pos) else pos
+    inicio_grupo = np.maximum.accumulate(np.where(np.r_[True, grupo[1:] != grupo[:-1]], np.arange(len(grupo)), 0))
+    return np.where(pos >= inicio_grupo, pos, -1)
+
+
+class DistanciaPorVeiculo:
+    """
+    Distância percorrida por veículo e mês, acumulada bloco a bloco numa única passada.
+    Entre blocos guarda só o estado de cada veículo (último evento, última leitura de
+    odômetro e última posição) e os totais por veículo/mês; os eventos são descartados.
+    O odômetro tem preferência; veículos sem odômetro usam a distância entre posições GPS.
+    Cada trecho é atribuído ao mês (UTC) da leitura que o encerra.
+    """
+
+    COLUNAS_ESTADO = ["veiculo", "ts", "odometro_km", "ts_odometro", "lat", "lon", "ts_gps"]
+
+    def __init__(self, velocidade_maxima_kmh=VELOCIDADE_MAXIMA_KMH):
+        self.velocidade_maxima_kmh = velocidade_maxima_kmh
+        self._estado = None
+        self._totais = {}  # (veiculo, mes) -> [km, eventos]
+        self.eventos = 0
+        self.descartados = {"sem veículo/data": 0, "fora de ordem": 0, "salto implausível": 0}
+
+    def adicionar(self, eventos):
+        validos = (eventos["veiculo"].notna() & eventos["ts"].notna()).to_numpy()
+        self.descartados["sem veículo/data"] += int((~validos).sum())
+        ts = eventos["ts"].to_numpy(dtype="datetime64[ns]")
+        df = pd.DataFrame({
+            "veiculo": eventos["veiculo"].to_numpy(dtype=object),
+            "ts": ts,
+            "odometro_km": eventos[CAMPO_ODOMETRO].to_numpy(dtype=float),
+            "lat": eventos[CAMPO_LAT].to_numpy(dtype=float),
+            "lon": eventos[CAMPO_LON].to_numpy(dtype=float),
+        })[validos]
+        df["ts_odometro"] = df["ts"].where(df["odometro_km"].notna())
+        df["ts_gps"] = df["ts"].where(df["lat"].notna() & df["lon"].notna())
+
+        # Eventos mais antigos que o último já processado do veículo não podem ser encadeados
+        if self._estado is not None:
+            limite = df["veiculo"].map(self._estado.set_index("veiculo")["ts"])
+            antigo = (df["ts"] < limite).to_numpy()
+            self.descartados["fora de ordem"] += int(antigo.sum())
+            df = df[~antigo]
+        self.eventos += len(df)
+        if df.empty:
+            return
+
+        # Estado de cada veículo entra na frente do bloco
+        novo = np.r_[np.zeros(0 if self._estado is None else len(self._estado), dtype=bool), np.ones(len(df), dtype=bool)]
+        df = pd.concat([self._estado, df[self.COLUNAS_ESTADO]], ignore_index=True) if self._estado is not None else df[self.COLUNAS_ESTADO].reset_index(drop=True)
+        ordem = np.lexsort((df["ts"].to_numpy(), pd.factorize(df["veiculo"])[0]))
+        df = df.iloc[ordem].reset_index(drop=True)
+        novo = novo[ordem]
+
+        veiculo = pd.factorize(df["veiculo"])[0]
+        mesmo = np.r_[False, veiculo[1:] == veiculo[:-1]]
+        odo, ts_odo = _preenche(df, ["odometro_km", "ts_odometro"], df["odometro_km"].notna().to_numpy(), veiculo)
+        (lat, lon, ts_gps) = _preenche(df, ["lat", "lon", "ts_gps"], (df["lat"].notna() & df["lon"].notna()).to_numpy(), veiculo)
+
+        # Odômetro: diferença entre leituras consecutivas (voltou para trás = troca/zeramento, ignora)
+        km = np.zeros(len(df))
+        horas = np.zeros(len(df))
+        anterior = slice(None, -1)
+        atual = slice(1, None)
+        com_odo = mesmo[atual] & ~np.isnan(odo[anterior])
+        d_odo = odo[atual] - odo[anterior]
+        h_odo = (ts_odo[atual] - ts_odo[anterior]) / np.timedelta64(1, 'h')
+        d_gps = _haversine_km(lat[anterior], lon[anterior], lat[atual], lon[atual])
+        h_gps = (ts_gps[atual] - ts_gps[anterior]) / np.timedelta64(1, 'h')
+        sem_odo = mesmo[atual] & np.isnan(odo[atual])
+        km[1:] = np.where(com_odo, np.where(d_odo > 0, d_odo, 0.0), np.where(sem_odo, np.nan_to_num(d_gps), 0.0))
+        horas[1:] = np.where(com_odo, h_odo, h_gps)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            salto = (km > 0) & ~(km / horas <= self.velocidade_maxima_kmh)
+        self.descartados["salto implausível"] += int(salto.sum())
+        km[salto] = 0.0
+
+        mes = df["ts"].to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        trechos = pd.DataFrame({"veiculo": df["veiculo"].to_numpy()[novo], "mes": mes[novo], "km": km[novo]})
+        grupos = trechos.groupby(["veiculo", "mes"], sort=False)["km"].agg(["sum", "size"])
+        for chave, soma, qtd in zip(grupos.index, grupos["sum"].to_numpy(), grupos["size"].to_numpy()):
+            total = self._totais.setdefault(chave, [0.0, 0])
+            total[0] += soma
+            total[1] += int(qtd)
+
+        # Novo estado: última linha de cada veículo, com o último odômetro/posição conhecidos
+        ultima = np.r_[veiculo[1:] != veiculo[:-1], True]
+        estado = pd.DataFrame({
+            "veiculo": df["veiculo"].to_numpy()[ultima], "ts": df["ts"].to_numpy()[ultima],
+            "odometro_km": odo[ultima], "ts_odometro": ts_odo[ultima],
+            "lat": lat[ultima], "lon": lon[ultima], "ts_gps": ts_gps[ultima],
+        })
+        if self._estado is not None:
+            estado = pd.concat([self._estado[~self._estado["veiculo"].isin(estado["veiculo"])], estado], ignore_index=True)
+        self._estado = estado
+
+    def resultado(self):
+        """DataFrame veiculo, mes ('AAAA-MM'), km, eventos (ordenado)"""
+        linhas = [(v, m, km, n) for (v, m), (km, n) in self._totais.items()]
+        df = pd.DataFrame(linhas, columns=["veiculo", "mes", "km", "eventos"])
+        df["mes"] = np.datetime_as_string(df["mes"].to_numpy(dtype=np.int64).astype("datetime64[M]"), unit='M')
+        return df.sort_values(["veiculo", "mes"], ignore_index=True)
+
+
+def _preenche(df, colunas, valido, grupo):
+    """Última leitura válida (dentro do mesmo veículo) de cada coluna, para cada linha"""
+    pos = _ultimo_valido(valido, grupo)
+    resultado = []
+    for c in colunas:
+        valores = df[c].to_numpy()
+        vazio = np.datetime64("NaT") if valores.dtype.kind == "M" else np.nan
+        resultado.append(np.where(pos >= 0, valores[np.maximum(pos, 0)], vazio))
+    return resultado
+
+
+def distancias_mensais(arquivos, ao_progresso=None, tamanho_bloco=EVENTOS_POR_BLOCO):
+    """arquivos: lista de (arquivo, nome). Retorna o DistanciaPorVeiculo com todos os eventos processados"""
+    acumulador = DistanciaPorVeiculo()
+    for arquivo, nome in arquivos:
+        for bloco in ler_eventos(arquivo, nome, tamanho_bloco):
+            acumulador.adicionar(bloco)
+            if ao_progresso:
+                ao_progresso(acumulador.eventos)
+    return acumulador
+
+
+def linhas_opcao3(distancias, calc, cadastro=None, tipo_padrao=None, ano_padrao="N/A"):
+    """
+    Calcula a Opção 3 (distância) para cada veículo/mês e monta as linhas do inventário móvel.
+    cadastro: DataFrame com 'Registro', 'Tipo Veículo' e 'Ano' (opcional); veículos fora
+    do cadastro usam tipo_padrao/ano_padrao.
+    """
+    distancias = distancias[distancias["km"] > 0]
+    tipo = pd.Series(tipo_padrao, index=distancias.index, dtype=object)
+    ano = pd.Series(ano_padrao, index=distancias.index, dtype=object)
+    if cadastro is not None and len(cadastro):
+        cadastro = cadastro.drop_duplicates("Registro", keep="last").set_index("Registro")
+        tipo = distancias["veiculo"].map(cadastro["Tipo Veículo"]).fillna(tipo)
+        ano = distancias["veiculo"].map(cadastro["Ano"].astype(str)).fillna(ano)
+
+    ano = ano.where(tipo.map(calc.verifica_ano_habilitado).fillna(False).astype(bool), "N/A")
+    entrada = pd.DataFrame({
+        "Registro": distancias["veiculo"].to_numpy(),
+        "Descrição": ("Telemetria " + distancias["mes"]).to_numpy(),
+        "opcao": 3,
+        "tipo_veiculo": tipo.to_numpy(),
+        "ano": ano.to_numpy(),
+        "combustivel_direto": None,
+        "qtd": distancias["km"].to_numpy(),
+    })
+    linhas = importacao.linhas_movel(entrada, calc.calcular_lote(entrada))
+    linhas["Método"] = "Opção 3 (Telemetria)"
+    linhas["Período"] = distancias["mes"].to_numpy()
+    return linhas
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import importacao
+from src.calculadora import GHGCalculator
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FATORES = os.path.join(RAIZ, 'data', 'fatores.json')
+COMBUSTIVEIS = os.path.join(RAIZ, 'data', 'lista_comb.csv')
+FATORES_EMISSAO = os.path.join(RAIZ, 'data', 'fatores_emissao.json')
+
+
+@pytest.fixture(scope='session')
+def calc():
+    return GHGCalculator(FATORES, COMBUSTIVEIS)
+
+
+@pytest.fixture
+def linhas_movel(calc):
+    """Monta linhas do inventário móvel (mesmas colunas da importação) a partir de dicts de entrada"""
+    def monta(registros):
+        entrada = pd.DataFrame(registros)
+        entrada["Descrição"] = entrada.get("Descrição", "")
+        for coluna in ("tipo_veiculo", "ano", "combustivel_direto", "periodo"):
+            if coluna not in entrada:
+                entrada[coluna] = None
+        return importacao.linhas_movel(entrada, calc.calcular_lote(entrada))
+    return monta
+
+
+@pytest.fixture
+def linhas_estacionaria(calc):
+    """Monta linhas da Tabela 1 a partir de dicts com Registro, combustivel_direto, qtd e periodo"""
+    def monta(registros, setor="Energia"):
+        entrada = pd.DataFrame(registros).assign(opcao=2)
+        entrada["Descrição"] = entrada.get("Descrição", "")
+        if "periodo" not in entrada:
+            entrada["periodo"] = None
+        return importacao.linhas_estacionaria(entrada, calc.calcular_lote(entrada), calc, setor)
+    return monta
@@ -0,0 +1,21 @@
+import importlib.util
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import RAIZ
+
+pytest.importorskip("streamlit")
+
+
+# --- CARREGAMENTO SOB DEMANDA ---
+def test_paginas_so_sao_importadas_quando_abertas():
+    codigo = "import sys, app; print(sum(m in sys.modules for m in app.PAGINAS.values()))"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip().splitlines()[-1] == "0"
+
+
+def test_todas_as_paginas_existem():
+    import app
+    assert all(importlib.util.find_spec(modulo) is not None for modulo in app.PAGINAS.values())
@@ -0,0 +1,17 @@
+import json
+
+from benchmarks import run_benchmarks
+
+from tests.conftest import RAIZ
+
+
+# --- SUÍTE DE BENCHMARKS ---
+def test_roda_todas_as_etapas_com_tamanho_pequeno(monkeypatch, tmp_path):
+    monkeypatch.chdir(RAIZ)
+    saida = tmp_path / "bench.json"
+    assert run_benchmarks.main(["--tamanhos", "200", "--sem-memoria", "--saida", str(saida)]) == 0
+    relatorio = json.loads(saida.read_text(encoding="utf-8"))
+    assert relatorio["meta"]["semente"] == run_benchmarks.SEMENTE
+    etapas = [r["etapa"] for r in relatorio["resultados"]]
+    assert etapas and len(etapas) == len(set(etapas))
+    assert all(r["tamanho"] == 200 and r["segundos"] >= 0 for r in relatorio["resultados"])
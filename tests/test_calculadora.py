@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import base_fatores
+from src.calculadora import GHGCalculator, carregar_calculadora, get_compartilhado
+from src.coeficientes import GASES, SEM_ANO
+
+from tests.conftest import COMBUSTIVEIS, FATORES
+
+
+def _entradas(calc):
+    """Mistura das três opções, com anos em texto, float (planilha) e vazios"""
+    veiculos = calc.get_tipos_veiculos()
+    combustiveis = calc.get_combustiveis_estacionaria()
+    anos = calc.get_anos_frota() + [2023.0, None, "1999"]
+    rng = np.random.default_rng(7)
+    linhas = []
+    for i in range(300):
+        opcao = (1, 2, 3)[i % 3]
+        linhas.append({
+            'opcao': opcao,
+            'qtd': float(rng.uniform(0, 5_000)) if i % 17 else 0.0,
+            'tipo_veiculo': veiculos[i % len(veiculos)] if opcao != 2 else None,
+            'ano': anos[i % len(anos)] if opcao != 2 else None,
+            'combustivel_direto': combustiveis[i % len(combustiveis)] if opcao == 2 else None,
+        })
+    return pd.DataFrame(linhas)
+
+
+def _escalar(calc, linha):
+    dados = {'qtd': linha.qtd}
+    if linha.opcao == 2:
+        dados['combustivel_direto'] = linha.combustivel_direto
+    else:
+        dados['tipo_veiculo'] = linha.tipo_veiculo
+        if linha.ano is not None:
+            dados['ano'] = str(int(linha.ano)) if isinstance(linha.ano, float) else linha.ano
+    return calc.calcular_movel(linha.opcao, dados)
+
+
+# --- LOTE x ESCALAR ---
+def test_calcular_lote_igual_ao_calculo_escalar(calc):
+    entrada = _entradas(calc)
+    lote = calc.calcular_lote(entrada)
+    assert list(lote.index) == list(entrada.index)
+    for linha, res in zip(entrada.itertuples(index=False), lote.itertuples(index=False)):
+        esperado = _escalar(calc, linha)
+        res = res._asdict()
+        for chave in ("versao_fatores", "chave_ano", "unidade_entrada", "combustivel_utilizado", "comp_fossil", "comp_bio",
+                      "distancia_informada", "consumo_calculado_litros", "consumo_medio_usado",
+                      "qtd_fossil", "qtd_bio", "total_gee", "total_bio"):
+            assert res[chave] == esperado[chave], chave
+        for g in GASES:
+            assert res[f"fatores_fossil_{g}"] == esperado["fatores_fossil"][g]
+            assert res[f"fatores_bio_{g}"] == esperado["fatores_bio"][g]
+            assert res[f"emis_fossil_{g}"] == esperado["emis_fossil"][g]
+            assert res[f"emis_bio_{g}"] == esperado["emis_bio"][g]
+
+
+def test_calcular_lote_recusa_veiculo_desconhecido(calc):
+    with pytest.raises(KeyError):
+        calc.calcular_lote(pd.DataFrame({'opcao': [1], 'qtd': [10.0], 'tipo_veiculo': ["Disco Voador"]}))
+
+
+# --- COEFICIENTES POR UNIDADE ---
+def test_coeficientes_batem_com_o_calculo_direto(calc):
+    """qtd x coeficiente = (qtd x fração) x fator, a menos de 1e-15 relativo"""
+    fatores_base = calc.db['fatores_base']
+    tabela_anos = calc.coeficientes.fatores_ano
+    qtd = 1234.5678
+    for (nome, chave_ano), coef in calc.coeficientes.itens():
+        fracao_f, fracao_b, comp_f, comp_b = calc.catalogo.get_composicao(nome)
+        fator_f = dict(fatores_base.get(comp_f, {"CO2": 0, "CH4": 0, "N2O": 0}))
+        fator_b = fatores_base.get(comp_b, {"CO2": 0, "CH4": 0, "N2O": 0})
+        if chave_ano != SEM_ANO and fracao_f > 0:
+            fator_f.update(CH4=tabela_anos[chave_ano]['CH4'], N2O=tabela_anos[chave_ano]['N2O'])
+        emis_f = {g: (qtd * fracao_f) * fator_f[g] for g in GASES}
+        emis_b = {g: (qtd * fracao_b) * fator_b[g] for g in GASES}
+        total = (sum(emis_f[g] * calc.gwp[g] for g in GASES)
+                 + emis_b['CH4'] * calc.gwp['CH4'] + emis_b['N2O'] * calc.gwp['N2O']) / 1000.0
+        obtido = qtd * coef
+        esperado = np.array([qtd * fracao_f, qtd * fracao_b]
+                            + [fator_f[g] * qtd for g in GASES] + [fator_b[g] * qtd for g in GASES]
+                            + [emis_f[g] for g in GASES] + [emis_b[g] for g in GASES]
+                            + [total, emis_b['CO2'] * calc.gwp['CO2'] / 1000.0])
+        np.testing.assert_allclose(obtido, esperado, rtol=1e-15, atol=0, err_msg=f"{nome} / {chave_ano}")
+
+
+# --- CATÁLOGO ---
+def test_catalogo_resolve_misturas_pelos_componentes(calc):
+    for nome, (fossil, bio) in calc.catalogo.componentes.items():
+        fracao_f, fracao_b, comp_f, comp_b = calc.catalogo.get_composicao(nome)
+        assert (comp_f, comp_b) == (fossil, bio)
+        if fossil == "-":
+            assert fracao_f == 0.0
+        if bio == "-":
+            assert fracao_b == 0.0
+    for nome in calc.get_combustiveis_estacionaria():
+        assert calc.get_unidade(nome) == calc.catalogo.unidades[nome]
+
+
+# --- BASE COMPILADA ---
+def test_base_compilada_igual_as_fontes(calc, tmp_path):
+    destino = str(tmp_path / "fatores.bin")
+    base_fatores.compilar(FATORES, COMBUSTIVEIS, destino)
+    compilada = GHGCalculator.de_base_compilada(destino)
+    assert compilada.versao_fatores == calc.versao_fatores
+    assert [chave for chave, _ in compilada.coeficientes.itens()] == [chave for chave, _ in calc.coeficientes.itens()]
+    for (_, vetor), (_, referencia) in zip(compilada.coeficientes.itens(), calc.coeficientes.itens()):
+        assert np.array_equal(vetor, referencia)
+    entrada = _entradas(calc)
+    pd.testing.assert_frame_equal(compilada.calcular_lote(entrada), calc.calcular_lote(entrada))
+
+
+def test_base_compilada_corrompida_usa_as_fontes(tmp_path):
+    destino = tmp_path / "fatores.bin"
+    destino.write_bytes(b"lixo")
+    calc = carregar_calculadora(FATORES, COMBUSTIVEIS, str(destino))
+    assert calc.df_comb is not None  # Lido das fontes
+
+
+# --- BASE COMPARTILHADA ---
+def test_compartilhado_so_recarrega_quando_o_conteudo_muda(tmp_path):
+    arquivo = tmp_path / "fonte.txt"
+    arquivo.write_text("a")
+    construidos = []
+
+    def construtor(caminho):
+        construidos.append(caminho)
+        return object()
+
+    primeiro = get_compartilhado(construtor, str(arquivo))
+    assert get_compartilhado(construtor, str(arquivo)) is primeiro
+    arquivo.write_text("a")  # Mesmo conteúdo, mtime novo
+    assert get_compartilhado(construtor, str(arquivo)) is primeiro
+    arquivo.write_text("bb")
+    assert get_compartilhado(construtor, str(arquivo)) is not primeiro
+    assert len(construidos) == 2
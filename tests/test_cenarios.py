@@ -0,0 +1,86 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from src import cenarios, importacao
+from src.inventario import Inventario, com_indice
+
+DIESEL = "Óleo Diesel (puro)"
+EMISSOES_MOVEL = ["Emissões de CO2 fóssil (t)", "Emissões de CH4 (t)", "Emissões de N2O (t)",
+                  "Emissões totais (t CO2e)", "Emissões de CO2 biogênico (t)"]
+
+
+def _calc_cenario(calc, cenario):
+    """Calculadora com a base alterada pelo cenário (recalcular do zero, para comparar)"""
+    outra = copy.copy(calc)
+    outra.db = copy.deepcopy(calc.db)
+    for comp, gases in cenario.fatores.items():
+        outra.db['fatores_base'][comp].update(gases)
+    for chave, gases in cenario.fatores_ano.items():
+        outra.db['combustao_movel']['fatores_ch4_n2o_por_ano'][chave].update(gases)
+    outra.gwp = cenario.gwp_efetivo(calc)
+    outra.invalidar_coeficientes()
+    return outra
+
+
+def _entradas():
+    return [
+        {"Registro": "V1", "opcao": 1, "tipo_veiculo": "Automóvel Gasolina", "ano": "2023", "qtd": 100.0},
+        {"Registro": "V2", "opcao": 3, "tipo_veiculo": "Caminhão Pesado Diesel", "ano": "N/A", "qtd": 5_000.0},
+        {"Registro": "V3", "opcao": 2, "combustivel_direto": "Óleo Diesel (comercial)", "qtd": 300.0},
+        {"Registro": "V4", "opcao": 1, "tipo_veiculo": "Automóvel Etanol", "ano": "2022", "qtd": 80.0},
+        {"Registro": "V5", "opcao": 3, "tipo_veiculo": "Automóvel Flex (Gasolina)", "ano": "Anterior a 2020", "qtd": 900.0},
+    ]
+
+
+def test_aplicar_igual_a_recalcular_do_zero(calc, linhas_movel):
+    cenario = cenarios.Cenario("Diesel+", gwp=cenarios.GWP_IPCC["AR6"],
+                               fatores={DIESEL: {"CO2": 3.0}}, fatores_ano={"padrao": {"CH4": 0.001}})
+    inv = Inventario(linhas_movel(_entradas()))
+    cenarios.aplicar(inv, 'inventario_movel', calc, cenario)
+
+    entrada = pd.DataFrame(_entradas()).assign(**{"Descrição": "", "periodo": None})
+    esperado = importacao.linhas_movel(entrada, _calc_cenario(calc, cenario).calcular_lote(entrada))
+    for coluna in EMISSOES_MOVEL:
+        np.testing.assert_allclose(inv.coluna(coluna), esperado[coluna].to_numpy(dtype=float), rtol=1e-12, err_msg=coluna)
+
+
+def test_linhas_afetadas_so_as_que_usam_o_fator(calc, linhas_movel):
+    inv = Inventario(linhas_movel(_entradas()))
+    afetadas = cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenarios.Cenario("d", fatores={DIESEL: {"CO2": 3.0}}))
+    assert list(inv.coluna("Registro")[afetadas]) == ["V2", "V3"]
+    assert len(cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenarios.Cenario("nada"))) == 0
+    gwp = cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenarios.Cenario("g", gwp={"CH4": 1.0}))
+    assert list(gwp) == list(range(len(inv)))
+
+
+def test_upsert_que_troca_o_combustivel_atualiza_o_indice(calc, linhas_movel):
+    """Regressão: o índice de fatores ficava preso ao combustível anterior depois de um upsert no lugar"""
+    inv = com_indice(Inventario(linhas_movel([{"Registro": "V1", "opcao": 2, "qtd": 100.0,
+                                               "combustivel_direto": "Gasolina Automotiva (comercial)"}])),
+                     'inventario_movel')
+    cenario = cenarios.Cenario("Diesel", fatores={DIESEL: {"CO2": 5.0}})
+    inventarios = {'inventario_movel': inv}
+    antes = cenarios.comparar(inventarios, calc, [cenario])
+    assert (antes["Diesel"] == antes["Base"]).all()
+
+    substituiu = inv.upsert(linhas_movel([{"Registro": "V1", "opcao": 2, "qtd": 100.0,
+                                           "combustivel_direto": "Óleo Diesel (comercial)"}]).iloc[0].to_dict())
+    assert substituiu and len(inv) == 1
+    assert list(cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenario)) == [0]
+    depois = cenarios.comparar(inventarios, calc, [cenario])
+    pd.testing.assert_frame_equal(depois, cenarios.comparar({'inventario_movel': Inventario(inv.df)}, calc, [cenario]))
+    escopo1 = depois.set_index("Categoria").loc["Escopo 1"]
+    qtd_fossil = inv.coluna("Qtd Combustível Fóssil")[0]
+    fator = calc.db['fatores_base'][DIESEL]["CO2"]
+    assert np.isclose(escopo1["Diesel"] - escopo1["Base"], qtd_fossil * (5.0 - fator) / 1000)
+
+
+def test_remover_atualiza_o_indice(calc, linhas_movel):
+    inv = Inventario(linhas_movel(_entradas()))
+    cenario = cenarios.Cenario("d", fatores={DIESEL: {"CO2": 3.0}})
+    cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenario)
+    inv.remover([0])
+    afetadas = cenarios.linhas_afetadas(inv, 'inventario_movel', calc, cenario)
+    assert list(inv.coluna("Registro")[afetadas]) == ["V2", "V3"]
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+from src import cli, importacao
+
+from tests.conftest import COMBUSTIVEIS, FATORES
+
+
+@pytest.fixture
+def arquivo_movel(tmp_path):
+    linhas = [f"V{i};;{(1, 2, 3)[i % 3]};{'Automóvel Gasolina' if i % 3 != 1 else ''};{'2023' if i % 3 != 1 else ''};"
+              f"{'Etanol' if i % 3 == 1 else ''};{10 + i}" for i in range(40)]
+    linhas.append("Ruim;;9;;;;1")
+    caminho = tmp_path / "movel.csv"
+    caminho.write_text(";".join(importacao.COLUNAS_MOVEL) + "\n" + "\n".join(linhas) + "\n", encoding="utf-8")
+    return caminho
+
+
+def _batch(arquivo, saida, processos, formato="csv"):
+    assert cli.main(["batch", "--movel", str(arquivo), "--saida", str(saida), "--formato", formato, "--bloco", "7",
+                     "--processos", str(processos), "--fatores", FATORES, "--combustiveis", COMBUSTIVEIS]) == 0
+
+
+# --- CLI EM LOTE ---
+def test_batch_igual_a_importacao(calc, arquivo_movel, tmp_path):
+    _batch(arquivo_movel, tmp_path / "saida", 1)
+    obtido = pd.read_csv(tmp_path / "saida" / "movel.csv", encoding="utf-8-sig")
+    blocos = []
+    with open(arquivo_movel, 'rb') as f:
+        importacao.importar_arquivo(f, "movel.csv", 'movel', calc, blocos.append)
+    esperado = pd.concat(blocos, ignore_index=True)
+    assert list(obtido.columns) == list(esperado.columns) and len(obtido) == 40
+    pd.testing.assert_series_equal(obtido["Emissões totais (t CO2e)"], esperado["Emissões totais (t CO2e)"])
+    erros = pd.read_csv(tmp_path / "saida" / "erros.csv", encoding="utf-8-sig")
+    assert erros["Linha"].tolist() == [42]
+
+
+def test_batch_em_paralelo_igual_em_serie(arquivo_movel, tmp_path):
+    _batch(arquivo_movel, tmp_path / "serie", 1)
+    _batch(arquivo_movel, tmp_path / "paralelo", 2)
+    assert (tmp_path / "serie" / "movel.csv").read_bytes() == (tmp_path / "paralelo" / "movel.csv").read_bytes()
+
+
+def test_batch_em_parquet(arquivo_movel, tmp_path):
+    pytest.importorskip("pyarrow")
+    _batch(arquivo_movel, tmp_path / "csv", 1)
+    _batch(arquivo_movel, tmp_path / "parquet", 1, "parquet")
+    csv = pd.read_csv(tmp_path / "csv" / "movel.csv", encoding="utf-8-sig")
+    parquet = pd.read_parquet(tmp_path / "parquet" / "movel.parquet")
+    pd.testing.assert_series_equal(parquet["Emissões totais (t CO2e)"], csv["Emissões totais (t CO2e)"])
+
+
+def test_parquet_com_periodo_vazio_no_primeiro_bloco(arquivo_movel, tmp_path):
+    pytest.importorskip("pyarrow")
+    linhas = arquivo_movel.read_text(encoding="utf-8").splitlines()
+    # Primeiro bloco (7 linhas) sem Período; os seguintes com meses
+    corpo = [f"{linha};{'' if i < 7 else f'2024-{i % 12 + 1:02d}'}" for i, linha in enumerate(linhas[1:-1])]
+    arquivo_movel.write_text(linhas[0] + ";" + importacao.COLUNA_PERIODO + "\n" + "\n".join(corpo) + "\n",
+                             encoding="utf-8")
+    _batch(arquivo_movel, tmp_path / "saida", 1, "parquet")
+    parquet = pd.read_parquet(tmp_path / "saida" / "movel.parquet")
+    assert len(parquet) == 40
+    assert parquet[importacao.COLUNA_PERIODO].isna().sum() == 7
+    assert parquet[importacao.COLUNA_PERIODO].iloc[7:].str.startswith("2024-").all()
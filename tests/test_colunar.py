@@ -0,0 +1,64 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.inventario import Inventario
+
+pytest.importorskip("pyarrow")
+from src import colunar  # noqa: E402
+
+
+def _ida_e_volta(chave, inv, empresa=None):
+    buffer = io.BytesIO()
+    colunar.escrever_inventario(buffer, chave, inv, empresa)
+    buffer.seek(0)
+    return colunar.ler_inventario(buffer)
+
+
+# --- IDA E VOLTA ---
+def test_ida_e_volta_preserva_colunas_tipos_e_ordem(linhas_movel):
+    df = linhas_movel([
+        {"Registro": "V1", "opcao": 1, "tipo_veiculo": "Automóvel Gasolina", "ano": "2023", "qtd": 100.0, "periodo": "2024-01"},
+        {"Registro": "V2", "opcao": 2, "combustivel_direto": "Etanol", "qtd": 50.0, "periodo": None},
+    ])
+    inv = Inventario(df)
+    inv.append({"Registro": None, "Extra": "x", "Emissões totais (t CO2e)": np.nan})
+    chave, lido, empresa = _ida_e_volta('inventario_movel', inv, {"nome": "Org", "ano": 2024})
+    assert chave == 'inventario_movel' and empresa == {"nome": "Org", "ano": 2024}
+    assert lido.colunas == inv.colunas
+    pd.testing.assert_frame_equal(lido.df, inv.df)
+
+
+def test_coluna_so_com_vazios_sobrevive():
+    """Regressão: colunas sem nenhum valor eram descartadas na leitura"""
+    inv = Inventario(pd.DataFrame({"Registro": ["A", "B"], "Qtd Biocombustível": [np.nan, np.nan],
+                                   "Período": [None, None], "Total": [1.0, 2.0]}))
+    _, lido, _ = _ida_e_volta('inventario_movel', inv)
+    assert lido.colunas == ["Registro", "Qtd Biocombustível", "Período", "Total"]
+    assert lido.coluna("Qtd Biocombustível").dtype == np.float64 and np.isnan(lido.coluna("Qtd Biocombustível")).all()
+    assert list(lido.coluna("Período")) == [None, None]
+
+
+def test_colunas_completadas_pelo_esquema_ficam_de_fora():
+    inv = Inventario([{"Registro": "A", "Emissões totais (t CO2e)": 1.0}])
+    _, lido, _ = _ida_e_volta('inventario_movel', inv)
+    assert lido.colunas == ["Registro", "Emissões totais (t CO2e)"]
+
+
+def test_inventario_vazio():
+    _, lido, _ = _ida_e_volta('inventario', Inventario())
+    assert len(lido) == 0
+
+
+def test_pacote_com_varios_inventarios():
+    inventarios = {'inventario_escopo3': Inventario([{"Categoria": "4", "Modal": "Rodoviário", "Emissões (t CO2e)": 1.5}]),
+                   'inventario_t3': Inventario([{"Registro da fonte": "F1", "Emissões de CH4 (t)": 0.1}]),
+                   'inventario': Inventario()}
+    empresa = {"nome": "Org", "ano": 2024, "setor": None}
+    dados, lidos = colunar.ler_pacote(io.BytesIO(colunar.gerar_pacote(empresa, inventarios)))
+    assert dados == empresa
+    assert set(lidos) == {'inventario_escopo3', 'inventario_t3'}
+    for chave, inv in lidos.items():
+        pd.testing.assert_frame_equal(inv.df, inventarios[chave].df)
@@ -0,0 +1,62 @@
+import io
+
+import pandas as pd
+import pytest
+
+from src import consolidacao, persistencia
+from src.inventario import Inventario
+
+
+@pytest.fixture
+def caminho_banco(tmp_path):
+    caminho = str(tmp_path / "grupo.db")
+    banco = persistencia.BancoInventario(caminho)
+    for nome, total in (("Matriz", 100.0), ("Filial", 40.0), ("Coligada", 10.0)):
+        empresa = {'nome': nome, 'ano': 2024}
+        banco.salvar_empresa(empresa)
+        persistencia.sincronizar(banco, empresa, {'inventario': Inventario([
+            {"Registro": "F1", "Combustível": "Etanol", "Total GEE (tCO2e)": total, "Biogênicas (tCO2)": float("nan")},
+            {"Registro": "F2", "Combustível": "Etanol", "Total GEE (tCO2e)": total / 2, "Biogênicas (tCO2)": 1.0},
+        ])})
+    return caminho
+
+
+ESTRUTURA = "Organização;Participação (%);Controle Operacional\nMatriz;100;Sim\nFilial;60,5%;Não\nColigada;20;x\n"
+
+
+# --- CONSOLIDAÇÃO DO GRUPO ---
+def test_totais_e_abordagens(caminho_banco):
+    pares = persistencia.BancoInventario(caminho_banco).listar_inventarios()
+    totais = consolidacao.calcular_subsidiarias(pares, caminho_banco, processos=1)
+    escopo1 = totais[totais["Categoria"] == "Escopo 1"].set_index("Organização")["Total (t)"]
+    assert escopo1.to_dict() == {"Coligada": 15.0, "Filial": 60.0, "Matriz": 150.0}
+    estrutura = consolidacao.ler_estrutura(io.StringIO(ESTRUTURA))
+
+    participacao = consolidacao.consolidar(totais, estrutura, "participacao_societaria")['grupo']
+    assert participacao["Escopo 1"].iloc[0] == pytest.approx(150.0 + 60.0 * 0.605 + 15.0 * 0.2)
+    controle = consolidacao.consolidar(totais, estrutura, "controle_operacional")['grupo']
+    assert controle["Escopo 1"].iloc[0] == pytest.approx(165.0)
+    assert controle["CO2 biogênico"].iloc[0] == pytest.approx(2.0)
+
+
+def test_em_paralelo_igual_em_serie(caminho_banco):
+    pares = persistencia.BancoInventario(caminho_banco).listar_inventarios()
+    serie = consolidacao.calcular_subsidiarias(pares, caminho_banco, processos=1)
+    paralelo = consolidacao.calcular_subsidiarias(pares, caminho_banco, processos=2)
+    pd.testing.assert_frame_equal(serie, paralelo)
+
+
+def test_resultado_em_json_ida_e_volta(caminho_banco):
+    pares = persistencia.BancoInventario(caminho_banco).listar_inventarios()
+    totais = consolidacao.calcular_subsidiarias(pares, caminho_banco, processos=1)
+    estrutura = consolidacao.ler_estrutura(io.StringIO(ESTRUTURA.replace("Coligada;20;x\n", "")))
+    resultado = consolidacao.consolidar(totais, estrutura)
+    lido = consolidacao.resultado_de_json(consolidacao.resultado_para_json(resultado))
+    assert lido['fora_da_estrutura'] == ["Coligada"]
+    for parte in ('grupo', 'subsidiarias'):
+        pd.testing.assert_frame_equal(lido[parte], resultado[parte], check_dtype=False)
+
+
+def test_estrutura_invalida():
+    with pytest.raises(ValueError):
+        consolidacao.ler_estrutura(io.StringIO("Organização;Participação (%);Controle Operacional\nA;120;Sim\n"))
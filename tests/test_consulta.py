@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src.consulta import consulta_de
+from src.inventario import Inventario
+
+
+def _inventario():
+    rng = np.random.default_rng(11)
+    n = 500
+    return Inventario(pd.DataFrame({
+        "Registro": [f"R{i:03d}" for i in range(n)],
+        "Combustível": rng.choice(["Etanol", "Óleo Diesel (comercial)", "Gasolina Automotiva (comercial)", None], n),
+        "Total": rng.uniform(0, 10, n),
+    }))
+
+
+# --- CONSULTA PAGINADA ---
+def test_filtro_ordenacao_e_pagina_iguais_ao_pandas():
+    inv = _inventario()
+    consulta = consulta_de(inv)
+    linhas = consulta.filtrar("diesel", {"Combustível": ["Óleo Diesel (comercial)"]})
+    df = inv.df
+    esperado = df[df["Combustível"] == "Óleo Diesel (comercial)"].sort_values("Total", ascending=False, kind="stable")
+    ordem = consulta.ordenar(linhas, "Total", crescente=False)
+    assert list(ordem) == list(esperado.index)
+    pagina = consulta.pagina(ordem, 2, 25)
+    pd.testing.assert_frame_equal(pagina.reset_index(drop=True), esperado.iloc[25:50].reset_index(drop=True))
+    assert consulta.totais(linhas, ["Total"])["Total"] == esperado["Total"].sum()
+
+
+def test_texto_ordena_vazios_no_fim():
+    inv = _inventario()
+    consulta = consulta_de(inv)
+    ordem = consulta.ordenar(np.arange(len(inv)), "Combustível")
+    valores = list(inv.coluna("Combustível")[ordem])
+    preenchidos = [v for v in valores if isinstance(v, str)]
+    assert preenchidos == sorted(preenchidos) and valores[:len(preenchidos)] == preenchidos
+    assert len(preenchidos) < len(valores)
+
+
+def test_cache_invalida_quando_o_inventario_muda():
+    inv = _inventario()
+    consulta = consulta_de(inv)
+    assert consulta_de(inv) is consulta
+    antes = consulta.totais(np.arange(len(inv)), ["Total"])["Total"]
+    inv.append({"Registro": "Novo", "Combustível": "Etanol", "Total": 1_000.0})
+    assert consulta.totais(np.arange(len(inv)), ["Total"])["Total"] == antes + 1_000.0
+    assert len(consulta.filtrar("novo")) == 1
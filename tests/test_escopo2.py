@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.escopo2 import CalculadoraEscopo2, SerieFatores
+
+from tests.conftest import FATORES_EMISSAO
+
+
+@pytest.fixture(scope='module')
+def calc2():
+    return CalculadoraEscopo2(FATORES_EMISSAO)
+
+
+# --- SÉRIE DE FATORES ---
+def test_fator_vigente_em_cada_instante():
+    serie = SerieFatores(["2024-01-01", "2024-02-01", "2024-03-01"], [1.0, 2.0, 3.0], "mensal")
+    instantes = ["2023-12-31 23:00", "2024-01-15 12:00", "2024-02-01 00:00", "2024-03-31 23:59", "2024-04-01 00:00", None]
+    assert np.array_equal(serie.fatores_para(instantes), [np.nan, 1.0, 2.0, 3.0, np.nan, np.nan], equal_nan=True)
+
+
+def test_serie_anual_estende_o_ultimo_ano(calc2):
+    anos = sorted(calc2.fatores_anuais)
+    fatores = calc2.serie_sin.fatores_para([f"{anos[0]}-06-01", f"{anos[-1]}-06-01", f"{int(anos[-1]) + 2}-01-01"])
+    assert fatores.tolist() == [calc2.fatores_anuais[anos[0]], calc2.fatores_anuais[anos[-1]], calc2.fatores_anuais[anos[-1]]]
+
+
+def test_resolucao_invalida():
+    with pytest.raises(ValueError):
+        SerieFatores(["2024-01-01"], [1.0], "semanal")
+
+
+# --- LOCALIZAÇÃO E MERCADO ---
+def test_localizacao_e_mercado(calc2):
+    horas = pd.date_range("2024-01-01", periods=48, freq="h")
+    leituras = pd.DataFrame({"instalacao": ["A"] * 24 + ["B"] * 24, "data_hora": horas, "kwh": 1_000.0})
+    serie = SerieFatores(horas[:1], [0.1], "anual")
+    instrumentos = pd.DataFrame({"instalacao": ["B"], "fator": [0.0]})
+    resultado = calc2.calcular(leituras, serie, instrumentos)
+    assert resultado["tco2e_localizacao"].sum() == pytest.approx(48 * 0.1)
+    assert resultado["tco2e_mercado"].sum() == pytest.approx(24 * 0.1)
+    resumo = calc2.resumir(resultado, "M").set_index("instalacao")
+    assert resumo.loc["B", "tco2e_mercado"] == 0.0 and resumo.loc["A", "leituras"] == 24
+    assert (resumo["leituras_sem_fator"] == 0).all()
@@ -0,0 +1,66 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import escopo3
+from src.inventario import Inventario, com_indice
+
+from tests.conftest import FATORES_EMISSAO
+
+
+@pytest.fixture(scope='module')
+def calc3():
+    return escopo3.CalculadoraTransporte(FATORES_EMISSAO)
+
+
+# --- TRANSPORTE POR t.km ---
+def test_calculo_por_tkm(calc3):
+    modal = calc3.get_modais()[0]
+    tkm, tco2e = calc3.calcular([modal, "Teletransporte"], [10.0, 1.0], [200.0, 1.0])
+    assert tkm.tolist() == [2_000.0, 1.0]
+    assert tco2e[0] == pytest.approx(2_000.0 * calc3.fatores[modal] / 1000) and np.isnan(tco2e[1])
+
+
+def test_arquivo_em_blocos_igual_ao_inteiro(calc3):
+    modais = calc3.get_modais()
+    linhas = [("4", f"T{i % 3}", f" {modais[i % len(modais)].upper()} ", f"{i + 1},5", "100") for i in range(100)]
+    linhas.append(("9", "T0", "Teletransporte", "1", "1"))
+    texto = ";".join(escopo3.COLUNAS_TRANSPORTE) + "\n" + "\n".join(";".join(l) for l in linhas)
+    inteiro = escopo3.processar_arquivo(io.BytesIO(texto.encode()), "log.csv", calc3)
+    em_blocos = escopo3.processar_arquivo(io.BytesIO(texto.encode()), "log.csv", calc3, tamanho_bloco=3)
+    assert (inteiro['validas'], inteiro['invalidas']) == (100, 1) and inteiro['erros'][0]["Linha"] == 102
+    pd.testing.assert_frame_equal(inteiro['resumo'].detalhado, em_blocos['resumo'].detalhado)
+    assert inteiro['resumo'].por("Modal")["Embarques"].sum() == 100
+
+
+def test_periodo_opcional_separa_os_totais(calc3):
+    modal = calc3.get_modais()[0]
+    linhas = [("4", "T0", modal, "1", "100", "2024-01"), ("4", "T0", modal, "2", "100", "01/2024"),
+              ("4", "T0", modal, "3", "100", "2024-02"), ("4", "T0", modal, "4", "100", ""),
+              ("4", "T0", modal, "5", "100", "fevereiro")]
+    texto = ";".join(escopo3.COLUNAS_TRANSPORTE + ["Período"]) + "\n" + "\n".join(";".join(l) for l in linhas)
+    resultado = escopo3.processar_arquivo(io.BytesIO(texto.encode()), "log.csv", calc3, tamanho_bloco=2)
+    assert resultado['erros'] == [{"Linha": 6, "Erro": "Período inválido (use AAAA-MM, MM/AAAA ou AAAA)"}]
+    detalhado = resultado['resumo'].detalhado
+    assert list(zip(detalhado["Período"], detalhado["Peso (t)"])) == [("2024-01", 3), ("2024-02", 3), (None, 4)]
+
+
+def test_reimportar_o_mesmo_log_nao_duplica(calc3):
+    """Regressão: os totais eram acrescentados com extend e o Escopo 3 dobrava a cada reimportação"""
+    modais = calc3.get_modais()
+    linhas = [("4", f"T{i % 2}", modais[i % len(modais)], "1", "100") for i in range(20)]
+    texto = ";".join(escopo3.COLUNAS_TRANSPORTE) + "\n" + "\n".join(";".join(l) for l in linhas)
+    detalhado = escopo3.processar_arquivo(io.BytesIO(texto.encode()), "log.csv", calc3)['resumo'].detalhado
+    inv = com_indice(Inventario(), 'inventario_escopo3')
+    assert inv.upsert_lote(detalhado) == (0, len(detalhado))
+    total = inv.df["Emissões (t CO2e)"].sum()
+    assert inv.upsert_lote(detalhado) == (len(detalhado), 0)
+    assert len(inv) == len(detalhado) and inv.df["Emissões (t CO2e)"].sum() == total
+
+
+def test_json_de_fatores_com_crlf():
+    with open(FATORES_EMISSAO, 'rb') as f:
+        conteudo = f.read()
+    assert conteudo.count(b"\r\n") == conteudo.count(b"\n")
@@ -0,0 +1,30 @@
+import datetime
+import io
+import re
+import zipfile
+
+import numpy as np
+import pytest
+
+from src import exportacao
+from src.inventario import Inventario
+
+pytest.importorskip("xlsxwriter")
+
+
+# --- EXCEL EM BLOCOS ---
+def test_uma_aba_por_inventario_nao_vazio(monkeypatch):
+    monkeypatch.setattr(exportacao, "LINHAS_POR_BLOCO", 3)
+    inventarios = {
+        'inventario': Inventario([{"Registro": f"F{i}", "Total GEE (tCO2e)": float(i) if i % 2 else np.nan} for i in range(10)]),
+        'inventario_movel': Inventario(),
+        'inventario_escopo3': None,
+    }
+    progresso = []
+    dados = exportacao.gerar_excel({"nome": "Org", "data": datetime.date(2024, 1, 1), "ano": 2024}, inventarios, progresso.append)
+    with zipfile.ZipFile(io.BytesIO(dados)) as xlsx:
+        pasta = xlsx.read("xl/workbook.xml").decode("utf-8")
+        planilha = xlsx.read("xl/worksheets/sheet2.xml").decode("utf-8")
+    assert re.findall(r'<sheet name="([^"]+)"', pasta) == ["Introdução", "Estacionária - Tabela 1"]
+    assert planilha.count("<row ") == 11
+    assert progresso == [0.3, 0.6, 0.9, 1.0]
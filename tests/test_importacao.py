@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import importacao
+from src.series import normalizar_periodos
+
+
+def _csv(linhas, colunas):
+    texto = ";".join(colunas) + "\n" + "\n".join(";".join(map(str, l)) for l in linhas)
+    return io.BytesIO(texto.encode("utf-8"))
+
+
+def _importa(calc, arquivo, tipo, tamanho_bloco=importacao.TAMANHO_BLOCO):
+    blocos = []
+    resumo = importacao.importar_arquivo(arquivo, f"{tipo}.csv", tipo, calc, blocos.append, tamanho_bloco=tamanho_bloco)
+    return (pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame()), resumo
+
+
+# --- IMPORTAÇÃO EM BLOCOS ---
+def test_blocos_pequenos_dao_o_mesmo_resultado(calc):
+    nomes = calc.get_combustiveis_estacionaria()
+    linhas = [(f"F{i}", "desc", nomes[i % len(nomes)], f"{i + 1},5", "2024-03") for i in range(250)]
+    colunas = importacao.COLUNAS_ESTACIONARIA + importacao.COLUNAS_OPCIONAIS
+    inteiro, r1 = _importa(calc, _csv(linhas, colunas), 'estacionaria')
+    em_blocos, r2 = _importa(calc, _csv(linhas, colunas), 'estacionaria', tamanho_bloco=7)
+    assert r1 == r2 and r1['validas'] == 250
+    pd.testing.assert_frame_equal(inteiro, em_blocos)
+    assert inteiro["Quantidade Total"].iloc[0] == 1.5
+
+
+def test_linhas_invalidas_sao_rejeitadas_com_a_linha_do_arquivo(calc):
+    linhas = [
+        ("V1", "", "1", "Automóvel Gasolina", "2023", "", "100"),
+        ("V2", "", "4", "", "", "", "10"),                         # Opção inválida
+        ("V3", "", "1", "Disco Voador", "", "", "10"),             # Veículo
+        ("V4", "", "1", "Automóvel Etanol", "1999", "", "10"),     # Ano
+        ("V5", "", "2", "", "", "Água", "10"),                     # Combustível
+        ("V6", "", "2", "", "", "Etanol", "-1"),                   # Quantidade
+        ("V7", "", "3", "Caminhão Leve Diesel", "2023", "", "500"),
+    ]
+    df, resumo = _importa(calc, _csv(linhas, importacao.COLUNAS_MOVEL), 'movel', tamanho_bloco=3)
+    assert (resumo['validas'], resumo['invalidas']) == (2, 5)
+    assert [e["Linha"] for e in resumo['erros']] == [3, 4, 5, 6, 7]
+    assert list(df["Registro"]) == ["V1", "V7"]
+    assert df["Ano Fatores"].tolist() == ["2023", calc.coeficientes.chave_ano("N/A")]
+
+
+def test_colunas_ausentes(calc):
+    with pytest.raises(ValueError):
+        _importa(calc, _csv([("A", "1")], ["Registro", "Quantidade"]), 'estacionaria')
+
+
+# --- PERÍODO ---
+def test_normalizar_periodos():
+    valores = np.array(["2024-03", "03/2024", "2024-03-15", "15/03/2024", "2024", "2024.0", "2024Q2", "2024-q1",
+                        None, "", np.nan, "2024-13", "março", 2024], dtype=object)
+    periodos, invalidos = normalizar_periodos(valores)
+    assert list(periodos[:8]) == ["2024-03", "2024-03", "2024-03", "2024-03", "2024", "2024", "2024Q2", "2024Q1"]
+    assert list(periodos[8:11]) == [None, None, None]
+    assert list(invalidos) == [False] * 11 + [True, True, False]
+    assert periodos[13] == "2024"
+
+
+def test_periodo_invalido_rejeita_a_linha(calc):
+    colunas = importacao.COLUNAS_ESTACIONARIA + importacao.COLUNAS_OPCIONAIS
+    linhas = [("F1", "", "Etanol", "10", "2024-02"), ("F2", "", "Etanol", "10", "fevereiro")]
+    df, resumo = _importa(calc, _csv(linhas, colunas), 'estacionaria')
+    assert list(df["Período"]) == ["2024-02"] and resumo['erros'][0]["Linha"] == 3
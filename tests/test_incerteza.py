@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import incerteza
+from src.inventario import Inventario
+
+SEM_ATIVIDADE = {"atividade": ("normal", 0.0)}
+
+
+def _inventarios(linhas_movel, linhas_estacionaria):
+    return {
+        'inventario_movel': Inventario(linhas_movel([
+            {"Registro": "V1", "opcao": 2, "combustivel_direto": "Óleo Diesel (comercial)", "qtd": 1_000.0},
+            {"Registro": "V2", "opcao": 1, "tipo_veiculo": "Automóvel Gasolina", "ano": "2023", "qtd": 500.0},
+            {"Registro": "V3", "opcao": 1, "tipo_veiculo": "Automóvel Gasolina", "ano": "2022", "qtd": 500.0},
+        ])),
+        'inventario': Inventario(linhas_estacionaria([
+            {"Registro": "F1", "combustivel_direto": "Óleo Diesel (comercial)", "qtd": 2_000.0},
+        ])),
+    }
+
+
+# --- MONTE CARLO ---
+def test_mesma_semente_mesmo_resultado(calc, linhas_movel, linhas_estacionaria):
+    inventarios = _inventarios(linhas_movel, linhas_estacionaria)
+    a, resumo_a = incerteza.simular(inventarios, calc.gwp, 2_000, semente=42)
+    b, resumo_b = incerteza.simular(inventarios, calc.gwp, 2_000, semente=42)
+    pd.testing.assert_frame_equal(a, b)
+    pd.testing.assert_frame_equal(resumo_a, resumo_b)
+
+
+def test_estimativa_pontual_e_a_soma_das_linhas(calc, linhas_movel, linhas_estacionaria):
+    inventarios = _inventarios(linhas_movel, linhas_estacionaria)
+    _, resumo = incerteza.simular(inventarios, calc.gwp, 500, semente=1)
+    pontual = resumo.set_index(["Categoria", "Gás"]).iloc[:, 0]
+    esperado = (inventarios['inventario_movel'].df["Emissões de CO2 fóssil (t)"].sum()
+                + inventarios['inventario'].df["Emis. Fóssil CO2 (t)"].sum())
+    assert np.isclose(pontual[("Escopo 1", "CO2")], esperado)
+
+
+def test_fatores_da_combustao_movel_pelo_componente_usado(calc, linhas_movel, linhas_estacionaria):
+    """Regressão: fóssil e bio de uma mistura (e CH4/N2O de anos diferentes) sorteavam o mesmo fator"""
+    inventarios = _inventarios(linhas_movel, linhas_estacionaria)
+    _, _, fatores = incerteza._prepara(inventarios, calc.gwp, incerteza.INCERTEZAS_PADRAO)
+    co2 = {ref for tipo, _, ref in fatores if tipo == "CO2"}
+    assert {"Óleo Diesel (puro)", "Biodiesel (B100)", "Gasolina Automotiva (pura)", "Etanol Anidro"} <= co2
+    ch4 = {ref for tipo, _, ref in fatores if tipo == "CH4"}
+    assert {"Gasolina C (Brasileira)\x1f2023", "Gasolina C (Brasileira)\x1f2022"} <= ch4
+
+
+def test_componente_compartilhado_entre_inventarios_tem_correlacao_total(calc, linhas_movel, linhas_estacionaria):
+    inventarios = _inventarios(linhas_movel, linhas_estacionaria)
+    diesel = {'inventario_movel': Inventario(inventarios['inventario_movel'].df.iloc[[0]]),
+              'inventario': inventarios['inventario']}
+    amostras, _ = incerteza.simular(diesel, calc.gwp, 5_000, SEM_ATIVIDADE, semente=5)
+    fossil, bio = amostras[("Escopo 1", "CO2")], amostras[("CO2 biogênico", "CO2")]
+    # Fóssil (diesel puro) e bio (biodiesel) da mistura: fatores independentes
+    assert abs(np.corrcoef(fossil, bio)[0, 1]) < 0.1
+    # As duas linhas usam o mesmo diesel puro: a soma varia como um único fator (independentes: ~75% disso)
+    pontual = (diesel['inventario_movel'].df["Emissões de CO2 fóssil (t)"].sum()
+               + diesel['inventario'].df["Emis. Fóssil CO2 (t)"].sum())
+    assert np.isclose(np.std(fossil / pontual), 0.05 / 1.96, rtol=0.1)
+
+
+def test_distribuicao_invalida(calc, linhas_movel, linhas_estacionaria):
+    with pytest.raises(ValueError):
+        incerteza.simular(_inventarios(linhas_movel, linhas_estacionaria), calc.gwp, 10, {"CO2": ("uniforme", 5.0)})
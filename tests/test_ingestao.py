@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from src import importacao, ingestao
+from src.inventario import Inventario, com_indice
+
+COLUNAS = importacao.COLUNAS_ESTACIONARIA + importacao.COLUNAS_OPCIONAIS
+
+
+def _escreve(pasta, nome, linhas):
+    caminho = pasta / "estacionaria" / nome
+    caminho.parent.mkdir(exist_ok=True)
+    caminho.write_text(";".join(COLUNAS) + "\n" + "\n".join(";".join(l) for l in linhas) + "\n", encoding="utf-8")
+    return caminho
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    _escreve(tmp_path, "jan.csv", [("F1", "", "Etanol", "10", "2024-01"), ("F2", "", "Etanol", "20", "2024-01")])
+    _escreve(tmp_path, "fev.csv", [("F1", "", "Etanol", "30", "2024-02")])
+    return tmp_path
+
+
+# --- INGESTÃO INCREMENTAL ---
+def test_segunda_varredura_nao_reprocessa(calc, pasta):
+    inventarios = {}
+    resumo = ingestao.ingerir(str(pasta), calc, inventarios)
+    assert [a["Situação"] for a in resumo['arquivos']] == ["novo", "novo"]
+    inv = inventarios['inventario']
+    assert len(inv) == 3
+    df = inv.df.copy()
+    os.utime(pasta / "estacionaria" / "jan.csv")  # Só tocado: mesmo hash
+    resumo = ingestao.ingerir(str(pasta), calc, inventarios)
+    assert resumo['arquivos'] == [] and resumo['inalterados'] == 2
+    assert inv.df.equals(df)
+
+
+def test_arquivo_alterado_substitui_so_as_suas_linhas(calc, pasta):
+    inventarios = {}
+    ingestao.ingerir(str(pasta), calc, inventarios)
+    _escreve(pasta, "jan.csv", [("F1", "", "Etanol", "11", "2024-01")])
+    resumo = ingestao.ingerir(str(pasta), calc, inventarios)
+    assert [(a["Arquivo"], a["Situação"]) for a in resumo['arquivos']] == [("estacionaria/jan.csv", "alterado")]
+    inv = inventarios['inventario']
+    assert sorted(zip(inv.coluna("Período"), inv.coluna("Quantidade Total"))) == [("2024-01", 11.0), ("2024-02", 30.0)]
+
+
+def test_sessao_nova_reingere_e_arquivo_invalido_fica_no_manifesto(calc, pasta):
+    (pasta / "estacionaria" / "ruim.csv").write_text("Outra;Coisa\n1;2\n", encoding="utf-8")
+    resumo = ingestao.ingerir(str(pasta), calc, {})
+    assert [a["Erro"] is not None for a in resumo['arquivos']] == [False, False, True]
+    inventarios = {}
+    resumo = ingestao.ingerir(str(pasta), calc, inventarios)
+    assert len(resumo['arquivos']) == 2 and len(inventarios['inventario']) == 3
+
+
+# --- UPSERT PELA CHAVE DE REGISTRO ---
+def test_lancamento_existente_e_substituido_nao_duplicado(calc, pasta, linhas_estacionaria):
+    """Regressão: a ingestão acrescentava linhas com a mesma chave de um lançamento do formulário"""
+    inv = com_indice(Inventario(linhas_estacionaria([{"Registro": "F1", "combustivel_direto": "Etanol",
+                                                       "qtd": 99.0, "periodo": "2024-01"}])), 'inventario')
+    inventarios = {'inventario': inv}
+    ingestao.ingerir(str(pasta), calc, inventarios)
+    assert len(inv) == 3
+    assert inv.coluna("Quantidade Total")[inv.posicao(("F1", "Etanol", "2024-01"))] == 10.0
+    assert ingestao.ingerir(str(pasta), calc, inventarios)['arquivos'] == []
+
+
+# --- PASTA MONITORADA ---
+def test_so_pastas_dentro_da_raiz(tmp_path):
+    raiz = tmp_path / "entrada"
+    (raiz / "filial").mkdir(parents=True)
+    (tmp_path / "fora").mkdir()
+    os.symlink(tmp_path / "fora", raiz / "atalho")
+    assert ingestao.resolver_pasta("", str(raiz)) == os.path.realpath(raiz)
+    assert ingestao.resolver_pasta(" filial ", str(raiz)) == os.path.realpath(raiz / "filial")
+    for pasta in ("..", "../fora", "filial/../../fora", str(tmp_path / "fora"), "/etc", "atalho"):
+        with pytest.raises(ValueError):
+            ingestao.resolver_pasta(pasta, str(raiz))
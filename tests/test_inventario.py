@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculadora import TABELA2_AGREGADOS
+from src.inventario import CHAVES_REGISTRO, Inventario, com_indice
+
+
+def _registros(n, inicio=0):
+    return [{"Registro": f"R{i}", "Setor": "Energia" if i % 2 else "Comercial",
+             "Combustível": "Óleo Diesel (comercial)", "Qtd": float(i), "Período": "2024-01"}
+            for i in range(inicio, inicio + n)]
+
+
+def _agregado_esperado(df, chaves, somas):
+    esperado = df.groupby(chaves, dropna=False)[somas].sum()
+    esperado["Lançamentos"] = df.groupby(chaves, dropna=False).size().astype(float)
+    return esperado.sort_index()
+
+
+# --- CONTAINER COLUNAR ---
+def test_append_e_extend_montam_o_mesmo_dataframe():
+    registros = _registros(200)
+    um_a_um = Inventario()
+    for r in registros:
+        um_a_um.append(r)
+    em_lote = Inventario(pd.DataFrame(registros))
+    pd.testing.assert_frame_equal(um_a_um.df, pd.DataFrame(registros))
+    pd.testing.assert_frame_equal(em_lote.df, pd.DataFrame(registros))
+    assert len(um_a_um) == 200 and bool(um_a_um) and not Inventario()
+
+
+def test_coluna_numerica_vira_texto_preservando_valores():
+    inv = Inventario([{"A": 1.5}, {"A": 2.0}])
+    inv.append({"A": "x"})
+    assert list(inv.coluna("A")) == [1.5, 2.0, "x"]
+
+
+def test_coluna_e_somente_leitura():
+    inv = Inventario(_registros(3))
+    with pytest.raises(ValueError):
+        inv.coluna("Qtd")[0] = 99.0
+
+
+def test_copia_e_independente():
+    inv = Inventario(_registros(3))
+    copia = inv.copia()
+    inv.append(_registros(1, 3)[0])
+    inv.atualizar([0], {"Qtd": np.array([100.0])})
+    assert len(copia) == 3 and copia.coluna("Qtd")[0] == 0.0
+
+
+# --- AGREGADOS INCREMENTAIS ---
+def test_agregado_acompanha_append_atualizar_e_remover():
+    chaves, somas = ["Setor", "Combustível"], ["Qtd"]
+    inv = Inventario(_registros(10))
+    inv.adicionar_agregado("t", chaves, somas)
+    inv.extend(_registros(5, 10))
+    inv.append(_registros(1, 15)[0])
+    inv.atualizar([0, 3], {"Qtd": np.array([7.0, 8.0]), "Setor": np.array(["Outro", "Outro"], dtype=object)})
+    inv.remover([1, 2, 15])
+    obtido = inv.agregado("t").set_index(chaves).sort_index()
+    pd.testing.assert_frame_equal(obtido, _agregado_esperado(inv.df, chaves, somas), check_names=False)
+
+
+def test_tabela2_dos_totais_correntes_igual_a_reagregar(calc, linhas_estacionaria):
+    nomes = calc.get_combustiveis_estacionaria()
+    inv = Inventario()
+    inv.extend(linhas_estacionaria([{"Registro": f"F{i}", "combustivel_direto": nomes[i % len(nomes)], "qtd": 10.0 + i}
+                                    for i in range(60)]))
+    tabela = calc.gerar_tabela_2(inv, "Energia")
+    inv.extend(linhas_estacionaria([{"Registro": "Nova", "combustivel_direto": nomes[0], "qtd": 5.0}]))
+    inv.remover([0])
+    assert calc.gerar_tabela_2(inv, "Energia") == calc.gerar_tabela_2(Inventario(inv.df), "Energia")
+    assert tabela != calc.gerar_tabela_2(inv, "Energia")
+    for nome in TABELA2_AGREGADOS:
+        assert inv.tem_agregado(nome)
+
+
+# --- ÍNDICE DE CHAVE E UPSERT ---
+def test_upsert_lote_e_idempotente():
+    inv = com_indice(Inventario(), 'inventario')
+    lote = pd.DataFrame(_registros(50))
+    assert inv.upsert_lote(lote) == (0, 50)
+    df, versao = inv.df.copy(), inv.versao
+    assert inv.upsert_lote(lote) == (50, 0)
+    pd.testing.assert_frame_equal(inv.df, df)
+    assert inv.reescrita("Qtd") < versao  # Nada mudou de fato
+
+
+def test_upsert_lote_ultima_ocorrencia_vence():
+    inv = com_indice(Inventario(), 'inventario')
+    lote = pd.DataFrame(_registros(3) + [{**_registros(1)[0], "Qtd": 42.0}])
+    assert inv.upsert_lote(lote) == (0, 3)
+    assert inv.coluna("Qtd")[inv.posicao(("R0", "Óleo Diesel (comercial)", "2024-01"))] == 42.0
+
+
+def test_upsert_substitui_no_lugar_e_limpa_colunas_ausentes():
+    inv = com_indice(Inventario(_registros(3)), 'inventario')
+    inv.append({**_registros(1, 3)[0], "Extra": "x"})
+    assert inv.upsert({"Registro": "R3", "Combustível": "Óleo Diesel (comercial)", "Período": "2024-01", "Qtd": 1.0})
+    assert len(inv) == 4 and inv.coluna("Qtd")[3] == 1.0
+    assert inv.coluna("Extra")[3] is None and inv.coluna("Setor")[3] is None
+
+
+def test_linhas_sem_registro_nunca_sao_substituidas():
+    inv = com_indice(Inventario(), 'inventario_movel')
+    assert inv.upsert_lote([{"Registro": "", "Período": "2024-01", "Qtd": 1.0}] * 2) == (0, 2)
+    assert inv.upsert_lote([{"Registro": None, "Período": "2024-01", "Qtd": 1.0}]) == (0, 1)
+    assert len(inv) == 3
+
+
+def test_chave_normaliza_vazios():
+    inv = com_indice(Inventario(), 'inventario_movel')
+    inv.append({"Registro": "123", "Período": None})
+    assert inv.posicao(("123", None)) == 0
+    assert inv.posicao("123") == 0
+    assert not inv.upsert({"Registro": "124"})
+    assert inv.upsert({"Registro": "123", "Período": ""})
+    assert len(inv) == 2
+
+
+def test_indice_continua_valido_apos_remover():
+    inv = com_indice(Inventario(_registros(10)), 'inventario')
+    chave = lambda i: (f"R{i}", "Óleo Diesel (comercial)", "2024-01")
+    inv.remover([0, 4])
+    assert inv.posicao(chave(0)) is None and inv.posicao(chave(4)) is None
+    for i in (1, 2, 3, 5, 9):
+        assert inv.coluna("Registro")[inv.posicao(chave(i))] == f"R{i}"
+    assert inv.remover_chave(chave(9)) and not inv.remover_chave(chave(9))
+    assert inv.upsert(_registros(1, 5)[0]) and len(inv) == 7
+
+
+def test_indice_segue_a_chave_alterada_por_atualizar():
+    inv = com_indice(Inventario(_registros(3)), 'inventario')
+    inv.atualizar([1], {"Período": np.array(["2024-02"], dtype=object)})
+    assert inv.posicao(("R1", "Óleo Diesel (comercial)", "2024-01")) is None
+    assert inv.posicao(("R1", "Óleo Diesel (comercial)", "2024-02")) == 1
+
+
+def test_reescrita_so_muda_quando_o_valor_muda():
+    inv = com_indice(Inventario(_registros(3)), 'inventario')
+    assert inv.reescrita("Combustível") == 0
+    inv.upsert(_registros(1)[0])
+    assert inv.reescrita("Combustível") == 0
+    inv.upsert({**_registros(1)[0], "Combustível": "Gasolina Automotiva (comercial)"})  # Outra chave: linha nova
+    assert inv.reescrita("Combustível") == 0
+    inv.atualizar([0], {"Combustível": np.array(["Etanol"], dtype=object)})
+    assert inv.reescrita("Combustível") == inv.versao
+    assert inv.reescrita("Qtd") == 0
+
+
+def test_chaves_registro_cobrem_todos_os_inventarios():
+    assert set(CHAVES_REGISTRO) == {'inventario', 'inventario_t3', 'inventario_movel', 'inventario_escopo2', 'inventario_escopo3'}
+
+
+def test_chave_repetida_volta_ao_indice_apos_remover_a_mais_recente():
+    inv = com_indice(Inventario(_registros(2) + _registros(1)), 'inventario')
+    chave = ("R0", "Óleo Diesel (comercial)", "2024-01")
+    assert inv.posicao(chave) == 2
+    inv.remover([2])
+    assert inv.posicao(chave) == 0
+    assert inv.upsert({**_registros(1)[0], "Qtd": 9.0}) and len(inv) == 2
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src import persistencia
+from src.inventario import Inventario, com_indice
+
+EMPRESA = {'nome': "Org", 'ano': 2024}
+ESCOPO = 'inventario_movel'
+
+
+@pytest.fixture
+def banco(tmp_path):
+    return persistencia.BancoInventario(str(tmp_path / "inventario.db"))
+
+
+def _linha(registro, qtd, periodo="2024-01", **extra):
+    return {"Registro": registro, "Período": periodo, "Emissões totais (t CO2e)": qtd, **extra}
+
+
+def _sessao(*linhas):
+    return com_indice(Inventario(list(linhas)), ESCOPO)
+
+
+def _salvos(banco):
+    df = banco.carregar(EMPRESA['nome'], EMPRESA['ano'], ESCOPO)
+    return dict(zip(zip(df["Registro"], df["Período"]), df["Emissões totais (t CO2e)"])) if len(df) else {}
+
+
+def _sincroniza(banco, inv):
+    return persistencia.sincronizar(banco, EMPRESA, {ESCOPO: inv})
+
+
+# --- SINCRONIZAÇÃO POR CHAVE ---
+def test_sem_empresa_nada_e_gravado(banco):
+    inv = _sessao(_linha("A", 1.0))
+    assert persistencia.sincronizar(banco, {}, {ESCOPO: inv}) == 0
+    assert inv.pendente and banco.contar("Org", 2024, ESCOPO) == 0
+
+
+def test_so_as_linhas_novas_sao_gravadas(banco):
+    inv = _sessao(*[_linha(f"R{i}", float(i)) for i in range(1_000)])
+    assert _sincroniza(banco, inv) == 1_000
+    assert not inv.pendente and _sincroniza(banco, inv) == 0
+    inv.append(_linha("Nova", -1.0))
+    assert _sincroniza(banco, inv) == 1
+    assert len(_salvos(banco)) == 1_001
+
+
+def test_duas_sessoes_nao_apagam_as_linhas_uma_da_outra(banco):
+    """Regressão: a sincronização truncava o escopo pela posição e apagava o que outra sessão gravou"""
+    a = _sessao(_linha("A1", 1.0), _linha("A2", 2.0))
+    b = _sessao(_linha("B1", 10.0))
+    assert _sincroniza(banco, a) == 2
+    assert _sincroniza(banco, b) == 1
+    assert a.upsert(_linha("A1", 1.5))
+    a.append(_linha("A3", 3.0))
+    assert _sincroniza(banco, a) == 2
+    assert _salvos(banco) == {("A1", "2024-01"): 1.5, ("A2", "2024-01"): 2.0,
+                              ("B1", "2024-01"): 10.0, ("A3", "2024-01"): 3.0}
+
+
+def test_upsert_grava_so_a_linha_alterada(banco):
+    inv = _sessao(*[_linha(f"R{i}", float(i)) for i in range(1_000)])
+    assert _sincroniza(banco, inv) == 1_000
+    assert not inv.pendente and _sincroniza(banco, inv) == 0
+    inv.upsert(_linha("R500", -1.0))
+    assert inv.pendencias()[0].tolist() == [500]
+    assert _sincroniza(banco, inv) == 1
+    salvos = _salvos(banco)
+    assert len(salvos) == 1_000 and salvos[("R500", "2024-01")] == -1.0
+
+
+def test_remover_apaga_so_a_chave_removida(banco):
+    inv = _sessao(_linha("A", 1.0), _linha("B", 2.0), _linha("C", 3.0))
+    outra = _sessao(_linha("D", 4.0))
+    _sincroniza(banco, inv)
+    _sincroniza(banco, outra)
+    inv.remover_chave(("B", "2024-01"))
+    _sincroniza(banco, inv)
+    assert set(_salvos(banco)) == {("A", "2024-01"), ("C", "2024-01"), ("D", "2024-01")}
+
+
+def test_remover_linha_repetida_regrava_a_que_ficou(banco):
+    inv = Inventario([_linha("A", 1.0), _linha("A", 2.0)])
+    _sincroniza(banco, inv)
+    assert _salvos(banco) == {("A", "2024-01"): 2.0}
+    inv.remover([1])
+    _sincroniza(banco, inv)
+    assert _salvos(banco) == {("A", "2024-01"): 1.0}
+
+
+def test_chave_alterada_apaga_a_chave_antiga(banco):
+    inv = _sessao(_linha("A", 1.0), _linha("B", 2.0))
+    _sincroniza(banco, inv)
+    inv.atualizar([0], {"Período": np.array(["2024-02"], dtype=object)})
+    assert _sincroniza(banco, inv) == 1
+    assert _salvos(banco) == {("A", "2024-02"): 1.0, ("B", "2024-01"): 2.0}
+    inv.remover([0])
+    _sincroniza(banco, inv)
+    assert _salvos(banco) == {("B", "2024-01"): 2.0}
+
+
+def test_linhas_sem_registro_tem_chave_propria(banco):
+    inv = _sessao(_linha("", 1.0), _linha(None, 2.0), _linha("", 3.0))
+    _sincroniza(banco, inv)
+    assert banco.contar("Org", 2024, ESCOPO) == 3
+    inv.remover([1])
+    inv.atualizar([1], {"Emissões totais (t CO2e)": np.array([30.0])})
+    _sincroniza(banco, inv)
+    df = banco.carregar("Org", 2024, ESCOPO)
+    assert df["Emissões totais (t CO2e)"].tolist() == [1.0, 30.0]
+
+
+def test_limpar_apaga_so_as_linhas_deste_inventario(banco):
+    inv = _sessao(_linha("A", 1.0))
+    outra = _sessao(_linha("B", 2.0))
+    _sincroniza(banco, inv)
+    _sincroniza(banco, outra)
+    inv.limpar()
+    assert inv.pendente
+    _sincroniza(banco, inv)
+    assert set(_salvos(banco)) == {("B", "2024-01")}
+
+
+def test_salvas_desatualizadas_substitui_o_escopo(banco):
+    _sincroniza(banco, _sessao(_linha("A", 1.0), _linha("B", 2.0)))
+    carregado = _sessao(_linha("C", 3.0))
+    carregado.salvas_desatualizadas = True
+    _sincroniza(banco, carregado)
+    assert _salvos(banco) == {("C", "2024-01"): 3.0}
+
+
+def test_restaurar_e_continuar_lancando(banco):
+    _sincroniza(banco, _sessao(_linha("A", 1.0), _linha("B", 2.0)))
+    inv = persistencia.restaurar(banco, "Org", 2024, ESCOPO, Inventario())
+    assert len(inv) == 2 and not inv.pendente
+    assert inv.upsert(_linha("A", 5.0))
+    assert _sincroniza(banco, inv) == 1
+    assert _salvos(banco) == {("A", "2024-01"): 5.0, ("B", "2024-01"): 2.0}
+
+
+# --- NaN NO JSON ---
+def test_nan_gravado_como_null_e_somado(banco):
+    """Regressão: NaN no JSON fazia json_extract (somar) falhar"""
+    inv = _sessao(_linha("A", 1.0, **{"Qtd Biocombustível": np.nan}), _linha("B", np.inf), _linha("C", 2.0))
+    _sincroniza(banco, inv)
+    n, (soma_total, soma_bio) = banco.somar("Org", 2024, ESCOPO, ["Emissões totais (t CO2e)", "Qtd Biocombustível"])
+    assert (n, soma_total, soma_bio) == (3, 3.0, 0.0)
+    df = banco.carregar("Org", 2024, ESCOPO)
+    assert df["Qtd Biocombustível"].isna().all() and np.isnan(df["Emissões totais (t CO2e)"][1])
+
+
+# --- MIGRAÇÃO DE BANCOS ANTIGOS ---
+def test_migra_banco_sem_chave_e_com_nan(tmp_path):
+    caminho = str(tmp_path / "antigo.db")
+    con = sqlite3.connect(caminho)
+    con.executescript("""
+        CREATE TABLE lancamentos (id INTEGER PRIMARY KEY, organizacao TEXT NOT NULL, ano_base INTEGER NOT NULL,
+                                  escopo TEXT NOT NULL, registro TEXT, dados TEXT NOT NULL);
+    """)
+    linhas = [_linha("A", 1.0), _linha("A", 2.0), _linha("B", float("nan")), _linha("", 4.0)]
+    con.executemany("INSERT INTO lancamentos (organizacao, ano_base, escopo, registro, dados) VALUES (?, ?, ?, ?, ?)",
+                    [("Org", 2024, ESCOPO, l["Registro"], json.dumps(l, ensure_ascii=False)) for l in linhas])
+    con.commit()
+    con.close()
+
+    banco = persistencia.BancoInventario(caminho)
+    assert banco.somar("Org", 2024, ESCOPO, ["Emissões totais (t CO2e)"]) == (4, [7.0])
+    inv = persistencia.restaurar(banco, "Org", 2024, ESCOPO, Inventario())
+    assert not inv.pendente
+    inv.upsert(_linha("A", 20.0))
+    _sincroniza(banco, inv)
+    df = banco.carregar("Org", 2024, ESCOPO)
+    assert len(df) == 4 and sorted(df["Emissões totais (t CO2e)"].dropna()) == [1.0, 4.0, 20.0]
+    # Reabrir não migra de novo
+    assert persistencia.BancoInventario(caminho).contar("Org", 2024, ESCOPO) == 4
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from src import series
+from src.inventario import TOTAIS_INVENTARIO, Inventario
+
+
+def _inventario(n=2_000, semente=3):
+    rng = np.random.default_rng(semente)
+    meses = [series.periodo(2022 + i // 12, i % 12 + 1) for i in range(24)]
+    return Inventario(pd.DataFrame({
+        "Registro": rng.choice(["A", "B", "C"], n),
+        "Período": rng.choice(meses + ["2023", "2022Q3", None], n),
+        "Total GEE (tCO2e)": rng.uniform(0, 10, n),
+    }))
+
+
+# --- TOTAIS POR PERÍODO ---
+def test_totais_mensais_iguais_ao_groupby():
+    inv = _inventario()
+    obtido = series.series_de(inv).totais("Total GEE (tCO2e)", 'M', por="Registro")
+    df = inv.df[inv.df["Período"].str.len() == 7]
+    esperado = df.pivot_table(index=pd.PeriodIndex(df["Período"], freq='M'), columns="Registro",
+                              values="Total GEE (tCO2e)", aggfunc="sum")
+    pd.testing.assert_frame_equal(obtido[sorted(obtido.columns)], esperado.rename_axis(None, axis=1).rename_axis(None),
+                                  check_freq=False)
+
+
+def test_linha_so_entra_na_frequencia_que_a_contem():
+    inv = Inventario([{"Período": "2023-01", "T": 1.0}, {"Período": "2023Q1", "T": 10.0},
+                      {"Período": "2023", "T": 100.0}, {"Período": None, "T": 1000.0}])
+    s = series.series_de(inv)
+    assert s.totais("T", 'M')["T"].sum() == 1.0
+    assert s.totais("T", 'Q')["T"].tolist() == [11.0]
+    assert s.totais("T", 'Y')["T"].tolist() == [111.0]
+    assert s.sem_detalhe("T", 'M') == (3, 1110.0)
+
+
+def test_cache_segue_a_versao_do_inventario():
+    inv = Inventario([{"Período": "2023-01", "T": 1.0}])
+    s = series.series_de(inv)
+    assert s.totais("T", 'M')["T"].tolist() == [1.0]
+    inv.append({"Período": "2023-03", "T": 2.0})
+    assert s.totais("T", 'M')["T"].tolist() == [1.0, 0.0, 2.0]
+
+
+def test_variacao_anual_e_consolidado():
+    inventarios = {
+        'inventario': Inventario([{"Período": "2023-01", "Total GEE (tCO2e)": 2.0}, {"Período": "2024-01", "Total GEE (tCO2e)": 3.0}]),
+        'inventario_movel': Inventario([{"Período": "2024-01", "Emissões totais (t CO2e)": 1.0}]),
+    }
+    totais = series.consolidado(inventarios, TOTAIS_INVENTARIO, 'Y')
+    assert totais["Escopo 1"].tolist() == [2.0, 4.0]
+    assert series.variacao_anual(totais, 'Y')["Escopo 1"].iloc[1] == 100.0
@@ -0,0 +1,66 @@
+import os
+import time
+
+from src import tarefas
+from src.inventario import Inventario
+
+
+def _arquivo(pasta, nome, tamanho, idade=0.0):
+    caminho = pasta / nome
+    caminho.write_bytes(b"x" * tamanho)
+    instante = time.time() - idade
+    os.utime(caminho, (instante, instante))
+    return str(caminho)
+
+
+# --- CACHE DE RELATÓRIOS ---
+def test_mesmo_conteudo_mesma_chave():
+    a = {'inventario': Inventario([{"A": 1.0}])}
+    b = {'inventario': Inventario([{"A": 1.0}])}
+    assert tarefas.chave_relatorio('xlsx', {"nome": "X"}, a, "v1") == tarefas.chave_relatorio('xlsx', {"nome": "X"}, b, "v1")
+    assert tarefas.chave_relatorio('xlsx', {"nome": "X"}, a, "v1") != tarefas.chave_relatorio('xlsx', {"nome": "X"}, a, "v2")
+    b['inventario'].append({"A": 2.0})
+    assert tarefas.chave_relatorio('xlsx', {"nome": "X"}, a, "v1") != tarefas.chave_relatorio('xlsx', {"nome": "X"}, b, "v1")
+
+
+def test_submeter_grava_e_reaproveita(tmp_path):
+    caminho = str(tmp_path / "r.bin")
+    chamadas = []
+
+    def construtor(ao_progresso):
+        chamadas.append(1)
+        ao_progresso(0.5)
+        return b"dados"
+
+    tarefa = tarefas.submeter(caminho, construtor)
+    tarefa.futuro.result()
+    assert tarefa.pronta and tarefa.ler() == b"dados" and tarefa.progresso == 1.0
+    assert tarefas.submeter(caminho, construtor) is tarefa and tarefas.consultar(caminho) is tarefa
+    assert len(chamadas) == 1
+
+
+def test_erro_fica_na_tarefa(tmp_path):
+    def falha(ao_progresso):
+        raise RuntimeError("sem dados")
+
+    tarefa = tarefas.submeter(str(tmp_path / "erro.bin"), falha)
+    tarefa.futuro.result()
+    assert tarefa.erro == "sem dados" and not tarefa.pronta
+
+
+def test_podar_por_idade_e_por_tamanho(tmp_path):
+    velho = _arquivo(tmp_path, "velho", 10, idade=10_000)
+    medio = _arquivo(tmp_path, "medio", 100, idade=100)
+    novo = _arquivo(tmp_path, "novo", 100, idade=1)
+    temporario = _arquivo(tmp_path, "escrevendo.tmp", 100)
+    assert tarefas.podar(str(tmp_path), bytes_maximos=10_000, idade_maxima=1_000) == 1
+    assert not os.path.exists(velho)
+    assert tarefas.podar(str(tmp_path), bytes_maximos=150, idade_maxima=1_000) == 1
+    assert not os.path.exists(medio) and os.path.exists(novo) and os.path.exists(temporario)
+    assert tarefas.podar(str(tmp_path), bytes_maximos=0, idade_maxima=1_000, manter={novo}) == 0
+
+
+def test_consultar_marca_o_acesso(tmp_path):
+    caminho = _arquivo(tmp_path, "pronto", 10, idade=5_000)
+    assert tarefas.consultar(caminho).pronta
+    assert time.time() - os.path.getmtime(caminho) < 60
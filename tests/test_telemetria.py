@@ -0,0 +1,77 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from src import telemetria
+
+
+def _jsonl(eventos):
+    return io.BytesIO("\n".join(json.dumps(e) for e in eventos).encode("utf-8"))
+
+
+# --- TELEMETRIA -> OPÇÃO 3 ---
+EVENTOS = [
+    {"veiculo": "A", "ts": "2024-01-31T23:00:00Z", "odometro_km": 100.0},
+    {"veiculo": "B", "ts": "2024-02-01T00:00:00Z", "lat": 0.0, "lon": 0.0},
+    {"veiculo": "A", "ts": "2024-02-01T01:00:00Z", "odometro_km": 150.0},
+    {"veiculo": "B", "ts": "2024-02-01T01:00:00Z", "lat": 0.0, "lon": 1.0},  # ~111 km em 1 h
+    {"veiculo": "A", "ts": "2024-02-01T02:00:00Z", "odometro_km": 5_000.0},  # Salto implausível
+    {"veiculo": None, "ts": "2024-02-01T00:00:00Z"},
+]
+
+
+def test_distancia_por_odometro_e_gps_em_blocos():
+    inteiro = telemetria.distancias_mensais([(_jsonl(EVENTOS), "t.jsonl")])
+    em_blocos = telemetria.distancias_mensais([(_jsonl(EVENTOS), "t.jsonl")], tamanho_bloco=2)
+    pd.testing.assert_frame_equal(inteiro.resultado(), em_blocos.resultado())
+    km = inteiro.resultado().set_index(["veiculo", "mes"])["km"]
+    assert km[("A", "2024-01")] == 0.0 and km[("A", "2024-02")] == 50.0
+    assert km[("B", "2024-02")] == pytest.approx(111.2, abs=0.1)
+    assert em_blocos.descartados == {"sem veículo/data": 1, "fora de ordem": 0, "salto implausível": 1}
+
+
+def test_evento_anterior_ao_ja_processado_e_descartado():
+    acumulador = telemetria.distancias_mensais([(_jsonl(EVENTOS[:3]), "a.jsonl"),
+                                                (_jsonl([{"veiculo": "A", "ts": 1704067200, "odometro_km": 1.0}]), "b.jsonl")])
+    assert acumulador.descartados["fora de ordem"] == 1
+    assert acumulador.resultado()["km"].sum() == 50.0
+
+
+@pytest.mark.parametrize("nome", ["t.jsonl", "t.jsonl.gz"])
+def test_caminho_aberto_aqui_e_fechado(monkeypatch, tmp_path, nome):
+    """Regressão: com um caminho (str), o arquivo aberto por ler_eventos nunca era fechado"""
+    conteudo = _jsonl(EVENTOS).getvalue()
+    caminho = tmp_path / nome
+    caminho.write_bytes(gzip.compress(conteudo) if nome.endswith(".gz") else conteudo)
+    abertos = []
+
+    def abre(*args, **kwargs):
+        abertos.append(open(*args, **kwargs))
+        return abertos[-1]
+
+    monkeypatch.setattr(telemetria, "open", abre, raising=False)
+    assert sum(len(b) for b in telemetria.ler_eventos(str(caminho), tamanho_bloco=2)) == len(EVENTOS)
+    interrompido = telemetria.ler_eventos(str(caminho), tamanho_bloco=2)
+    next(interrompido)
+    interrompido.close()
+    assert len(abertos) == 2 and all(f.closed for f in abertos)
+
+
+def test_arquivo_recebido_continua_aberto():
+    arquivo = _jsonl(EVENTOS)
+    assert sum(len(b) for b in telemetria.ler_eventos(arquivo, "t.jsonl")) == len(EVENTOS)
+    assert not arquivo.closed
+
+
+def test_linhas_opcao3(calc):
+    distancias = pd.DataFrame({"veiculo": ["A", "B"], "mes": ["2024-01", "2024-01"], "km": [120.0, 0.0]})
+    linhas = telemetria.linhas_opcao3(distancias, calc, tipo_padrao="Caminhão Leve Diesel", ano_padrao="2023")
+    assert len(linhas) == 1 and linhas["Período"].iloc[0] == "2024-01"
+    consumo = calc.db['combustao_movel']['frota_veiculos']["Caminhão Leve Diesel"]['consumo_medio_kml']
+    # Caminhões não têm ano: vai "N/A", como no formulário
+    esperado = calc.calcular_movel(3, {'tipo_veiculo': "Caminhão Leve Diesel", 'ano': "N/A", 'qtd': 120.0})
+    assert linhas["Emissões totais (t CO2e)"].iloc[0] == esperado["total_gee"]
+    assert linhas["Qtd Combustível Fóssil"].iloc[0] == pytest.approx(120.0 / consumo * 0.88)